@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+import columnar_io
 
 GA_PATH = 'schedule_results_GA.csv'
 NSGA2_PATH = 'schedule_results_NSGA2.csv'
@@ -9,7 +10,25 @@ COL_DEVICE = '设备ID'
 COL_DURATION_H = '加工时长(小时)'
 
 
+def load_stats_columnar(path: str) -> pd.DataFrame:
+    # 列式文件: 内存映射零拷贝读取,在Arrow上直接分组聚合,仅将按设备汇总的小表转为DataFrame
+    table = columnar_io.read_table(path)
+    grouped = table.group_by('machine_id').aggregate([('processing_time', 'sum'), ('processing_time', 'count')])
+    stats = pd.DataFrame({
+        COL_DEVICE: grouped.column('machine_id').to_pylist(),
+        '总加工小时': (grouped.column('processing_time_sum').to_numpy() / 3600.0).round(2),
+        '工序数': grouped.column('processing_time_count').to_numpy(),
+    })
+    total_hours = stats['总加工小时'].sum()
+    stats['小时占比(%)'] = (stats['总加工小时'] / total_hours * 100).round(2) if total_hours > 0 else 0
+    return stats.sort_values('总加工小时', ascending=False)
+
+
 def load_stats(csv_path: str) -> pd.DataFrame:
+    # 优先读取同名列式文件(schedule_results_*.arrow/.parquet),无需重新解析字符串
+    columnar_path = columnar_io.find_columnar(os.path.splitext(csv_path)[0])
+    if columnar_path:
+        return load_stats_columnar(columnar_path)
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f'未找到文件: {csv_path}')
     df = pd.read_csv(csv_path)
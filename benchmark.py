@@ -0,0 +1,448 @@
+"""
+调度引擎基准测试
+功能: 在不同订单规模(默认5~5000)的合成算例(instance_generator)上测量
+  微基准 - 染色体解码、前驱约束排序、调度仿真、目标计算、fit_func
+  宏基准 - GA一代(选择/交叉/变异/局部搜索/评估)、NSGA-II环境选择、DataPreprocessor.process
+的每次调用耗时、吞吐(评估/秒等)与内存峰值(tracemalloc);
+结果可保存为基线(benchmarks/<名称>.json),compare命令按阈值标记性能回退(存在回退时退出码为1)
+仓库内的benchmarks/baseline.json为参考基线,记录了生成时的提交、参数与机器信息(Python/平台/CPU数);
+绝对耗时随机器而异,跨机器比较仅作参考,判断回退时应在同一台机器上先以当前主干重新保存基线
+
+用法:
+    python benchmark.py run --save baseline                  # 运行并保存基线
+    python benchmark.py run --sizes 5 50 --compare baseline  # 运行并与基线比较
+    python benchmark.py compare baseline current             # 比较两份已保存的结果
+"""
+
+import argparse
+import contextlib
+import datetime
+import functools
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from data_preprocessor import DataPreprocessor
+from ffs_simulator import FFSSimulator
+from instance_generator import generate_instance
+
+# 基线/结果文件目录(相对于仓库根目录)
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+DEFAULT_SIZES = (5, 50, 500, 5000)
+# 基准项(按执行顺序): 名称 → 吞吐单位
+CASES = {
+    'decode': '评估/秒',
+    'sort': '评估/秒',
+    'simulate': '评估/秒',
+    'objective': '评估/秒',
+    'fit_func': '评估/秒',
+    'ga_generation': '评估/秒',
+    'nsga2_selection': '个体/秒',
+    'preprocess': '订单/秒',
+}
+# 耗时/内存增长超过该比例时判定为回退
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_MEMORY_THRESHOLD = 0.20
+
+
+@contextlib.contextmanager
+def _quiet():
+    """屏蔽预处理器/仿真器的进度打印"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def measure(fn: Callable[[], object], min_time: float = 1.0, max_calls: int = 50,
+            memory: bool = True) -> Dict:
+    """
+    测量fn的每次调用耗时: 首次调用(预热)在tracemalloc下记录内存峰值,
+    随后至少计时一次,累计达到min_time秒或max_calls次为止(计时期间关闭GC,同timeit)
+
+    返回:
+        {'calls', 'median', 'min', 'mean', 'peak_memory_bytes'}
+    """
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    else:
+        fn()
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        deadline = time.perf_counter() + min_time
+        while not samples or (len(samples) < max_calls and time.perf_counter() < deadline):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {
+        'calls': len(samples),
+        'median': float(np.median(samples)),
+        'min': float(np.min(samples)),
+        'mean': float(np.mean(samples)),
+        'peak_memory_bytes': peak,
+    }
+
+
+class _Instance:
+    """单个规模的基准实例: 预处理数据、仿真器及各阶段输入均在首次使用时构建(不计入计时)"""
+
+    def __init__(self, directory: str, seed: int, ga_pop_size: int, nsga2_pop_size: int):
+        self.directory = directory
+        self.seed = seed
+        self.ga_pop_size = ga_pop_size
+        self.nsga2_pop_size = nsga2_pop_size
+
+    @functools.cached_property
+    def simulator(self) -> FFSSimulator:
+        from run_ga import configure_objective
+        with _quiet():
+            data = DataPreprocessor.from_directory(self.directory).process()
+            simulator = FFSSimulator(data)
+        configure_objective(simulator)
+        return simulator
+
+    @functools.cached_property
+    def chromosome(self) -> np.ndarray:
+        rng = np.random.default_rng(self.seed)
+        return rng.uniform(0.0, 0.9999, self.simulator.total_ops * 2)
+
+    @functools.cached_property
+    def operations(self) -> List[Dict]:
+        return self.simulator._decode_chromosome(self.chromosome)[0]
+
+    @functools.cached_property
+    def sorted_operations(self) -> List[Dict]:
+        return self.simulator._sort_with_precedence(self.operations)
+
+    @functools.cached_property
+    def simulated(self) -> Tuple[Dict, List]:
+        return self.simulator._simulate_schedule(self.sorted_operations)
+
+    @functools.cached_property
+    def ga_population(self) -> Tuple[List[np.ndarray], np.ndarray]:
+        from run_ga import build_initial_population
+        np.random.seed(self.seed)
+        population = build_initial_population(self.simulator, self.ga_pop_size)
+        return population, np.array([self.simulator.fit_func(ind) for ind in population])
+
+    @functools.cached_property
+    def nsga2_population(self) -> List:
+        # 选择耗时只取决于种群规模与目标值分布,目标值随机生成(父代+子代共2*mu个个体)
+        from deap import creator
+        from run_nsga2 import create_deap_types
+        create_deap_types()
+        rng = np.random.default_rng(self.seed)
+        genes = rng.uniform(0.0, 0.9999, self.simulator.total_ops * 2).tolist()
+        population = []
+        for objectives in rng.uniform(0.0, 1.0, (2 * self.nsga2_pop_size, 3)):
+            individual = creator.Individual(genes)
+            individual.fitness.values = tuple(objectives)
+            population.append(individual)
+        return population
+
+    def case(self, name: str) -> Tuple[Callable[[], object], float]:
+        """
+        返回(被测函数, 每次调用的工作量(评估次数/个体数/订单数));
+        工作量也可以是函数,计时结束后调用,取被测函数自身报告的工作量
+        """
+        sim = self.simulator
+        if name == 'decode':
+            chromosome = self.chromosome
+            return (lambda: sim._decode_chromosome(chromosome)), 1
+        if name == 'sort':
+            operations = self.operations
+            return (lambda: sim._sort_with_precedence(operations)), 1
+        if name == 'simulate':
+            sorted_operations = self.sorted_operations
+            return (lambda: sim._simulate_schedule(sorted_operations)), 1
+        if name == 'objective':
+            completion_times, schedule = self.simulated
+            return (lambda: sim._calculate_objective(completion_times, schedule)), 1
+        if name == 'fit_func':
+            chromosome = self.chromosome
+            return (lambda: sim.fit_func(chromosome)), 1
+        if name == 'ga_generation':
+            from run_ga import AdaptiveGA, evolve_generation
+            population, fitness = self.ga_population
+            counted = {}
+
+            def generation():
+                # 评估次数取evolve_generation的返回值,随局部搜索等实现变化自动更新
+                counted['evaluations'] = evolve_generation(population, fitness, sim, AdaptiveGA())[2]
+            return generation, (lambda: counted['evaluations'])
+        if name == 'nsga2_selection':
+            from deap import tools
+            population = self.nsga2_population
+            return (lambda: tools.selNSGA2(population, self.nsga2_pop_size)), len(population)
+        if name == 'preprocess':
+            def preprocess():
+                with _quiet():
+                    DataPreprocessor.from_directory(self.directory).process()
+            return preprocess, sim.num_orders
+        raise ValueError(f"未知基准项: {name}")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1.0:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def _format_bytes(size: Optional[float]) -> str:
+    if size is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, cases: Sequence[str] = tuple(CASES),
+                   min_time: float = 1.0, max_calls: int = 50, max_case_seconds: float = 60.0,
+                   ga_pop_size: int = 20, nsga2_pop_size: int = 80, seed: int = 0,
+                   num_stages: int = 5, machines_per_stage: int = 2, memory: bool = True) -> Dict:
+    """
+    在各订单规模上运行基准项
+
+    参数:
+        sizes: 订单数列表(升序运行)
+        cases: 基准项名称(见CASES)
+        min_time: 每项的最短计时时长(秒)
+        max_calls: 每项的最大计时次数
+        max_case_seconds: 单次调用耗时上限; 按上一规模的耗时以平方增长外推,超过上限的项跳过
+        ga_pop_size: GA一代基准的种群规模
+        nsga2_pop_size: NSGA-II选择基准的mu(选择前个体数为2*mu)
+        seed: 算例生成与染色体的随机种子
+        num_stages: 算例工序数
+        machines_per_stage: 算例每道工序的设备数
+        memory: 是否记录内存峰值
+
+    返回:
+        {'created', 'commit', 'python', 'platform', 'cpu_count', 'params', 'results': [...],
+         'max_rss_bytes'}
+    """
+    params = {
+        'sizes': list(sizes), 'cases': list(cases), 'min_time': min_time, 'max_calls': max_calls,
+        'max_case_seconds': max_case_seconds, 'ga_pop_size': ga_pop_size,
+        'nsga2_pop_size': nsga2_pop_size, 'seed': seed, 'num_stages': num_stages,
+        'machines_per_stage': machines_per_stage,
+    }
+    results = []
+    last_ok: Dict[str, Tuple[int, float]] = {}
+    with tempfile.TemporaryDirectory(prefix='ffs_bench_') as workdir:
+        for size in sorted(sizes):
+            print(f"\n📏 订单数 {size}")
+            directory = os.path.join(workdir, f'orders_{size}')
+            generate_instance(directory, num_orders=size, num_stages=num_stages,
+                              machines_per_stage=machines_per_stage, seed=seed)
+            instance = _Instance(directory, seed, ga_pop_size, nsga2_pop_size)
+            for name in cases:
+                entry = {'case': name, 'size': size, 'unit': CASES[name]}
+                previous = last_ok.get(name)
+                estimate = previous[1] * (size / previous[0]) ** 2 if previous else None
+                if name not in last_ok and any(r['case'] == name for r in results):
+                    entry.update(status='skipped', reason='较小规模已跳过')
+                elif estimate is not None and estimate > max_case_seconds:
+                    entry.update(status='skipped', reason=f'预计单次耗时 {estimate:.0f} 秒超过上限')
+                else:
+                    fn, work = instance.case(name)
+                    np.random.seed(seed)
+                    entry['status'] = 'ok'
+                    entry.update(measure(fn, min_time=min_time, max_calls=max_calls, memory=memory))
+                    entry['work_per_call'] = work = work() if callable(work) else work
+                    entry['rate'] = work / entry['median'] if entry['median'] > 0 else None
+                    last_ok[name] = (size, entry['median'])
+                results.append(entry)
+                if entry['status'] == 'ok':
+                    print(f"  {name:<16} {_format_seconds(entry['median']):>10}/次  "
+                          f"{entry['rate']:>12.1f} {entry['unit']}  峰值内存 {_format_bytes(entry['peak_memory_bytes'])}"
+                          f"  ({entry['calls']}次)")
+                else:
+                    print(f"  {name:<16} ⏭️ 跳过: {entry['reason']}")
+
+    # Linux下ru_maxrss单位为KB,macOS为字节
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'params': params,
+        'results': results,
+        'max_rss_bytes': max_rss if sys.platform == 'darwin' else max_rss * 1024,
+    }
+
+
+def _resolve_path(name_or_path: str) -> str:
+    """基线名称映射到benchmarks/<名称>.json; 已是文件路径时原样返回"""
+    if os.path.exists(name_or_path) or name_or_path.endswith('.json'):
+        return name_or_path
+    return os.path.join(BENCHMARK_DIR, f'{name_or_path}.json')
+
+
+def save_results(report: Dict, name_or_path: str) -> str:
+    path = _resolve_path(name_or_path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_results(name_or_path: str) -> Dict:
+    with open(_resolve_path(name_or_path), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD,
+                    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD) -> List[Dict]:
+    """
+    逐项比较两份结果的中位耗时与内存峰值
+
+    参数:
+        threshold: 耗时比(当前/基线)超过1+threshold判为回退,低于1-threshold判为提升
+        memory_threshold: 内存峰值比超过1+memory_threshold判为回退
+
+    返回:
+        [{'case', 'size', 'status'('regression'/'improved'/'unchanged'/'missing'/'new'/'skipped'),
+          'time_ratio', 'memory_ratio', 'baseline', 'current'}]
+    """
+    def index(report):
+        return {(r['case'], r['size']): r for r in report['results']}
+
+    base_index, current_index = index(baseline), index(current)
+    rows = []
+    for key in list(base_index) + [k for k in current_index if k not in base_index]:
+        base, cur = base_index.get(key), current_index.get(key)
+        row = {'case': key[0], 'size': key[1], 'time_ratio': None, 'memory_ratio': None,
+               'baseline': base['median'] if base and base['status'] == 'ok' else None,
+               'current': cur['median'] if cur and cur['status'] == 'ok' else None}
+        if cur is None:
+            row['status'] = 'missing'
+        elif base is None:
+            row['status'] = 'new'
+        elif row['baseline'] is None or row['current'] is None:
+            row['status'] = 'skipped'
+        else:
+            row['time_ratio'] = row['current'] / row['baseline'] if row['baseline'] > 0 else None
+            if base.get('peak_memory_bytes') and cur.get('peak_memory_bytes') is not None:
+                row['memory_ratio'] = cur['peak_memory_bytes'] / base['peak_memory_bytes']
+            slower = row['time_ratio'] is not None and row['time_ratio'] > 1 + threshold
+            heavier = row['memory_ratio'] is not None and row['memory_ratio'] > 1 + memory_threshold
+            if slower or heavier:
+                row['status'] = 'regression'
+            elif row['time_ratio'] is not None and row['time_ratio'] < 1 - threshold:
+                row['status'] = 'improved'
+            else:
+                row['status'] = 'unchanged'
+        rows.append(row)
+    return rows
+
+
+def print_comparison(rows: List[Dict], baseline: Dict, current: Dict):
+    marks = {'regression': '🔴', 'improved': '🟢', 'unchanged': '⚪', 'new': '🆕', 'skipped': '⏭️'}
+    print(f"\n📊 基准比较: 基线 {baseline.get('created')} ({baseline.get('commit')}) "
+          f"→ 当前 {current.get('created')} ({current.get('commit')})")
+    for row in rows:
+        if row['status'] == 'missing':
+            continue
+        times = ''
+        if row['baseline'] is not None and row['current'] is not None:
+            times = f"{_format_seconds(row['baseline']):>10} → {_format_seconds(row['current']):>10}"
+        ratio = f"×{row['time_ratio']:.2f}" if row['time_ratio'] is not None else ''
+        memory = f"内存×{row['memory_ratio']:.2f}" if row['memory_ratio'] is not None else ''
+        print(f"  {marks[row['status']]} {row['case']:<16} {row['size']:>6}单  {times:<24} {ratio:>7}  {memory}")
+    missing = sum(row['status'] == 'missing' for row in rows)
+    if missing:
+        print(f"  ❔ 基线中另有 {missing} 项本次未运行")
+    regressions = sum(row['status'] == 'regression' for row in rows)
+    if regressions:
+        print(f"\n❌ 发现 {regressions} 项性能回退")
+    else:
+        print("\n✅ 未发现性能回退")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="FFS调度引擎基准测试")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='运行基准测试')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='订单规模列表')
+    run_parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES), help='基准项')
+    run_parser.add_argument('--min-time', type=float, default=1.0, help='每项最短计时时长(秒)')
+    run_parser.add_argument('--max-calls', type=int, default=50, help='每项最大计时次数')
+    run_parser.add_argument('--max-case-seconds', type=float, default=60.0,
+                            help='单次调用耗时上限(秒),按较小规模外推超过上限的项跳过')
+    run_parser.add_argument('--ga-pop', type=int, default=20, help='GA一代基准的种群规模')
+    run_parser.add_argument('--nsga2-pop', type=int, default=80, help='NSGA-II选择基准的种群规模(mu)')
+    run_parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    run_parser.add_argument('--stages', type=int, default=5, help='算例工序数')
+    run_parser.add_argument('--machines-per-stage', type=int, default=2, help='算例每道工序的设备数')
+    run_parser.add_argument('--no-memory', action='store_true', help='不记录内存峰值')
+    run_parser.add_argument('--save', default=None, help='保存结果(名称保存到benchmarks/<名称>.json,或JSON路径)')
+    run_parser.add_argument('--compare', default=None, help='运行后与该基线比较(名称或JSON路径)')
+
+    compare_parser = subparsers.add_parser('compare', help='比较两份基准结果')
+    compare_parser.add_argument('baseline', help='基线(名称或JSON路径)')
+    compare_parser.add_argument('current', help='当前结果(名称或JSON路径)')
+    for sub in (run_parser, compare_parser):
+        sub.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='耗时回退阈值(比例)')
+        sub.add_argument('--memory-threshold', type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                         help='内存峰值回退阈值(比例)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        current = run_benchmarks(
+            sizes=args.sizes, cases=args.cases, min_time=args.min_time, max_calls=args.max_calls,
+            max_case_seconds=args.max_case_seconds, ga_pop_size=args.ga_pop, nsga2_pop_size=args.nsga2_pop,
+            seed=args.seed, num_stages=args.stages, machines_per_stage=args.machines_per_stage,
+            memory=not args.no_memory,
+        )
+        print(f"\n💾 进程内存峰值(RSS): {_format_bytes(current['max_rss_bytes'])}")
+        if args.save:
+            print(f"💾 结果已保存: {save_results(current, args.save)}")
+        if not args.compare:
+            return 0
+        baseline = load_results(args.compare)
+    else:
+        baseline, current = load_results(args.baseline), load_results(args.current)
+
+    rows = compare_results(baseline, current, args.threshold, args.memory_threshold)
+    print_comparison(rows, baseline, current)
+    return 1 if any(row['status'] == 'regression' for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
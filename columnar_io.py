@@ -0,0 +1,152 @@
+"""
+列式结果读写模块
+功能: 将调度明细、订单汇总与KPI以带类型的列式文件(Arrow IPC / Parquet)导出,
+直接由NumPy数组构建,读取端通过内存映射零拷贝加载
+依赖pyarrow(可选); 未安装时列式导出不可用,CSV导出不受影响
+"""
+
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 可选依赖
+    pa = None
+
+
+# 格式名 → 文件后缀; Arrow IPC文件不压缩,以便内存映射零拷贝读取
+COLUMNAR_SUFFIXES = {
+    'arrow': '.arrow',
+    'parquet': '.parquet',
+}
+
+
+def is_available() -> bool:
+    """pyarrow是否可用"""
+    return pa is not None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("列式导出需要pyarrow: pip install pyarrow")
+
+
+def _dictionary_column(indices: np.ndarray, values: List) -> 'pa.DictionaryArray':
+    """以整数索引 + 取值表构建字典编码列(不逐行物化字符串)"""
+    return pa.DictionaryArray.from_arrays(
+        pa.array(np.asarray(indices, dtype=np.int32)),
+        pa.array([str(v) for v in values], type=pa.string())
+    )
+
+
+def schedule_table(cols: Dict[str, np.ndarray], order_list: List, machine_list: List,
+                   stage_names: List) -> 'pa.Table':
+    """
+    由列式调度数组构建调度明细表
+
+    参数:
+        cols: visualize.schedule_to_arrays()的结果
+        order_list, machine_list, stage_names: 索引对应的ID/名称表
+
+    返回:
+        pa.Table: order_idx, order_id, stage_idx, stage, machine_id,
+                  start_time, finish_time, processing_time(秒, float64)
+    """
+    _require_pyarrow()
+    return pa.table({
+        'order_idx': pa.array(cols['order_idx'].astype(np.int32)),
+        'order_id': _dictionary_column(cols['order_idx'], order_list),
+        'stage_idx': pa.array(cols['stage_idx'].astype(np.int16)),
+        'stage': _dictionary_column(cols['stage_idx'], stage_names),
+        'machine_id': _dictionary_column(cols['machine_idx'], machine_list),
+        'start_time': pa.array(cols['start_time']),
+        'finish_time': pa.array(cols['finish_time']),
+        'processing_time': pa.array(cols['processing_time']),
+    })
+
+
+def order_summary_table(completion_times: Dict, order_list: List, due_dates: Dict) -> 'pa.Table':
+    """
+    构建订单完工汇总表(列名与webapp订单JSON字段一致)
+
+    返回:
+        pa.Table: order_id, completion_days, due_date, tardiness(天), on_time(bool)
+    """
+    _require_pyarrow()
+    n = len(order_list)
+    completion_days = np.fromiter((completion_times.get(i, 0.0) for i in range(n)), dtype=np.float64, count=n) / 86400.0
+    due = np.fromiter((due_dates[o] for o in order_list), dtype=np.float64, count=n)
+    tardiness = np.maximum(0.0, completion_days - due)
+    return pa.table({
+        'order_id': pa.array([str(o) for o in order_list], type=pa.string()),
+        'completion_days': pa.array(completion_days),
+        'due_date': pa.array(due),
+        'tardiness': pa.array(tardiness),
+        'on_time': pa.array(tardiness == 0),
+    })
+
+
+def kpi_table(kpis: Dict) -> 'pa.Table':
+    """构建单行KPI表(每个KPI一列,float64)"""
+    _require_pyarrow()
+    return pa.table({name: pa.array([float(value)], type=pa.float64()) for name, value in kpis.items()})
+
+
+def write_table(table: 'pa.Table', base_path: str, fmt: str = 'arrow') -> str:
+    """
+    写出列式文件
+
+    参数:
+        table: 待写出的表
+        base_path: 不含后缀的输出路径
+        fmt: 'arrow'(Arrow IPC文件) 或 'parquet'
+
+    返回:
+        实际写出的文件路径
+    """
+    _require_pyarrow()
+    if fmt not in COLUMNAR_SUFFIXES:
+        raise ValueError(f"不支持的列式格式: {fmt} (可选: {', '.join(COLUMNAR_SUFFIXES)})")
+    path = base_path + COLUMNAR_SUFFIXES[fmt]
+    if fmt == 'arrow':
+        with pa.OSFile(path, 'wb') as sink, pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, path)
+    return path
+
+
+def read_table(path: str) -> 'pa.Table':
+    """
+    读取列式文件: Arrow IPC通过内存映射零拷贝加载,Parquet使用内存映射读取
+
+    参数:
+        path: .arrow 或 .parquet 文件路径
+    """
+    _require_pyarrow()
+    if path.endswith(COLUMNAR_SUFFIXES['arrow']):
+        return pa_ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return pq.read_table(path, memory_map=True)
+
+
+def find_columnar(base_path: str) -> Optional[str]:
+    """
+    查找base_path对应的列式文件(优先Arrow IPC); pyarrow不可用、文件不存在
+    或早于同名CSV(说明最近一次运行未导出列式文件)时返回None
+
+    参数:
+        base_path: 不含后缀的路径,如 'schedule_results_GA'
+    """
+    if pa is None:
+        return None
+    csv_path = base_path + '.csv'
+    csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else 0.0
+    for suffix in COLUMNAR_SUFFIXES.values():
+        path = base_path + suffix
+        if os.path.exists(path) and os.path.getmtime(path) >= csv_mtime:
+            return path
+    return None
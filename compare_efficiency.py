@@ -5,7 +5,7 @@
 比较设备加工效率
 """
 
-from data_preprocessor import DataPreprocessor
+from data_preprocessor import DataPreprocessor, DEFAULT_CACHE_DIR
 
 def main():
     # 加载数据
@@ -14,7 +14,7 @@ def main():
         process_times_file='工序加工时间.csv',
         machines_file='设备可用时间.csv'
     )
-    data = preprocessor.process()
+    data = preprocessor.process(cache_dir=DEFAULT_CACHE_DIR)
     
     # 获取设备索引
     eq01_idx = data['machine_list'].index('EQ-01')
@@ -0,0 +1,97 @@
+"""
+预处理数据缓存模块
+功能: 以输入CSV内容哈希为键,将DataPreprocessor的输出持久化到磁盘
+命中时通过内存映射加载数组,完全跳过CSV解析
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+META_FILE = 'meta.json'
+ARRAY_SUFFIX = '.npy'
+HASH_BLOCK_SIZE = 1 << 20  # 1MB分块读取,避免大文件一次性载入内存
+
+
+def compute_data_hash(file_paths: List[str], version: str) -> str:
+    """
+    计算输入文件内容与预处理版本的联合哈希
+
+    参数:
+        file_paths: 输入CSV路径列表(顺序敏感)
+        version: 预处理逻辑版本号,逻辑变更后旧缓存自动失效
+
+    返回:
+        十六进制SHA-256摘要
+    """
+    digest = hashlib.sha256()
+    digest.update(version.encode('utf-8'))
+    for path in file_paths:
+        digest.update(b'\x00')
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(HASH_BLOCK_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cached_data(cache_dir: str, key: str) -> Optional[Dict]:
+    """
+    读取缓存条目
+
+    参数:
+        cache_dir: 缓存根目录
+        key: compute_data_hash返回的键
+
+    返回:
+        {'meta': 元数据字典, 'arrays': {名称: np.memmap}}; 未命中或条目损坏时返回None
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    meta_path = os.path.join(entry_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {}
+        for name in meta.get('arrays', []):
+            # copy-on-write映射: 只读共享页,写入时才复制,调用方可安全修改
+            arrays[name] = np.load(os.path.join(entry_dir, name + ARRAY_SUFFIX), mmap_mode='c')
+    except (OSError, ValueError, KeyError):
+        return None
+    return {'meta': meta, 'arrays': arrays}
+
+
+def save_cached_data(cache_dir: str, key: str, meta: Dict, arrays: Dict[str, np.ndarray]):
+    """
+    写入缓存条目(先写临时目录再原子重命名,并发写入同一键时安全)
+
+    参数:
+        cache_dir: 缓存根目录
+        key: compute_data_hash返回的键
+        meta: 可JSON序列化的元数据
+        arrays: 需要内存映射加载的numpy数组
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_dir = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(entry_dir, META_FILE)):
+        return
+    tmp_dir = tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=cache_dir)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, name + ARRAY_SUFFIX), np.ascontiguousarray(array))
+        meta = dict(meta, arrays=list(arrays.keys()))
+        with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # 另一进程已写入同一条目(目标目录非空)或磁盘错误: 缓存失败不影响主流程
+        shutil.rmtree(tmp_dir, ignore_errors=True)
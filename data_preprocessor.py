@@ -4,15 +4,128 @@
 严格遵循Agent 1的数学元素提取报告
 """
 
+import os
+import re
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+from data_cache import compute_data_hash, load_cached_data, save_cached_data
+from metrics import CACHE_REQUESTS
+from tracing import traced
+
+
+# 预处理逻辑版本号: 修改build_data_structures的输出语义时递增,使旧缓存失效
+PREPROCESS_VERSION = '6'
+# 默认缓存目录(相对于运行目录)
+DEFAULT_CACHE_DIR = '.ffs_cache'
+
+# 订单数据列名别名(鲁棒性)
+ORDER_COLUMN_ALIASES = {
+    '订单ID': 'order_id',
+    'OrderID': 'order_id',
+    '产品类型': 'product_type',
+    'ProductType': 'product_type',
+    '数量': 'quantity',
+    'Quantity': 'quantity',
+    '交货日期': 'due_date',
+    'DueDate': 'due_date',
+    '订单优先级': 'priority',
+    'Priority': 'priority'
+}
+# 工艺路线表列名别名: 每行表示"某工序可在某设备加工及其单位时间",产品类型为空时适用于全部产品
+ROUTING_COLUMN_ALIASES = {
+    '工序': 'stage',
+    'Stage': 'stage',
+    '设备ID': 'machine_id',
+    'MachineID': 'machine_id',
+    '单位加工时间(秒/片)': 'unit_time',
+    '标准加工时间(秒/片)': 'unit_time',
+    'UnitTime': 'unit_time',
+    '产品类型': 'product_type',
+    'ProductType': 'product_type'
+}
+# 默认输入文件名(求解脚本与Web端约定)
+DEFAULT_ORDERS_FILE = '订单数据.csv'
+DEFAULT_PROCESS_TIMES_FILE = '工序加工时间.csv'
+DEFAULT_MACHINES_FILE = '设备可用时间.csv'
+# 默认工艺路线表文件名(存在时优先于Line_1/Line_2推断规则)
+DEFAULT_ROUTING_FILE = '工艺路线.csv'
+# 通用路线组(不区分产品)的名称
+DEFAULT_ROUTE_GROUP = '*'
+
+# 旧格式工序加工时间表的流水线名(Line_N → 该工序设备类型的第N台设备)
+LINE_PATTERN = re.compile(r'line[_\s-]*(\d+)', re.IGNORECASE)
+# 旧格式中未列入固定映射的工序,使用名为"<工序名>设备"的设备类型
+STAGE_MACHINE_TYPE_SUFFIX = '设备'
+
+# 规划期缓冲天数: 规划期 = 最长交期 + 缓冲
+PLANNING_BUFFER_DAYS = 5
+# 交货日期基准日
+BASE_DATE = pd.Timestamp(2025, 10, 26)
+
+# 流式读取订单时的列类型(按别名归一后的列名)
+STREAM_ORDER_DTYPES = {
+    'order_id': str,
+    'product_type': 'category',
+    'quantity': np.int32,
+    'due_date': str,
+    'priority': 'category',
+}
+
+
+class OpIndexMap(Mapping):
+    """
+    {(order_idx, stage_idx): global_op_idx} 的惰性视图
+    全局工序号按订单主序编号,直接计算而不物化字典,订单增删时无需维护
+    """
+    
+    def __init__(self, order_list: List, num_stages: int):
+        self._order_list = order_list
+        self._num_stages = num_stages
+    
+    def __getitem__(self, key):
+        order_idx, stage_idx = key
+        if not (0 <= order_idx < len(self._order_list) and 0 <= stage_idx < self._num_stages):
+            raise KeyError(key)
+        return order_idx * self._num_stages + stage_idx
+    
+    def __iter__(self):
+        for order_idx in range(len(self._order_list)):
+            for stage_idx in range(self._num_stages):
+                yield (order_idx, stage_idx)
+    
+    def __len__(self):
+        return len(self._order_list) * self._num_stages
+
+
+class OpMachineMap(Mapping):
+    """{global_op_idx: [available_machine_ids]} 的惰性视图(按订单所属路线组查表)"""
+    
+    def __init__(self, order_groups: List[int], route_machine_ids: List[List], num_stages: int):
+        self._order_groups = order_groups
+        self._route_machine_ids = route_machine_ids
+        self._num_stages = num_stages
+    
+    def __getitem__(self, global_op_idx):
+        if not 0 <= global_op_idx < len(self):
+            raise KeyError(global_op_idx)
+        order_idx, stage_idx = divmod(global_op_idx, self._num_stages)
+        return self._route_machine_ids[self._order_groups[order_idx] * self._num_stages + stage_idx]
+    
+    def __iter__(self):
+        return iter(range(len(self)))
+    
+    def __len__(self):
+        return len(self._order_groups) * self._num_stages
 
 
 class DataPreprocessor:
     """FFS调度数据预处理器"""
     
-    def __init__(self, orders_file: str, process_times_file: str, machines_file: str):
+    def __init__(self, orders_file: str, process_times_file: str, machines_file: str,
+                 chunksize: Optional[int] = None, routing_file: Optional[str] = None):
         """
         初始化数据预处理器
         
@@ -20,49 +133,71 @@ class DataPreprocessor:
             orders_file: 订单数据CSV路径
             process_times_file: 工序加工时间CSV路径
             machines_file: 设备可用时间CSV路径
+            chunksize: 流式读取订单的分块行数; 指定时启用流式模式,
+                       订单逐块解析写入预分配数组,原始DataFrame用后即释放
+            routing_file: 工艺路线表CSV路径(工序,设备ID,单位加工时间,可选产品类型);
+                          未指定时按Line_1/Line_2规则从工序加工时间表推断
         """
         self.orders_file = orders_file
         self.process_times_file = process_times_file
         self.machines_file = machines_file
+        self.chunksize = chunksize
+        self.routing_file = routing_file
         
         # 数据容器
         self.orders_df = None
         self.process_times_df = None
         self.machines_df = None
+        self.routing_df = None
         
         # 核心数据结构
         self.order_list = []  # 订单ID列表
         self.quantities = {}  # {order_id: quantity}
         self.due_dates = {}  # {order_id: due_date_in_days}
         self.weights = {}  # {order_id: priority_weight}
+        self.product_types = {}  # {order_id: product_type}
         
         self.stage_names = []  # 工序名称列表
         self.machine_list = []  # 设备ID列表
         self.machine_capacity = {}  # {machine_id: available_time_in_seconds}
+        self.machine_daily_minutes = {}  # {machine_id: 单日可用时间(分钟)}
+        self.planning_horizon_days = 0.0  # 规划期(天)
         
         self.p_matrix = None  # 3D numpy数组: [order_idx, stage_idx, machine_idx]
-        self.stage_to_machines = {}  # {stage_idx: [machine_ids]}
+        self.p_templates = None  # 3D numpy数组: [route_group, stage_idx, machine_idx],各路线组加工时间模板
+        self._p_buffer = None  # p_matrix底层缓冲区(容量可大于订单数,支持摊销O(1)追加)
+        self._p_shared = False  # True时p_matrix为单一模板的只读广播视图(流式模式,零拷贝)
+        self.order_index = {}  # {order_id: order_idx}
+        self.data_hash = None  # 输入文件内容哈希(增量修改订单后置为None)
+        self.stage_to_machines = {}  # {stage_idx: [machine_ids]},各路线组可用设备的并集
         self.op_map_inv = {}  # {(order_idx, stage_idx): global_op_idx}
         self.op_k_map = {}  # {global_op_idx: [available_machine_ids]}
         
+        # 工艺路线(设备资格矩阵 + CSR式行索引,行号 = route_group * num_stages + stage_idx)
+        self.route_groups = [DEFAULT_ROUTE_GROUP]  # 路线组名称: 通用组 + 有专用路线的产品类型
+        self.route_group_index = {}  # {product_type: route_group}
+        self.eligibility = None  # bool数组: [route_group, stage_idx, machine_idx]
+        self.route_ptr = None  # int64数组: 长度 num_groups*num_stages+1
+        self.route_machines = None  # int32数组: 各行可用设备的machine_idx
+        self.route_machine_ids = []  # 各行可用设备ID列表(op_k_map使用)
+        self.order_groups = []  # 各订单所属路线组,与order_list对齐
+        
+        # 流式模式下的订单列数组(与order_list对齐)
+        self.quantity_array = None  # int32
+        self.due_date_array = None  # float64,相对基准日天数
+        self.weight_array = None  # float64
+        self.product_codes = None  # int16,索引product_categories
+        self.product_categories = []  # 产品类型取值表
+        
     def load_data(self):
         """加载所有CSV文件"""
         # 加载订单数据
-        self.orders_df = pd.read_csv(self.orders_file, encoding='utf-8-sig')
-        # 列名别名处理(鲁棒性)
-        col_aliases = {
-            '订单ID': 'order_id',
-            'OrderID': 'order_id',
-            '产品类型': 'product_type',
-            'ProductType': 'product_type',
-            '数量': 'quantity',
-            'Quantity': 'quantity',
-            '交货日期': 'due_date',
-            'DueDate': 'due_date',
-            '订单优先级': 'priority',
-            'Priority': 'priority'
-        }
-        self.orders_df.rename(columns=col_aliases, inplace=True)
+        if self.chunksize:
+            self.load_orders_streaming()
+        else:
+            self.orders_df = pd.read_csv(self.orders_file, encoding='utf-8-sig')
+            # 列名别名处理(鲁棒性)
+            self.orders_df.rename(columns=ORDER_COLUMN_ALIASES, inplace=True)
         
         # 加载工序加工时间数据
         self.process_times_df = pd.read_csv(self.process_times_file, encoding='utf-8-sig')
@@ -89,11 +224,114 @@ class DataPreprocessor:
         }
         self.machines_df.rename(columns=col_aliases_m, inplace=True)
         
+        # 加载工艺路线表(可选)
+        if self.routing_file:
+            self.routing_df = pd.read_csv(self.routing_file, encoding='utf-8-sig')
+            self.routing_df.rename(columns=ROUTING_COLUMN_ALIASES, inplace=True)
+        
         print("✅ 数据加载完成")
-        print(f"  - 订单数: {len(self.orders_df)}")
+        print(f"  - 订单数: {len(self.order_list) if self.chunksize else len(self.orders_df)}")
         print(f"  - 设备数: {len(self.machines_df)}")
         print(f"  - 工序数据行: {len(self.process_times_df)}")
+        if self.routing_df is not None:
+            print(f"  - 工艺路线行: {len(self.routing_df)}")
         
+    def _count_data_rows(self, path: str) -> int:
+        """按二进制块统计CSV数据行数(不含表头),用于预分配数组"""
+        lines = 0
+        last_byte = b'\n'
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(1 << 20)
+                if not block:
+                    break
+                lines += block.count(b'\n')
+                last_byte = block[-1:]
+        if last_byte != b'\n':
+            lines += 1  # 末行无换行符
+        return max(0, lines - 1)
+    
+    def load_orders_streaming(self):
+        """
+        分块流式读取订单数据
+        显式列类型(产品/优先级为分类, 数量为int32), 交期与优先级权重按块向量化解析,
+        结果直接写入预分配数组, 不保留原始DataFrame
+        """
+        header = pd.read_csv(self.orders_file, encoding='utf-8-sig', nrows=0).columns
+        raw_names = {ORDER_COLUMN_ALIASES.get(c, c): c for c in header}
+        dtypes = {raw_names[c]: t for c, t in STREAM_ORDER_DTYPES.items() if c in raw_names}
+        
+        capacity = self._count_data_rows(self.orders_file)
+        order_ids = np.empty(capacity, dtype=object)
+        self.quantity_array = np.empty(capacity, dtype=np.int32)
+        self.due_date_array = np.empty(capacity, dtype=np.float64)
+        self.weight_array = np.empty(capacity, dtype=np.float64)
+        self.product_codes = np.empty(capacity, dtype=np.int16)
+        product_lookup = {}
+        
+        filled = 0
+        reader = pd.read_csv(
+            self.orders_file, encoding='utf-8-sig', usecols=list(dtypes),
+            dtype=dtypes, chunksize=self.chunksize
+        )
+        for chunk in reader:
+            chunk.rename(columns=ORDER_COLUMN_ALIASES, inplace=True)
+            end = filled + len(chunk)
+            order_ids[filled:end] = chunk['order_id'].to_numpy()
+            self.quantity_array[filled:end] = chunk['quantity'].to_numpy()
+            
+            due = pd.to_datetime(chunk['due_date'])
+            self.due_date_array[filled:end] = (due - BASE_DATE).dt.days.to_numpy(dtype=np.float64)
+            
+            # 分类列: 仅对取值表逐项解析,再按编码向量化展开
+            if 'priority' in chunk:
+                priority = chunk['priority'].cat
+                category_weights = np.array(
+                    [self.parse_priority_weight(c) for c in priority.categories] + [1.0]
+                )
+                self.weight_array[filled:end] = category_weights[priority.codes.to_numpy()]
+            else:
+                self.weight_array[filled:end] = 1.0
+            
+            if 'product_type' in chunk:
+                product = chunk['product_type'].cat
+                for category in product.categories:
+                    if category not in product_lookup:
+                        product_lookup[category] = len(self.product_categories)
+                        self.product_categories.append(category)
+                global_codes = np.array(
+                    [product_lookup[c] for c in product.categories] + [-1], dtype=np.int16
+                )
+                self.product_codes[filled:end] = global_codes[product.codes.to_numpy()]
+            else:
+                self.product_codes[filled:end] = -1
+            filled = end
+            del chunk
+        
+        # 行数预估可能因空行偏大,截断到实际行数
+        self.quantity_array = self.quantity_array[:filled]
+        self.due_date_array = self.due_date_array[:filled]
+        self.weight_array = self.weight_array[:filled]
+        self.product_codes = self.product_codes[:filled]
+        
+        self.order_list = order_ids[:filled].tolist()
+        del order_ids
+        self.order_index = {order_id: idx for idx, order_id in enumerate(self.order_list)}
+        if len(self.order_index) != len(self.order_list):
+            raise ValueError("订单数据中存在重复的订单ID")
+        self.quantities = dict(zip(self.order_list, self.quantity_array.tolist()))
+        self.due_dates = dict(zip(self.order_list, self.due_date_array.tolist()))
+        self.weights = dict(zip(self.order_list, self.weight_array.tolist()))
+        category_values = np.array(self.product_categories + [None], dtype=object)
+        self.product_types = dict(zip(self.order_list, category_values[self.product_codes].tolist()))
+    
+    def release_raw_data(self):
+        """释放原始DataFrame(数据结构构建完成后不再需要)"""
+        self.orders_df = None
+        self.process_times_df = None
+        self.machines_df = None
+        self.routing_df = None
+    
     def parse_priority_weight(self, priority_str: str) -> float:
         """解析优先级字符串为权重系数"""
         if pd.isna(priority_str):
@@ -108,39 +346,85 @@ class DataPreprocessor:
     
     def parse_due_date(self, date_str: str) -> float:
         """解析交货日期,返回相对于2025-10-26的天数"""
-        from datetime import datetime
-        base_date = datetime(2025, 10, 26)
         due_date = pd.to_datetime(date_str)
-        delta_days = (due_date - base_date).days
+        delta_days = (due_date - BASE_DATE).days
         return float(delta_days)
     
     def build_data_structures(self):
         """构建GA仿真器所需的核心数据结构"""
-        # 1. 订单参数
-        self.order_list = self.orders_df['order_id'].tolist()
-        for _, row in self.orders_df.iterrows():
-            order_id = row['order_id']
-            self.quantities[order_id] = int(row['quantity'])
-            self.due_dates[order_id] = self.parse_due_date(row['due_date'])
-            self.weights[order_id] = self.parse_priority_weight(row['priority'])
+        # 1. 订单参数(流式模式下已在load_orders_streaming中完成)
+        if self.orders_df is not None:
+            self.order_list = self.orders_df['order_id'].tolist()
+            self.order_index = {order_id: idx for idx, order_id in enumerate(self.order_list)}
+            for _, row in self.orders_df.iterrows():
+                order_id = row['order_id']
+                self.quantities[order_id] = int(row['quantity'])
+                self.due_dates[order_id] = self.parse_due_date(row['due_date'])
+                self.weights[order_id] = self.parse_priority_weight(row['priority'])
+                self.product_types[order_id] = self._parse_product_type(row.get('product_type'))
         
-        # 2. 工序和设备信息
-        self.stage_names = self.process_times_df['stage'].unique().tolist()
-        num_stages = len(self.stage_names)
+        # 2. 工序和设备信息(有工艺路线表时以其工序顺序为准)
+        if self.routing_df is not None:
+            self.stage_names = self.routing_df['stage'].unique().tolist()
+        else:
+            self.stage_names = self.process_times_df['stage'].unique().tolist()
         
         self.machine_list = self.machines_df['machine_id'].tolist()
         
         # 修正:计算规划期总可用时间
-        planning_horizon_days = max(self.due_dates.values()) + 5  # 最长交期+5天缓冲
+        planning_horizon_days = max(self.due_dates.values()) + PLANNING_BUFFER_DAYS  # 最长交期+5天缓冲
         print(f"  📅 规划期: {planning_horizon_days:.1f} 天")
         
         for _, row in self.machines_df.iterrows():
-            machine_id = row['machine_id']
-            # 单日可用时间(分钟) × 规划期(天) × 60(秒/分钟)
-            self.machine_capacity[machine_id] = row['available_time'] * planning_horizon_days * 60.0
+            self.machine_daily_minutes[row['machine_id']] = float(row['available_time'])
+        self._set_planning_horizon(planning_horizon_days)
+        for machine_id in self.machine_list:
             print(f"  🔧 {machine_id}: {self.machine_capacity[machine_id]/3600:.1f} 小时")
         
-        # 3. 构建设备类型到工序的映射
+        # 3. 构建工艺路线: 显式路线表优先,否则由Line_1/Line_2规则推断
+        if self.routing_df is not None:
+            routing_rows = self.routing_df
+        else:
+            routing_rows = self._infer_legacy_routing()
+        self._build_routing(routing_rows)
+        
+        # 4. 构建p_matrix [order_idx, stage_idx, machine_idx]
+        if self.orders_df is not None:
+            self.order_groups = [self.route_group_of(self.product_types[o]) for o in self.order_list]
+        else:
+            # 流式模式: 按产品编码向量化查表
+            lookup = np.array(
+                [self.route_group_of(p) for p in self.product_categories] + [0], dtype=np.int32
+            )
+            self.order_groups = lookup[self.product_codes].tolist()
+        num_orders = len(self.order_list)
+        
+        # 单一路线组时所有订单共享模板(流式模式下不为每个订单分配内存)
+        self._p_shared = bool(self.chunksize) and len(self.route_groups) == 1
+        if self._p_shared:
+            self._resize_p_matrix()
+        else:
+            self._p_buffer = self.p_templates[np.asarray(self.order_groups, dtype=np.int64)]
+            self.p_matrix = self._p_buffer[:num_orders]
+        
+        # 5. 构建工序映射
+        self._build_op_maps()
+        
+        print("✅ 数据结构构建完成")
+        print(f"  - p_matrix shape: {self.p_matrix.shape}")
+        print(f"  - 总工序数: {len(self.op_map_inv)}")
+        print(f"  - 路线组数: {len(self.route_groups)}, 资格矩阵非零项: {int(self.eligibility.sum())}")
+        print(f"  - 工序-设备映射示例: {list(self.stage_to_machines.items())[:3]}")
+    
+    def _infer_legacy_routing(self) -> pd.DataFrame:
+        """
+        兼容旧数据: 由工序加工时间表按流水线规则推断工艺路线
+        Line_1 -> 该类型第一台设备, Line_2 -> 该类型第二台设备, 依此类推(Line_N -> 第N台);
+        工序的设备类型按固定映射确定,不在映射中的工序使用"<工序名>设备"类型(不存在时使用BLU组装设备)
+        
+        返回:
+            工艺路线DataFrame(stage, machine_id, unit_time, product_type)
+        """
         machine_type_map = {}
         for _, row in self.machines_df.iterrows():
             mtype = row['machine_type']
@@ -158,57 +442,328 @@ class DataPreprocessor:
             'Final Inspection': 'BLU组装设备'
         }
         
-        self.stage_to_machines = {}
-        for stage_idx, stage_name in enumerate(self.stage_names):
-            machine_type = stage_type_mapping.get(stage_name, 'BLU组装设备')
-            self.stage_to_machines[stage_idx] = machine_type_map.get(machine_type, [])
-        
-        # 4. 构建p_matrix [order_idx, stage_idx, machine_idx]
-        num_orders = len(self.order_list)
-        num_machines = len(self.machine_list)
-        self.p_matrix = np.full((num_orders, num_stages, num_machines), np.inf)
-        
         # 创建line到machine的映射
-        line_machine_map = {}
+        rows = []
         line_stage_machine_map = {}
         for _, row in self.process_times_df.iterrows():
             line = row['line']
             stage = row['stage']
             time = row['time']
-            # 找到对应的stage_idx
             if stage not in self.stage_names:
                 continue
-            stage_idx = self.stage_names.index(stage)
             # 找到该(line, stage)对应的machine
             key = (line, stage)
             if key not in line_stage_machine_map:
                 # 推断line到machine的对应关系(基于设备类型)
-                machine_type = stage_type_mapping.get(stage, 'BLU组装设备')
+                machine_type = stage_type_mapping.get(stage)
+                if machine_type is None:
+                    machine_type = f"{stage}{STAGE_MACHINE_TYPE_SUFFIX}"
+                    if machine_type not in machine_type_map:
+                        machine_type = 'BLU组装设备'
                 machines_of_type = machine_type_map.get(machine_type, [])
-                # Line_1 -> 第一台设备, Line_2 -> 第二台设备
-                if 'Line_1' in line or 'line_1' in line.lower():
-                    line_stage_machine_map[key] = machines_of_type[0] if len(machines_of_type) > 0 else None
-                elif 'Line_2' in line or 'line_2' in line.lower():
-                    line_stage_machine_map[key] = machines_of_type[1] if len(machines_of_type) > 1 else None
+                # Line_N -> 该类型第N台设备
+                match = LINE_PATTERN.search(str(line))
+                line_no = int(match.group(1)) if match else 0
+                line_stage_machine_map[key] = machines_of_type[line_no - 1] if 0 < line_no <= len(machines_of_type) else None
             machine_id = line_stage_machine_map.get(key)
             if machine_id and machine_id in self.machine_list:
-                machine_idx = self.machine_list.index(machine_id)
-                # 对所有订单设置相同的加工时间
-                for order_idx in range(num_orders):
-                    self.p_matrix[order_idx, stage_idx, machine_idx] = time
+                rows.append({'stage': stage, 'machine_id': machine_id, 'unit_time': time, 'product_type': None})
+        return pd.DataFrame(rows, columns=['stage', 'machine_id', 'unit_time', 'product_type'])
+    
+    def _build_routing(self, routing_rows: pd.DataFrame):
+        """
+        由工艺路线行构建各路线组的加工时间模板
+        产品专用行覆盖通用行: 某产品在某工序有专用行时,该工序只使用专用行中的设备
         
-        # 5. 构建工序映射
-        global_op_idx = 0
-        for order_idx in range(num_orders):
-            for stage_idx in range(num_stages):
-                self.op_map_inv[(order_idx, stage_idx)] = global_op_idx
-                self.op_k_map[global_op_idx] = self.stage_to_machines[stage_idx]
-                global_op_idx += 1
+        参数:
+            routing_rows: 含stage, machine_id, unit_time, 可选product_type列的DataFrame
+        """
+        stage_lookup = {name: idx for idx, name in enumerate(self.stage_names)}
+        machine_lookup = {mid: idx for idx, mid in enumerate(self.machine_list)}
+        if 'product_type' in routing_rows:
+            products = [None if pd.isna(p) else p for p in routing_rows['product_type']]
+        else:
+            products = [None] * len(routing_rows)
         
-        print("✅ 数据结构构建完成")
-        print(f"  - p_matrix shape: {self.p_matrix.shape}")
-        print(f"  - 总工序数: {len(self.op_map_inv)}")
-        print(f"  - 工序-设备映射示例: {list(self.stage_to_machines.items())[:3]}")
+        self.route_groups = [DEFAULT_ROUTE_GROUP] + list(dict.fromkeys(p for p in products if p is not None))
+        self.route_group_index = {p: g for g, p in enumerate(self.route_groups) if g > 0}
+        num_groups = len(self.route_groups)
+        num_stages = len(self.stage_names)
+        self.p_templates = np.full((num_groups, num_stages, len(self.machine_list)), np.inf)
+        
+        specific = []
+        for stage, machine_id, unit_time, product in zip(
+                routing_rows['stage'], routing_rows['machine_id'], routing_rows['unit_time'], products):
+            if stage not in stage_lookup:
+                continue
+            if machine_id not in machine_lookup:
+                raise ValueError(f"工艺路线引用了未知设备: {machine_id}")
+            if product is None:
+                # 通用行适用于所有路线组
+                self.p_templates[:, stage_lookup[stage], machine_lookup[machine_id]] = unit_time
+            else:
+                specific.append((self.route_group_index[product], stage_lookup[stage],
+                                 machine_lookup[machine_id], unit_time))
+        
+        # 产品专用行: 先清空该组该工序的通用设备,再写入专用设备
+        for group, stage_idx in {(g, s) for g, s, _, _ in specific}:
+            self.p_templates[group, stage_idx, :] = np.inf
+        for group, stage_idx, machine_idx, unit_time in specific:
+            self.p_templates[group, stage_idx, machine_idx] = unit_time
+        
+        self._index_routing()
+    
+    def _index_routing(self):
+        """由p_templates派生资格矩阵、CSR行索引和各工序设备并集"""
+        num_groups, num_stages, _ = self.p_templates.shape
+        self.eligibility = np.isfinite(self.p_templates)
+        rows = self.eligibility.reshape(num_groups * num_stages, -1)
+        counts = rows.sum(axis=1)
+        self.route_ptr = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.route_ptr[1:])
+        self.route_machines = np.nonzero(rows)[1].astype(np.int32)
+        self.route_machine_ids = [
+            [self.machine_list[m] for m in self.route_machines[self.route_ptr[r]:self.route_ptr[r + 1]]]
+            for r in range(len(counts))
+        ]
+        stage_union = self.eligibility.any(axis=0)
+        self.stage_to_machines = {
+            stage_idx: [self.machine_list[m] for m in np.flatnonzero(stage_union[stage_idx])]
+            for stage_idx in range(num_stages)
+        }
+    
+    def _parse_product_type(self, product_type) -> Optional[str]:
+        """产品类型缺失时返回None"""
+        if product_type is None or pd.isna(product_type):
+            return None
+        return str(product_type)
+    
+    def route_group_of(self, product_type) -> int:
+        """产品类型所属路线组(无专用路线的产品归入通用组0)"""
+        return self.route_group_index.get(product_type, 0)
+    
+    def _build_op_maps(self):
+        """构建工序全局索引映射(op_map_inv / op_k_map),为绑定order_list的惰性视图"""
+        self.op_map_inv = OpIndexMap(self.order_list, len(self.stage_names))
+        self.op_k_map = OpMachineMap(self.order_groups, self.route_machine_ids, len(self.stage_names))
+    
+    def _set_planning_horizon(self, planning_horizon_days: float):
+        """设置规划期并重算设备总可用时间(秒)"""
+        self.planning_horizon_days = float(planning_horizon_days)
+        for machine_id, minutes in self.machine_daily_minutes.items():
+            # 单日可用时间(分钟) × 规划期(天) × 60(秒/分钟)
+            self.machine_capacity[machine_id] = minutes * self.planning_horizon_days * 60.0
+    
+    def _ensure_order_capacity(self, num_orders: int):
+        """保证p_matrix缓冲区可写且可容纳num_orders个订单(容量不足时倍增扩容)"""
+        current = len(self.order_list)
+        if (self._p_buffer is not None and self._p_buffer.shape[0] >= num_orders
+                and isinstance(self._p_buffer, np.ndarray) and not isinstance(self._p_buffer, np.memmap)):
+            return
+        capacity = max(num_orders, 2 * current, 8)
+        buffer = np.full((capacity,) + self.p_templates.shape[1:], np.inf)
+        if current:
+            buffer[:current] = self.p_matrix[:current]
+        self._p_buffer = buffer
+    
+    def _resize_p_matrix(self):
+        """按当前订单数刷新p_matrix视图"""
+        num_orders = len(self.order_list)
+        if self._p_shared:
+            template = self.p_templates[0]
+            self.p_matrix = np.broadcast_to(template, (num_orders,) + template.shape)
+        else:
+            self.p_matrix = self._p_buffer[:num_orders]
+    
+    def add_orders(self, orders) -> List[int]:
+        """
+        增量追加订单,不重建已有数据结构
+        耗时与新增订单数成正比(p_matrix缓冲区倍增扩容,摊销O(1))
+        
+        参数:
+            orders: DataFrame或字典列表,列名与订单数据CSV一致(支持别名)
+        
+        返回:
+            新增订单的order_idx列表(供FFSSimulator.update_orders使用)
+        """
+        new_df = pd.DataFrame(orders).rename(columns=ORDER_COLUMN_ALIASES)
+        new_ids = new_df['order_id'].tolist()
+        duplicated = [o for o in new_ids if o in self.order_index]
+        if duplicated or len(set(new_ids)) != len(new_ids):
+            raise ValueError(f"订单ID重复: {duplicated or new_ids}")
+        
+        start = len(self.order_list)
+        if 'product_type' in new_df:
+            new_products = [self._parse_product_type(p) for p in new_df['product_type']]
+        else:
+            new_products = [None] * len(new_ids)
+        new_groups = [self.route_group_of(p) for p in new_products]
+        if self._p_shared and any(new_groups):
+            # 出现专用路线组,无法再共享单一模板
+            self._p_shared = False
+        if not self._p_shared:
+            self._ensure_order_capacity(start + len(new_ids))
+        
+        changed = []
+        for order_idx, (_, row), product, group in zip(
+                range(start, start + len(new_ids)), new_df.iterrows(), new_products, new_groups):
+            order_id = row['order_id']
+            self.order_list.append(order_id)
+            self.order_groups.append(group)
+            self.order_index[order_id] = order_idx
+            self.quantities[order_id] = int(row['quantity'])
+            self.due_dates[order_id] = self.parse_due_date(row['due_date'])
+            self.weights[order_id] = self.parse_priority_weight(row.get('priority'))
+            self.product_types[order_id] = product
+            if not self._p_shared:
+                self._p_buffer[order_idx] = self.p_templates[group]
+            changed.append(order_idx)
+        self._resize_p_matrix()
+        
+        # 规划期仅在新交期超出时延长(O(设备数))
+        if changed:
+            latest_due = max(self.due_dates[self.order_list[i]] for i in changed)
+            if latest_due + PLANNING_BUFFER_DAYS > self.planning_horizon_days:
+                self._set_planning_horizon(latest_due + PLANNING_BUFFER_DAYS)
+        
+        self.data_hash = None  # 订单已偏离输入文件
+        print(f"✅ 新增订单 {len(changed)} 个,当前订单数: {len(self.order_list)}")
+        return changed
+    
+    def remove_orders(self, order_ids: List) -> List[int]:
+        """
+        增量删除订单
+        采用"与末尾订单交换后弹出"策略,耗时与删除订单数成正比;
+        被移动的末尾订单会获得新的order_idx
+        
+        参数:
+            order_ids: 待删除订单ID列表
+        
+        返回:
+            内容发生变化的order_idx列表(被移入的位置,供FFSSimulator.update_orders使用)
+        """
+        missing = [o for o in order_ids if o not in self.order_index]
+        if missing:
+            raise KeyError(f"订单不存在: {missing}")
+        
+        if not self._p_shared:
+            self._ensure_order_capacity(len(self.order_list))
+        changed = set()
+        horizon_affected = False
+        for order_id in order_ids:
+            order_idx = self.order_index.pop(order_id)
+            last_idx = len(self.order_list) - 1
+            if order_idx != last_idx:
+                moved_id = self.order_list[last_idx]
+                self.order_list[order_idx] = moved_id
+                self.order_groups[order_idx] = self.order_groups[last_idx]
+                self.order_index[moved_id] = order_idx
+                if not self._p_shared:
+                    self._p_buffer[order_idx] = self._p_buffer[last_idx]
+                changed.add(order_idx)
+            self.order_list.pop()
+            self.order_groups.pop()
+            changed.discard(last_idx)
+            
+            due = self.due_dates.pop(order_id)
+            del self.quantities[order_id]
+            del self.weights[order_id]
+            del self.product_types[order_id]
+            if due + PLANNING_BUFFER_DAYS >= self.planning_horizon_days:
+                horizon_affected = True
+        self._resize_p_matrix()
+        
+        # 仅当删除了交期最晚的订单时才需要O(n)重算规划期
+        if horizon_affected and self.due_dates:
+            self._set_planning_horizon(max(self.due_dates.values()) + PLANNING_BUFFER_DAYS)
+        
+        self.data_hash = None  # 订单已偏离输入文件
+        print(f"✅ 删除订单 {len(order_ids)} 个,当前订单数: {len(self.order_list)}")
+        return sorted(changed)
+    
+    @classmethod
+    def from_directory(cls, input_dir: str = '.', chunksize: Optional[int] = None) -> 'DataPreprocessor':
+        """
+        按默认文件名从目录创建预处理器(工艺路线表存在时一并使用)
+        
+        参数:
+            input_dir: 输入CSV所在目录
+            chunksize: 同__init__
+        """
+        routing_file = os.path.join(input_dir, DEFAULT_ROUTING_FILE)
+        return cls(
+            orders_file=os.path.join(input_dir, DEFAULT_ORDERS_FILE),
+            process_times_file=os.path.join(input_dir, DEFAULT_PROCESS_TIMES_FILE),
+            machines_file=os.path.join(input_dir, DEFAULT_MACHINES_FILE),
+            chunksize=chunksize,
+            routing_file=routing_file if os.path.exists(routing_file) else None
+        )
+    
+    def input_hash(self) -> str:
+        """输入文件内容哈希(与预处理缓存键一致),可用于判断输入是否变化而无需解析CSV"""
+        return self._cache_key()
+    
+    def _cache_key(self) -> str:
+        """输入CSV内容 + 预处理版本号的哈希"""
+        files = [self.orders_file, self.process_times_file, self.machines_file]
+        if self.routing_file:
+            files.append(self.routing_file)
+        return compute_data_hash(files, PREPROCESS_VERSION)
+    
+    def _save_cache(self, cache_dir: str, key: str):
+        """将已构建的数据结构写入缓存(订单相关字典按order_list顺序存为列表)"""
+        meta = {
+            'version': PREPROCESS_VERSION,
+            'order_list': self.order_list,
+            'quantities': [int(self.quantities[o]) for o in self.order_list],
+            'due_dates': [float(self.due_dates[o]) for o in self.order_list],
+            'weights': [float(self.weights[o]) for o in self.order_list],
+            'product_types': [self.product_types[o] for o in self.order_list],
+            'stage_names': self.stage_names,
+            'machine_list': self.machine_list,
+            'machine_daily_minutes': [self.machine_daily_minutes[m] for m in self.machine_list],
+            'planning_horizon_days': self.planning_horizon_days,
+            'route_groups': self.route_groups,
+            'p_shared': self._p_shared,
+        }
+        arrays = {
+            'p_templates': self.p_templates,
+            'order_groups': np.asarray(self.order_groups, dtype=np.int32),
+        }
+        if not self._p_shared:
+            arrays['p_matrix'] = self.p_matrix
+        save_cached_data(cache_dir, key, meta, arrays)
+    
+    def _load_cache(self, cache_dir: str, key: str) -> bool:
+        """从缓存恢复数据结构,命中返回True"""
+        entry = load_cached_data(cache_dir, key)
+        if entry is None:
+            return False
+        meta = entry['meta']
+        self.order_list = meta['order_list']
+        self.quantities = dict(zip(self.order_list, meta['quantities']))
+        self.due_dates = dict(zip(self.order_list, meta['due_dates']))
+        self.weights = dict(zip(self.order_list, meta['weights']))
+        self.product_types = dict(zip(self.order_list, meta['product_types']))
+        self.stage_names = meta['stage_names']
+        self.machine_list = meta['machine_list']
+        self.order_index = {order_id: idx for idx, order_id in enumerate(self.order_list)}
+        self.machine_daily_minutes = dict(zip(self.machine_list, meta['machine_daily_minutes']))
+        self._set_planning_horizon(meta['planning_horizon_days'])
+        self.route_groups = meta['route_groups']
+        self.route_group_index = {p: g for g, p in enumerate(self.route_groups) if g > 0}
+        self.order_groups = entry['arrays']['order_groups'].tolist()
+        self.p_templates = np.asarray(entry['arrays']['p_templates'])
+        self._index_routing()
+        # 流式模式写入的缓存只存单一模板; 非流式模式按路线组展开为可写的独立p_matrix(与未命中缓存时一致)
+        self._p_shared = meta['p_shared'] and bool(self.chunksize)
+        if meta['p_shared'] and not self._p_shared:
+            self._p_buffer = self.p_templates[np.asarray(self.order_groups, dtype=np.intp)]
+        else:
+            self._p_buffer = entry['arrays'].get('p_matrix')
+        self._resize_p_matrix()
+        self._build_op_maps()
+        return True
     
     def get_preprocessed_data(self) -> Dict:
         """返回所有预处理数据的字典"""
@@ -217,6 +772,7 @@ class DataPreprocessor:
             'quantities': self.quantities,
             'due_dates': self.due_dates,
             'weights': self.weights,
+            'product_types': self.product_types,
             'stage_names': self.stage_names,
             'machine_list': self.machine_list,
             'machine_capacity': self.machine_capacity,
@@ -224,15 +780,43 @@ class DataPreprocessor:
             'stage_to_machines': self.stage_to_machines,
             'op_map_inv': self.op_map_inv,
             'op_k_map': self.op_k_map,
+            'eligibility': self.eligibility,
+            'route_groups': self.route_groups,
+            'route_ptr': self.route_ptr,
+            'route_machines': self.route_machines,
+            'order_route_group': np.asarray(self.order_groups, dtype=np.int32),
             'num_orders': len(self.order_list),
             'num_stages': len(self.stage_names),
-            'num_machines': len(self.machine_list)
+            'num_machines': len(self.machine_list),
+            'data_hash': self.data_hash
         }
     
-    def process(self) -> Dict:
-        """执行完整的数据预处理流程"""
+    @traced('DataPreprocessor.process', cat='preprocess')
+    def process(self, cache_dir: Optional[str] = None) -> Dict:
+        """
+        执行完整的数据预处理流程
+        
+        参数:
+            cache_dir: 预处理缓存目录; 指定时按输入内容哈希读写缓存,
+                       命中则跳过CSV解析直接内存映射加载
+        """
+        key = self._cache_key()
+        if cache_dir and self._load_cache(cache_dir, key):
+            CACHE_REQUESTS.inc(cache='preprocess', result='hit')
+            print(f"✅ 命中预处理缓存: {key[:12]}")
+            self.data_hash = key
+            return self.get_preprocessed_data()
+        if cache_dir:
+            CACHE_REQUESTS.inc(cache='preprocess', result='miss')
+        
         self.load_data()
         self.build_data_structures()
+        if self.chunksize:
+            self.release_raw_data()
+        
+        if cache_dir:
+            self._save_cache(cache_dir, key)
+        self.data_hash = key
         return self.get_preprocessed_data()
 
 
@@ -0,0 +1,400 @@
+"""
+调度规则快速排程
+功能: 以事件驱动的调度规则直接构造完整排程(不经元启发式迭代),毫秒~秒级给出基准方案:
+  每当某工序阶段有设备空闲且有订单到达该阶段时,在有空闲可用设备的订单中按规则选出优先级最高者,
+  再在其工艺路线可用设备中选择最早完工的设备(可能是稍后空闲但更快的设备)
+支持规则:
+  EDD  - 交期最早优先(同交期时权重大者优先)
+  WSPT - 加权最短加工时间优先(加工时间/权重最小)
+  ATC  - 表观拖期成本(Apparent Tardiness Cost): (w/p)·exp(-max(松弛, 0)/(k·p̄)),
+         松弛 = 交期 - 当前时刻 - 订单剩余最短加工时间
+  SPT  - 当前工序最短加工时间优先
+  LPT  - 当前工序最长加工时间优先
+各阶段待排订单按工艺路线分组(同组订单的可用设备相同)保存在堆中,派工时比较有空闲设备的各组堆顶,
+优先订单的设备全忙时不阻塞其他组; ATC按"已无松弛"与"仍有松弛"两个堆维护(后者的相对次序不随时间变化),
+总复杂度O(n·(g + log n))(n为工序数,g为每阶段的路线组数,另加每道工序对其可用设备的扫描)
+
+排程结果可经encode_schedule编码为OS+MS染色体,作为GA初始种群的种子解(解码仿真后得到不劣于该排程的方案)
+
+用法:
+    python dispatching.py --rule ATC
+    python dispatching.py --rule all      # 比较全部规则并导出最优者
+"""
+
+import argparse
+import heapq
+import math
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ffs_simulator import FFSSimulator
+from run_history import DEFAULT_HISTORY_DB
+from solver_control import SolverControl
+
+DISPATCH_RULES = ('EDD', 'WSPT', 'ATC', 'SPT', 'LPT')
+DEFAULT_RULE = 'ATC'
+# ATC前瞻参数k: 越小越侧重交期紧迫度,越大越接近WSPT
+DEFAULT_ATC_K = 2.0
+ALGORITHM_NAME = 'DISPATCH'
+
+
+class _StaticQueue:
+    """静态优先级队列: 键在订单到达该阶段时确定,最小者优先; best返回(优先级键, 订单)"""
+
+    def __init__(self, key: Callable[[int], tuple]):
+        self._key = key
+        self._heap: List[tuple] = []
+
+    def push(self, job: int, now: float):
+        heapq.heappush(self._heap, (self._key(job), job))
+
+    def best(self, now: float) -> Optional[tuple]:
+        return self._heap[0] if self._heap else None
+
+    def pop(self, job: int):
+        heapq.heappop(self._heap)
+
+
+class _ATCQueue:
+    """
+    ATC优先级队列: 指数 I = (w/p)·exp(-max(c - t, 0)/K),c = 交期 - 剩余加工时间
+    t < c 时 log I = [log(w/p) - c/K] + t/K,方括号部分与t无关,故"仍有松弛"的订单可按其静态键排序;
+    t >= c 时 I = w/p; 另以c为键的堆在时刻推进时把订单从前者转入后者(惰性删除)
+    best返回(-log I, 订单),与同规则的其他队列可直接比较
+    """
+
+    def __init__(self, log_ratio: np.ndarray, critical_time: np.ndarray, scale: float):
+        self._log_ratio = log_ratio
+        self._critical_time = critical_time
+        self._scale = scale
+        self._slack_heap: List[tuple] = []      # (-静态键, job)
+        self._critical_heap: List[tuple] = []   # (-log(w/p), job)
+        self._pending: List[tuple] = []         # (c, job)
+        self._state: Dict[int, int] = {}        # job → 0(有松弛) / 1(无松弛)
+
+    def push(self, job: int, now: float):
+        if self._critical_time[job] <= now:
+            self._state[job] = 1
+            heapq.heappush(self._critical_heap, (-self._log_ratio[job], job))
+        else:
+            self._state[job] = 0
+            heapq.heappush(self._slack_heap, (-(self._log_ratio[job] - self._critical_time[job] / self._scale), job))
+            heapq.heappush(self._pending, (self._critical_time[job], job))
+
+    def _top(self, heap: List[tuple], state: int) -> Optional[tuple]:
+        while heap and self._state.get(heap[0][1]) != state:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def best(self, now: float) -> Optional[tuple]:
+        while self._pending and self._pending[0][0] <= now:
+            _, job = heapq.heappop(self._pending)
+            if self._state.get(job) == 0:
+                self._state[job] = 1
+                heapq.heappush(self._critical_heap, (-self._log_ratio[job], job))
+        slack_top = self._top(self._slack_heap, 0)
+        critical_top = self._top(self._critical_heap, 1)
+        # 比较log I: 有松弛者为 静态键 + t/K
+        slack = (slack_top[0] - now / self._scale, slack_top[1]) if slack_top else None
+        if slack is None or (critical_top is not None and critical_top[0] <= slack[0]):
+            return critical_top
+        return slack
+
+    def pop(self, job: int):
+        del self._state[job]
+
+
+def _stage_queue_factories(simulator: FFSSimulator, rule: str, processing: np.ndarray,
+                           atc_k: float) -> List[Callable[[], object]]:
+    """为每道工序阶段构建待排队列的工厂(每个路线组一个队列); processing为各订单各阶段的最短加工时间(秒)"""
+    order_list = simulator.order_list
+    due = np.array([simulator.due_dates[o] for o in order_list], dtype=np.float64) * 86400.0
+    weights = np.array([simulator.weights[o] for o in order_list], dtype=np.float64)
+    weights = np.where(weights > 0, weights, 1e-9)
+    factories = []
+    for stage_idx in range(simulator.num_stages):
+        p = processing[:, stage_idx]
+        if rule == 'EDD':
+            factory = lambda: _StaticQueue(lambda j: (due[j], -weights[j], j))
+        elif rule == 'WSPT':
+            factory = lambda p=p: _StaticQueue(lambda j: (p[j] / weights[j], j))
+        elif rule == 'SPT':
+            factory = lambda p=p: _StaticQueue(lambda j: (p[j], j))
+        elif rule == 'LPT':
+            factory = lambda p=p: _StaticQueue(lambda j: (-p[j], j))
+        elif rule == 'ATC':
+            remaining = processing[:, stage_idx:].sum(axis=1)
+            positive = p[p > 0]
+            mean_p = float(positive.mean()) if positive.size else 1.0
+            log_ratio = np.log(weights) - np.log(np.maximum(p, 1e-9))
+            factory = lambda log_ratio=log_ratio, critical=due - remaining, scale=atc_k * mean_p: \
+                _ATCQueue(log_ratio, critical, scale)
+        else:
+            raise ValueError(f"未知调度规则: {rule} (可选: {', '.join(DISPATCH_RULES)})")
+        factories.append(factory)
+    return factories
+
+
+def dispatch_schedule(simulator: FFSSimulator, rule: str = DEFAULT_RULE,
+                      atc_k: float = DEFAULT_ATC_K) -> Tuple[Dict, List]:
+    """
+    按调度规则构造完整排程
+
+    参数:
+        simulator: 仿真器(提供订单、工艺路线与加工时间)
+        rule: 调度规则(见DISPATCH_RULES)
+        atc_k: ATC前瞻参数
+
+    返回:
+        completion_times: {order_idx: completion_time_in_seconds}
+        schedule: 调度记录列表(字段同FFSSimulator._simulate_schedule),可直接传给evaluate_schedule
+    """
+    rule = rule.upper()
+    num_orders, num_stages = simulator.num_orders, simulator.num_stages
+    quantities = np.array([simulator.quantities[o] for o in simulator.order_list], dtype=np.float64)
+    unit_min = simulator.p_matrix.min(axis=2)
+    processing = np.where(np.isfinite(unit_min), unit_min, 0.0) * quantities[:, None]
+    factories = _stage_queue_factories(simulator, rule, processing, atc_k)
+
+    route_count = simulator._op_route_count
+    route_machines = simulator.route_machines
+    if not route_count.all():
+        empty_op = int(np.argmin(route_count))
+        raise ValueError(f"工序{int(simulator._op_stage[empty_op])}没有可用设备!")
+    # 设备 → 可能使用它的工序阶段(设备空闲时只需检查这些阶段)
+    machine_stages: Dict[int, set] = {}
+    row_machines = []
+    for row in range(len(simulator.route_ptr) - 1):
+        row_machines.append(route_machines[simulator.route_ptr[row]:simulator.route_ptr[row + 1]].tolist())
+        for machine_idx in row_machines[row]:
+            machine_stages.setdefault(machine_idx, set()).add(row % num_stages)
+    # 各阶段按路线行(路线组 × 阶段)分组的待排队列 {路线行: 队列}
+    route_rows = (np.asarray(simulator.order_route_group, dtype=np.int64)[:, None] * num_stages
+                  + np.arange(num_stages)).tolist()
+    queues: List[Dict[int, object]] = [{} for _ in range(num_stages)]
+
+    machine_free = [0.0] * simulator.num_machines
+    releases = [(0.0, job, 0) for job in range(num_orders)]     # (到达时刻, 订单, 阶段)
+    heapq.heapify(releases)
+    machine_events: List[Tuple[float, int]] = []                 # (空闲时刻, 设备)
+    completion_times = {}
+    schedule = []
+
+    while releases or machine_events:
+        now = min(releases[0][0] if releases else math.inf, machine_events[0][0] if machine_events else math.inf)
+        dirty = set()
+        while releases and releases[0][0] <= now:
+            _, job, stage_idx = heapq.heappop(releases)
+            row = route_rows[job][stage_idx]
+            queue = queues[stage_idx].get(row)
+            if queue is None:
+                queue = queues[stage_idx][row] = factories[stage_idx]()
+            queue.push(job, now)
+            dirty.add(stage_idx)
+        while machine_events and machine_events[0][0] <= now:
+            _, machine_idx = heapq.heappop(machine_events)
+            dirty.update(machine_stages.get(machine_idx, ()))
+
+        for stage_idx in sorted(dirty):
+            while True:
+                # 在有空闲可用设备的路线组中取优先级最高的订单; 均无空闲设备时等待下一事件
+                chosen = None
+                for row, queue in queues[stage_idx].items():
+                    top = queue.best(now)
+                    if top is None or all(machine_free[m] > now for m in row_machines[row]):
+                        continue
+                    if chosen is None or top < chosen[0]:
+                        chosen = (top, queue, row)
+                if chosen is None:
+                    break
+                (_, job), queue, row = chosen
+                candidates = row_machines[row]
+                unit_times = simulator.p_matrix[job, stage_idx, candidates]
+                best_machine, best_finish, best_time = -1, math.inf, 0.0
+                for machine_idx, unit_time in zip(candidates, unit_times.tolist()):
+                    processing_time = unit_time * quantities[job]
+                    finish = max(machine_free[machine_idx], now) + processing_time
+                    if finish < best_finish:
+                        best_machine, best_finish, best_time = machine_idx, finish, processing_time
+                queue.pop(job)
+                start_time = max(machine_free[best_machine], now)
+                machine_free[best_machine] = best_finish
+                heapq.heappush(machine_events, (best_finish, best_machine))
+                schedule.append({
+                    'order_idx': job,
+                    'order_id': simulator.order_list[job],
+                    'stage_idx': stage_idx,
+                    'machine_id': simulator.machine_list[best_machine],
+                    'start_time': start_time,
+                    'finish_time': best_finish,
+                    'processing_time': best_time,
+                })
+                if stage_idx + 1 < num_stages:
+                    heapq.heappush(releases, (best_finish, job, stage_idx + 1))
+                else:
+                    completion_times[job] = best_finish
+
+    completion_times = {order_idx: completion_times.get(order_idx, 0.0) for order_idx in range(num_orders)}
+    return completion_times, schedule
+
+
+def encode_schedule(simulator: FFSSimulator, schedule: List[Dict]) -> np.ndarray:
+    """
+    将排程编码为OS+MS染色体: OS基因按开工时刻排名递增,MS基因取所选设备在工艺路线区间的中点;
+    解码后按相同顺序与设备仿真(各工序尽早开工),得到不劣于原排程的方案
+    """
+    total_ops = simulator.total_ops
+    solution = np.zeros(total_ops * 2)
+    machine_lookup = {machine_id: idx for idx, machine_id in enumerate(simulator.machine_list)}
+    ordered = sorted(schedule, key=lambda s: (s['start_time'], s['stage_idx'], s['order_idx']))
+    for rank, record in enumerate(ordered):
+        op_idx = record['order_idx'] * simulator.num_stages + record['stage_idx']
+        solution[op_idx] = rank / total_ops * 0.9999
+        start = int(simulator._op_route_start[op_idx])
+        count = int(simulator._op_route_count[op_idx])
+        route = simulator.route_machines[start:start + count].tolist()
+        position = route.index(machine_lookup[record['machine_id']])
+        solution[total_ops + op_idx] = (position + 0.5) / count
+    return solution
+
+
+def dispatch_solution(simulator: FFSSimulator, rule: str = DEFAULT_RULE,
+                      atc_k: float = DEFAULT_ATC_K) -> np.ndarray:
+    """按调度规则排程并编码为染色体(用作GA初始种群的种子解)"""
+    _, schedule = dispatch_schedule(simulator, rule, atc_k)
+    return encode_schedule(simulator, schedule)
+
+
+def compare_rules(simulator: FFSSimulator, rules: Sequence[str] = DISPATCH_RULES,
+                  atc_k: float = DEFAULT_ATC_K) -> List[Dict]:
+    """
+    对各规则排程并评估,按适应度升序返回
+    [{'rule', 'fitness', 'total_tardiness', 'makespan_days', 'on_time_delivery_rate', 'time', 'result'}]
+    """
+    rows = []
+    for rule in rules:
+        start = time.time()
+        completion_times, schedule = dispatch_schedule(simulator, rule, atc_k)
+        elapsed = time.time() - start
+        result = simulator.evaluate_schedule(completion_times, schedule)
+        rows.append({
+            'rule': rule.upper(),
+            'fitness': result['fitness'],
+            'total_tardiness': result['total_tardiness'],
+            'makespan_days': result['kpis']['makespan_days'],
+            'on_time_delivery_rate': result['kpis']['on_time_delivery_rate'],
+            'time': elapsed,
+            'result': result,
+        })
+    rows.sort(key=lambda r: r['fitness'])
+    return rows
+
+
+def main(rule: str = DEFAULT_RULE, atc_k: float = DEFAULT_ATC_K,
+         columnar_format: Optional[str] = None, wait_export: bool = True,
+         data: Optional[Dict] = None, simulator: Optional[FFSSimulator] = None,
+         progress_callback: Optional[Callable[[Dict], None]] = None,
+         progress_interval: float = 0.0, seed: Optional[int] = None,
+         input_dir: str = '.', output_dir: str = '.',
+         control: Optional[SolverControl] = None, profile_every: Optional[int] = None,
+         include_plotlyjs: str = 'directory', history_db: Optional[str] = DEFAULT_HISTORY_DB) -> Dict:
+    """
+    调度规则求解入口(参数与返回值同run_ga.main,供常驻求解进程与Web作业调用)
+
+    参数:
+        rule: 调度规则,'all'表示比较全部规则并取适应度最优者
+        atc_k: ATC前瞻参数
+        seed, progress_interval, profile_every: 规则排程是确定性的一次构造,仅为接口一致而接受
+        其余参数同run_ga.main
+
+    返回:
+        {'best_position', 'best_fitness', 'result', 'export_handle', 'stop_reason', 'rule', 'rules'}
+    """
+    from data_preprocessor import DataPreprocessor, DEFAULT_CACHE_DIR
+    from run_ga import configure_objective
+    from visualize import export_results_async
+
+    if control is not None:
+        control.start()
+    start_time = time.time()
+    if data is None:
+        data = DataPreprocessor.from_directory(input_dir).process(cache_dir=DEFAULT_CACHE_DIR)
+    if simulator is None:
+        simulator = FFSSimulator(data)
+    # 与GA使用相同的目标配置,适应度可直接比较
+    configure_objective(simulator)
+
+    rules = DISPATCH_RULES if rule.lower() == 'all' else (rule,)
+    solve_start = time.time()
+    rows = compare_rules(simulator, rules, atc_k)
+    solve_time = time.time() - solve_start
+    best = rows[0]
+    print(f"\n📐 调度规则排程 ({solve_time * 1000:.1f} 毫秒):")
+    for row in rows:
+        print(f"  {'✓' if row is best else ' '} {row['rule']:<5} 适应度={row['fitness']:.4f} "
+              f"总加权拖期={row['total_tardiness']:.2f}天 准时率={row['on_time_delivery_rate']:.1f}% "
+              f"({row['time'] * 1000:.1f} 毫秒)")
+
+    result = best['result']
+    if progress_callback is not None:
+        progress_callback({
+            'algorithm': ALGORITHM_NAME,
+            'generation': 1,
+            'generations': 1,
+            'best_fitness': best['fitness'],
+            'evaluations': len(rows),
+            'evals_per_sec': len(rows) / solve_time if solve_time > 0 else 0.0,
+            'elapsed': solve_time,
+        })
+    export_handle = export_results_async(
+        result['completion_times'], result['schedule'], result['kpis'], data,
+        algorithm=ALGORITHM_NAME, output_dir=output_dir, columnar_format=columnar_format,
+        include_plotlyjs=include_plotlyjs, history_db=history_db,
+        run_params={
+            'rule': best['rule'], 'rules_compared': [r['rule'] for r in rows], 'atc_k': atc_k,
+            'best_fitness': best['fitness'], 'optimization_time': solve_time,
+        },
+    )
+    if wait_export:
+        export_handle.wait()
+        print(f"✅ 结果已导出 (schedule_*_{ALGORITHM_NAME}),总耗时: {time.time() - start_time:.2f} 秒")
+    return {
+        'best_position': encode_schedule(simulator, result['schedule']),
+        'best_fitness': best['fitness'],
+        'result': result,
+        'export_handle': export_handle,
+        'stop_reason': None,
+        'rule': best['rule'],
+        'rules': [{k: v for k, v in r.items() if k != 'result'} for r in rows],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FFS调度规则快速排程")
+    parser.add_argument('--rule', type=str.upper, choices=list(DISPATCH_RULES) + ['ALL'], default=DEFAULT_RULE,
+                        help='调度规则(ALL: 比较全部规则并导出最优者)')
+    parser.add_argument('--atc-k', type=float, default=DEFAULT_ATC_K, help='ATC前瞻参数k')
+    parser.add_argument('--columnar', choices=['arrow', 'parquet'], default=None, help='额外导出列式结果文件')
+    parser.add_argument('--input-dir', default='.', help='输入CSV所在目录')
+    parser.add_argument('--output-dir', default='.', help='结果文件输出目录')
+    parser.add_argument('--include-plotlyjs', default='directory',
+                        help="甘特图的plotly.js引用方式: directory(同目录复制)或共享脚本的路径/URL")
+    parser.add_argument('--history-db', default=DEFAULT_HISTORY_DB,
+                        help='运行历史库路径(相对路径相对于--output-dir,空字符串表示不记录)')
+    # 与GA/NSGA-II求解脚本一致的参数(Web回退模式统一传入); 规则排程为确定性一次构造,不使用
+    parser.add_argument('--seed', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--time-budget', type=float, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--profile-every', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    try:
+        main(rule=args.rule, atc_k=args.atc_k, columnar_format=args.columnar,
+             input_dir=args.input_dir, output_dir=args.output_dir, include_plotlyjs=args.include_plotlyjs,
+             history_db=args.history_db or None)
+    except Exception as e:
+        print(f"\n\n❌ 程序执行错误: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
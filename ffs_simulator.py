@@ -4,11 +4,61 @@ FFS调度仿真器
 严格遵循蓝图第3.3节的状态变量逻辑和约束强制执行机制
 """
 
+import time
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from mealpy import Problem, FloatVar
 
 
+# 适应度评估热路径的阶段(按执行顺序)
+PROFILE_PHASES = ('decode', 'sort', 'simulate', 'objective')
+
+
+class PhaseProfiler:
+    """
+    采样式阶段计时: 统计全部评估次数,每sample_every次评估对各阶段计时一次,
+    按采样均值估计各阶段总耗时
+    """
+    
+    def __init__(self, sample_every: int = 100):
+        self.sample_every = max(1, int(sample_every))
+        self.calls = 0
+        self.sampled = 0
+        self.phase_seconds = dict.fromkeys(PROFILE_PHASES, 0.0)
+    
+    def record(self, durations: Tuple[float, ...]):
+        """记录一次采样评估的各阶段耗时(顺序同PROFILE_PHASES)"""
+        self.sampled += 1
+        for phase, seconds in zip(PROFILE_PHASES, durations):
+            self.phase_seconds[phase] += seconds
+    
+    def summary(self) -> Dict:
+        """
+        返回:
+            {'evaluations', 'sampled', 'sample_every', 'per_eval_us': {阶段: 平均微秒},
+             'share': {阶段: 占比}, 'estimated_seconds': {阶段: 估计总秒数}}
+        """
+        sampled = max(self.sampled, 1)
+        per_eval = {phase: seconds / sampled for phase, seconds in self.phase_seconds.items()}
+        total = sum(per_eval.values())
+        return {
+            'evaluations': self.calls,
+            'sampled': self.sampled,
+            'sample_every': self.sample_every,
+            'per_eval_us': {phase: value * 1e6 for phase, value in per_eval.items()},
+            'share': {phase: (value / total if total > 0 else 0.0) for phase, value in per_eval.items()},
+            'estimated_seconds': {phase: value * self.calls for phase, value in per_eval.items()},
+        }
+    
+    def print_report(self, title: str = "仿真器热路径剖析"):
+        """打印各阶段平均耗时、占比与估计总耗时"""
+        summary = self.summary()
+        print(f"\n🔬 {title}: 评估 {summary['evaluations']} 次, 采样 {summary['sampled']} 次 (每 {self.sample_every} 次)")
+        for phase in PROFILE_PHASES:
+            print(f"  • {phase:<10} {summary['per_eval_us'][phase]:>10.1f} µs/次  "
+                  f"{summary['share'][phase] * 100:>5.1f}%  ≈{summary['estimated_seconds'][phase]:.2f} 秒")
+
+
 class FFSSimulator(Problem):
     """
     FFS调度问题仿真器(mealpy Problem类)
@@ -42,17 +92,22 @@ class FFSSimulator(Problem):
         self.stage_to_machines = data['stage_to_machines']
         self.op_k_map = data['op_k_map']
         
+        # 工艺路线CSR索引: 行号 = 路线组 * num_stages + stage_idx
+        self.route_ptr = data['route_ptr']
+        self.route_machines = data['route_machines']
+        self.order_route_group = data['order_route_group']
+        
         self.num_orders = data['num_orders']
         self.num_stages = data['num_stages']
         self.num_machines = data['num_machines']
         self.total_ops = self.num_orders * self.num_stages
+        self._build_op_arrays()
         
         # 染色体维度: OS(25) + MS(25) = 50
-        lb = [0.0] * (self.total_ops * 2)
-        bounds = []
-        for _ in range(self.total_ops * 2):
-            bounds.append(FloatVar(lb=0.0, ub=0.9999))
-        super().__init__(bounds=bounds, minmax="min", **kwargs)
+        # 以单个向量变量声明边界: mealpy为每个变量各建随机数生成器,solve(seed=...)会令逐维标量变量
+        # 生成完全相同的取值(常数染色体),向量变量则整条染色体共用一个生成器
+        n_dims = self.total_ops * 2
+        super().__init__(bounds=FloatVar(lb=np.zeros(n_dims), ub=np.full(n_dims, 0.9999)), minmax="min", **kwargs)
         
         # ========== 新增: 目标函数权重/偏好配置(默认较保守) ==========
         self.lambda_balance = 15.0                # 负载均衡惩罚系数
@@ -67,12 +122,56 @@ class FFSSimulator(Problem):
         self._precompute_processing_times()
         
         print(f"✅ FFSSimulator初始化完成")
-        print(f"  - 染色体维度: {len(lb)}")
+        print(f"  - 染色体维度: {n_dims}")
         print(f"  - 订单数: {self.num_orders}")
         print(f"  - 工序阶段数: {self.num_stages}")
         print(f"  - 设备数: {self.num_machines}")
         print(f"  - 总工序数: {self.total_ops}")
     
+    def update_orders(self, data: Dict, changed_orders: List[int]):
+        """
+        增量同步订单变化(配合DataPreprocessor.add_orders/remove_orders)
+        仅重算变化订单的缓存,不重建其余数据结构
+        
+        参数:
+            data: 变化后的预处理数据字典(DataPreprocessor.get_preprocessed_data())
+            changed_orders: 新增或内容变化的order_idx列表
+        """
+        self.data = data
+        self.order_list = data['order_list']
+        self.quantities = data['quantities']
+        self.due_dates = data['due_dates']
+        self.weights = data['weights']
+        self.machine_capacity = data['machine_capacity']
+        self.p_matrix = data['p_matrix']
+        self.op_k_map = data['op_k_map']
+        self.order_route_group = data['order_route_group']
+        
+        old_num_orders = self.num_orders
+        self.num_orders = data['num_orders']
+        self.total_ops = self.num_orders * self.num_stages
+        self._build_op_arrays()
+        
+        # 丢弃已移出末尾的订单缓存,重算变化订单
+        for order_idx in range(self.num_orders, old_num_orders):
+            for stage_idx in range(self.num_stages):
+                self._total_processing_times.pop((order_idx, stage_idx), None)
+        self._precompute_processing_times(changed_orders)
+        
+        if self.num_orders != old_num_orders:
+            n_dims = self.total_ops * 2
+            self.set_bounds(FloatVar(lb=np.zeros(n_dims), ub=np.full(n_dims, 0.9999)))
+    
+    def _build_op_arrays(self):
+        """按全局工序号(订单主序)预计算订单/工序/数量/路线行数组,供解码向量化使用"""
+        self._op_order = np.repeat(np.arange(self.num_orders), self.num_stages)
+        self._op_stage = np.tile(np.arange(self.num_stages), self.num_orders)
+        quantities = np.array([self.quantities[o] for o in self.order_list], dtype=np.float64)
+        self._op_quantity = quantities[self._op_order]
+        route_rows = np.asarray(self.order_route_group, dtype=np.int64)[self._op_order] * self.num_stages + self._op_stage
+        self._op_route_start = self.route_ptr[route_rows]
+        self._op_route_count = self.route_ptr[route_rows + 1] - self._op_route_start
+    
     def generate_edd_solution(self) -> np.ndarray:
         """
         生成基于EDD+SPT启发式的初始解
@@ -111,21 +210,18 @@ class FFSSimulator(Problem):
         
         return solution
     
-    def _precompute_processing_times(self):
-        """预计算每个订单每个工序的加工时间(考虑数量)"""
-        for order_idx, order_id in enumerate(self.order_list):
+    def _precompute_processing_times(self, order_indices: List[int] = None):
+        """预计算每个订单每个工序的加工时间(考虑数量); order_indices为空时计算全部订单"""
+        if order_indices is None:
+            order_indices = range(self.num_orders)
+        for order_idx in order_indices:
+            order_id = self.order_list[order_idx]
             qty = self.quantities[order_id]
+            # 不可用设备的加工时间为inf,按行取最小值即为可用设备中的最小加工时间
+            min_times = self.p_matrix[order_idx].min(axis=1)
             for stage_idx in range(self.num_stages):
-                key = (order_idx, stage_idx)
-                # 找到该工序可用的最小加工时间
-                available_machines = self.stage_to_machines[stage_idx]
-                min_time = np.inf
-                for machine_id in available_machines:
-                    machine_idx = self.machine_list.index(machine_id)
-                    time_per_unit = self.p_matrix[order_idx, stage_idx, machine_idx]
-                    if time_per_unit < np.inf:
-                        min_time = min(min_time, time_per_unit)
-                self._total_processing_times[key] = min_time * qty if min_time < np.inf else 0.0
+                min_time = min_times[stage_idx]
+                self._total_processing_times[(order_idx, stage_idx)] = min_time * qty if min_time < np.inf else 0.0
     
     def _decode_chromosome(self, chromosome: np.ndarray) -> Tuple[List, Dict]:
         """
@@ -139,54 +235,40 @@ class FFSSimulator(Problem):
             operations: 工序列表,每个元素为字典
             machine_assignment: {(order_idx, stage_idx): machine_id}
         """
-        # 分离OS和MS染色体
+        # 分离OS和MS染色体(兼容DEAP等以list表示的个体)
+        chromosome = np.asarray(chromosome, dtype=np.float64)
         os_chromosome = chromosome[:self.total_ops]
         ms_chromosome = chromosome[self.total_ops:]
         
-        # 解码MS染色体(机器分配)
-        machine_assignment = {}
-        for order_idx in range(self.num_orders):
-            for stage_idx in range(self.num_stages):
-                op_idx = order_idx * self.num_stages + stage_idx
-                m_value = ms_chromosome[op_idx]
-                
-                # 获取可用设备
-                available_machines = self.stage_to_machines[stage_idx]
-                if len(available_machines) == 0:
-                    raise ValueError(f"工序{stage_idx}没有可用设备!")
-                
-                # 区间映射选择设备
-                machine_idx_in_list = int(m_value * len(available_machines))
-                machine_idx_in_list = min(machine_idx_in_list, len(available_machines) - 1)
-                selected_machine_id = available_machines[machine_idx_in_list]
-                
-                machine_assignment[(order_idx, stage_idx)] = selected_machine_id
+        # 解码MS染色体(机器分配): 在工艺路线CSR行内区间映射,O(1)数组查表
+        counts = self._op_route_count
+        if not counts.all():
+            empty_op = int(np.argmin(counts))
+            raise ValueError(f"工序{self._op_stage[empty_op]}没有可用设备!")
+        positions = np.minimum((ms_chromosome * counts).astype(np.int64), counts - 1)
+        machine_indices = self.route_machines[self._op_route_start + positions]
+        
+        # 计算加工时间
+        processing_times = self.p_matrix[self._op_order, self._op_stage, machine_indices] * self._op_quantity
         
         # 构建工序列表
         operations = []
-        for order_idx in range(self.num_orders):
-            order_id = self.order_list[order_idx]
-            qty = self.quantities[order_id]
-            
-            for stage_idx in range(self.num_stages):
-                op_idx = order_idx * self.num_stages + stage_idx
-                r_value = os_chromosome[op_idx]
-                
-                machine_id = machine_assignment[(order_idx, stage_idx)]
-                machine_idx = self.machine_list.index(machine_id)
-                
-                # 计算加工时间
-                time_per_unit = self.p_matrix[order_idx, stage_idx, machine_idx]
-                processing_time = time_per_unit * qty
-                
-                operations.append({
-                    'order_idx': order_idx,
-                    'order_id': order_id,
-                    'stage_idx': stage_idx,
-                    'priority': r_value,  # OS基因值作为优先级
-                    'machine_id': machine_id,
-                    'processing_time': processing_time
-                })
+        machine_assignment = {}
+        machine_list = self.machine_list
+        order_list = self.order_list
+        for order_idx, stage_idx, machine_idx, r_value, processing_time in zip(
+                self._op_order.tolist(), self._op_stage.tolist(), machine_indices.tolist(),
+                os_chromosome.tolist(), processing_times.tolist()):
+            machine_id = machine_list[machine_idx]
+            machine_assignment[(order_idx, stage_idx)] = machine_id
+            operations.append({
+                'order_idx': order_idx,
+                'order_id': order_list[order_idx],
+                'stage_idx': stage_idx,
+                'priority': r_value,  # OS基因值作为优先级
+                'machine_id': machine_id,
+                'processing_time': processing_time
+            })
         
         return operations, machine_assignment
     
@@ -437,6 +519,71 @@ class FFSSimulator(Problem):
             print(f"❌ 多目标适应度评估错误: {e}")
             return [1e10, 0.0, 1e10]  # 返回极大惩罚值
     
+    def enable_profiling(self, sample_every: int = 100) -> PhaseProfiler:
+        """
+        开启热路径剖析: 以实例属性替换fit_func/pareto_fitness为计数+采样计时版本;
+        未开启时不经过任何剖析代码(零开销)
+        
+        参数:
+            sample_every: 每N次评估对各阶段计时一次
+        
+        返回:
+            PhaseProfiler(剖析期间持续累积)
+        """
+        self.profiler = PhaseProfiler(sample_every)
+        self.fit_func = self._profiled_fit_func
+        self.pareto_fitness = self._profiled_pareto_fitness
+        return self.profiler
+    
+    def disable_profiling(self) -> Optional[Dict]:
+        """关闭剖析并恢复原评估函数,返回剖析汇总(未开启时返回None)"""
+        profiler = self.__dict__.pop('profiler', None)
+        self.__dict__.pop('fit_func', None)
+        self.__dict__.pop('pareto_fitness', None)
+        return profiler.summary() if profiler is not None else None
+    
+    def _profiled_fit_func(self, solution: np.ndarray) -> float:
+        profiler = self.profiler
+        profiler.calls += 1
+        if profiler.calls % profiler.sample_every:
+            return FFSSimulator.fit_func(self, solution)
+        try:
+            total_tardiness, penalty = self._timed_evaluation(solution)[:2]
+            return total_tardiness + penalty
+        except Exception as e:
+            print(f"❌ 适应度评估错误: {e}")
+            return 1e10
+    
+    def _profiled_pareto_fitness(self, solution: np.ndarray) -> List[float]:
+        profiler = self.profiler
+        profiler.calls += 1
+        if profiler.calls % profiler.sample_every:
+            return FFSSimulator.pareto_fitness(self, solution)
+        try:
+            total_tardiness, penalty, makespan, utilization = self._timed_evaluation(solution, multi_objective=True)
+            return [total_tardiness + penalty, -utilization, makespan]
+        except Exception as e:
+            print(f"❌ 多目标适应度评估错误: {e}")
+            return [1e10, 0.0, 1e10]
+    
+    def _timed_evaluation(self, solution: np.ndarray, multi_objective: bool = False) -> Tuple:
+        """与fit_func/pareto_fitness相同的评估流程,逐阶段计时并记入profiler"""
+        t0 = time.perf_counter()
+        operations, _ = self._decode_chromosome(solution)
+        t1 = time.perf_counter()
+        sorted_operations = self._sort_with_precedence(operations)
+        t2 = time.perf_counter()
+        completion_times, schedule = self._simulate_schedule(sorted_operations)
+        t3 = time.perf_counter()
+        total_tardiness, penalty = self._calculate_objective(completion_times, schedule)
+        makespan = utilization = None
+        if multi_objective:
+            makespan = max(completion_times.values()) / 86400.0 if completion_times else 0.0
+            utilization = self._calculate_avg_utilization(schedule)
+        t4 = time.perf_counter()
+        self.profiler.record((t1 - t0, t2 - t1, t3 - t2, t4 - t3))
+        return total_tardiness, penalty, makespan, utilization
+    
     def fit_func(self, solution: np.ndarray) -> float:
         """
         适应度函数(mealpy接口)
@@ -480,6 +627,19 @@ class FFSSimulator(Problem):
         operations, machine_assignment = self._decode_chromosome(solution)
         sorted_operations = self._sort_with_precedence(operations)
         completion_times, schedule = self._simulate_schedule(sorted_operations)
+        return self.evaluate_schedule(completion_times, schedule)
+    
+    def evaluate_schedule(self, completion_times: Dict, schedule: List) -> Dict:
+        """
+        评估给定的调度方案(如由聚合模型拆分得到的订单级调度)
+        
+        参数:
+            completion_times: {order_idx: completion_time_in_seconds}
+            schedule: 调度记录列表(字段同_simulate_schedule)
+        
+        返回:
+            result: 包含适应度、调度方案、KPI等的字典
+        """
         total_tardiness, penalty = self._calculate_objective(completion_times, schedule)
         
         # 计算KPI
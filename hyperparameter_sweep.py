@@ -0,0 +1,523 @@
+"""
+超参数搜索
+功能: 对GA(种群规模、交叉/变异概率、锦标赛比例及目标函数权重lambda_*)与NSGA-II(种群规模、交叉/变异概率、
+SBX/多项式变异分布指数)做网格搜索、随机搜索或逐次减半(successive halving)搜索;
+试验在进程池中并行运行,全部试验共用一份预处理数据(每个工作进程只接收并构建一次);
+网格/随机搜索按中位数停止规则提前淘汰: 在检查点(预算的25%/50%/75%代)上劣于已完成试验同一检查点中位数的试验提前结束;
+结果按得分排序写出CSV
+
+得分: 试验最优解在GA主流程目标配置(configure_objective)下的适应度(拖期 + 惩罚,越小越好),
+因此搜索目标函数权重或比较GA与NSGA-II时,各试验得分仍可直接比较
+
+用法:
+    python hyperparameter_sweep.py --algorithm GA --method random --trials 20 --budget 60 --seeds 2
+    python hyperparameter_sweep.py --algorithm GA --method halving --trials 27 --min-budget 5 --budget 100 \\
+        --param pc=0.6:0.95 --param pm=0.05:0.4 --param pop_size=40:160:int
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import math
+import multiprocessing
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_preprocessor import DEFAULT_CACHE_DIR, DataPreprocessor
+from ffs_simulator import FFSSimulator
+from solver_control import SolverControl
+
+DEFAULT_OUTPUT_DIR = 'sweep_results'
+METHODS = ('grid', 'random', 'halving')
+# 默认搜索空间: 列表为候选值,(下限, 上限, 类型)为连续范围(类型: float/int/log)
+DEFAULT_SPACES = {
+    'GA': {
+        'pop_size': [50, 100, 150],
+        'pc': [0.6, 0.8, 0.9],
+        'pm': [0.1, 0.2, 0.3],
+        'k_tourn_frac': [0.1, 0.2, 0.3],
+        'lambda_balance': [15.0, 30.0, 60.0],
+        'lambda_utilization': [0.0, 8.0, 16.0],
+    },
+    'NSGA2': {
+        'pop_size': [40, 80, 120],
+        'cxpb': [0.7, 0.9],
+        'mutpb': [0.1, 0.3],
+        'eta_crossover': [10.0, 20.0, 30.0],
+        'eta_mutation': [10.0, 20.0, 30.0],
+    },
+}
+# 各算法可搜索的参数; 仿真器目标参数在configure_objective之后覆盖
+ALGORITHM_PARAMS = {
+    'GA': ('pop_size', 'pc', 'pm', 'k_tourn_frac'),
+    'NSGA2': ('pop_size', 'cxpb', 'mutpb', 'eta_crossover', 'eta_mutation'),
+}
+OBJECTIVE_PARAMS = ('lambda_balance', 'lambda_utilization', 'target_avg_util', 'lambda_preferred',
+                    'target_preferred_ratio')
+INT_PARAMS = {'pop_size'}
+# 默认预算(代数)与中位数停止规则的检查点(占预算比例)
+DEFAULT_BUDGETS = {'GA': 100, 'NSGA2': 200}
+CHECKPOINT_FRACTIONS = (0.25, 0.5, 0.75)
+STATUS_COMPLETED = 'completed'
+STATUS_PRUNED = 'pruned'
+STATUS_ELIMINATED = 'eliminated'
+STATUS_FAILED = 'failed'
+
+# 工作进程状态: 预处理数据与复用的仿真器(试验仿真器 + 参照目标仿真器)
+_worker: Dict = {}
+
+
+def parse_param(text: str) -> Tuple[str, object]:
+    """
+    解析命令行参数空间 name=spec
+
+    spec格式:
+        0.6,0.8,0.9     候选值列表
+        0.05:0.4        均匀分布范围
+        40:160:int      整数范围
+        1:100:log       对数均匀范围
+    """
+    name, sep, spec = text.partition('=')
+    if not sep or not spec:
+        raise ValueError(f"参数格式应为 name=spec: {text}")
+    name = name.strip()
+    if ':' in spec:
+        parts = spec.split(':')
+        kind = parts[2] if len(parts) > 2 else ('int' if name in INT_PARAMS else 'float')
+        if len(parts) > 3 or kind not in ('float', 'int', 'log'):
+            raise ValueError(f"范围格式应为 下限:上限[:float|int|log]: {text}")
+        low, high = float(parts[0]), float(parts[1])
+        if low > high or (kind == 'log' and low <= 0):
+            raise ValueError(f"无效范围: {text}")
+        return name, (low, high, kind)
+    values = [float(v) for v in spec.split(',')]
+    if name in INT_PARAMS:
+        values = [int(v) for v in values]
+    return name, values
+
+
+def _validate_space(algorithm: str, space: Dict[str, object]):
+    allowed = set(ALGORITHM_PARAMS[algorithm]) | set(OBJECTIVE_PARAMS)
+    unknown = sorted(set(space) - allowed)
+    if unknown:
+        raise ValueError(f"{algorithm} 不支持的参数: {unknown} (可选: {sorted(allowed)})")
+
+
+def _valid_config(algorithm: str, config: Dict) -> bool:
+    # deap.algorithms.varOr要求交叉与变异概率之和不超过1
+    if algorithm == 'NSGA2':
+        return config.get('cxpb', 0.9) + config.get('mutpb', 0.1) <= 1.0
+    return True
+
+
+def grid_configs(algorithm: str, space: Dict[str, object]) -> List[Dict]:
+    """网格搜索: 全部候选值组合(范围参数不能用于网格搜索)"""
+    ranged = [name for name, spec in space.items() if isinstance(spec, tuple)]
+    if ranged:
+        raise ValueError(f"网格搜索需要候选值列表,以下参数为范围: {ranged}")
+    names = list(space)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+    return [c for c in configs if _valid_config(algorithm, c)]
+
+
+def random_configs(algorithm: str, space: Dict[str, object], n: int, seed: int = 0) -> List[Dict]:
+    """随机搜索: 从候选值/范围中独立采样n组不重复的配置"""
+    rng = random.Random(seed)
+    configs, seen = [], set()
+    for _ in range(n * 100):
+        if len(configs) >= n:
+            break
+        config = {}
+        for name, spec in space.items():
+            if isinstance(spec, tuple):
+                low, high, kind = spec
+                if kind == 'int':
+                    config[name] = rng.randint(int(low), int(high))
+                elif kind == 'log':
+                    config[name] = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    config[name] = rng.uniform(low, high)
+            else:
+                config[name] = rng.choice(spec)
+        key = tuple(sorted(config.items()))
+        if key in seen or not _valid_config(algorithm, config):
+            continue
+        seen.add(key)
+        configs.append(config)
+    return configs
+
+
+def _init_worker(data: Dict):
+    from run_ga import configure_objective
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator = FFSSimulator(data, log_to=None)
+        reference = FFSSimulator(data, log_to=None)
+    configure_objective(simulator)
+    configure_objective(reference)
+    _worker['simulator'] = simulator
+    _worker['reference'] = reference
+    _worker['objective_defaults'] = {name: getattr(reference, name) for name in OBJECTIVE_PARAMS}
+
+
+class _BestTracker:
+    """以实例属性替换fit_func/pareto_fitness(同FFSSimulator.enable_profiling),保留标量目标最优的染色体"""
+
+    def __init__(self, simulator: FFSSimulator):
+        self.simulator = simulator
+        self.best = math.inf
+        self.solution: Optional[np.ndarray] = None
+
+    def attach(self):
+        self.simulator.fit_func = self._fit_func
+        self.simulator.pareto_fitness = self._pareto_fitness
+
+    def detach(self):
+        self.simulator.__dict__.pop('fit_func', None)
+        self.simulator.__dict__.pop('pareto_fitness', None)
+
+    def _update(self, solution, value: float):
+        if value < self.best:
+            self.best = value
+            self.solution = np.array(solution, dtype=float)
+
+    def _fit_func(self, solution: np.ndarray) -> float:
+        value = FFSSimulator.fit_func(self.simulator, solution)
+        self._update(solution, value)
+        return value
+
+    def _pareto_fitness(self, solution: np.ndarray) -> List[float]:
+        objectives = FFSSimulator.pareto_fitness(self.simulator, solution)
+        self._update(solution, objectives[0])
+        return objectives
+
+
+def _run_ga(simulator: FFSSimulator, config: Dict, budget: int, progress_callback, control: SolverControl):
+    from run_ga import run_ga_optimization
+    run_ga_optimization(
+        simulator, pop_size=int(config.get('pop_size', 100)), epochs=budget,
+        pc=config.get('pc', 0.8), pm=config.get('pm', 0.2), k_tourn_frac=config.get('k_tourn_frac', 0.2),
+        verbose=False, progress_callback=progress_callback, control=control,
+    )
+
+
+def _run_nsga2(simulator: FFSSimulator, config: Dict, budget: int, progress_callback, control: SolverControl):
+    import run_nsga2
+    run_nsga2.simulator = simulator
+    pop_size = int(config.get('pop_size', run_nsga2.POPULATION_SIZE))
+    toolbox = run_nsga2.build_toolbox(simulator.total_ops * 2, eta_crossover=config.get('eta_crossover', 20.0),
+                                      eta_mutation=config.get('eta_mutation', 20.0))
+    population = toolbox.population(n=pop_size)
+    for ind in population:
+        ind.fitness.values = toolbox.evaluate(ind)
+    run_nsga2.ea_mu_plus_lambda(
+        population, toolbox, mu=pop_size, lambda_=pop_size,
+        cxpb=config.get('cxpb', run_nsga2.CROSSOVER_PROB), mutpb=config.get('mutpb', run_nsga2.MUTATION_PROB),
+        ngen=budget, verbose=False, progress_callback=progress_callback, control=control,
+    )
+
+
+def run_trial(algorithm: str, config: Dict, seed: int, budget: int,
+              checkpoint_medians: Optional[Dict[int, Optional[float]]] = None,
+              time_limit: Optional[float] = None) -> Dict:
+    """
+    运行一次试验(进程池任务,使用工作进程内复用的仿真器)
+
+    参数:
+        config: 参数配置(未给出的参数使用run_ga/run_nsga2的默认值)
+        budget: 代数
+        checkpoint_medians: 可选,{检查点代数: 已完成试验在该检查点得分的中位数(None表示尚无足够样本)};
+                            试验在检查点得分劣于中位数时提前结束(pruned)
+        time_limit: 可选,单次试验时间上限(秒)
+
+    返回:
+        {'score', 'total_tardiness', 'status', 'pruned_at', 'checkpoints': {代数: 得分},
+         'generations', 'elapsed', 'error'}
+    """
+    simulator, reference = _worker['simulator'], _worker['reference']
+    result = {'score': None, 'total_tardiness': None, 'status': STATUS_COMPLETED, 'pruned_at': None,
+              'checkpoints': {}, 'generations': 0, 'elapsed': 0.0, 'error': None}
+    objective = dict(_worker['objective_defaults'])
+    objective.update({k: v for k, v in config.items() if k in OBJECTIVE_PARAMS})
+    for name, value in objective.items():
+        setattr(simulator, name, value)
+
+    tracker = _BestTracker(simulator)
+    control = SolverControl(time_budget=time_limit)
+    checkpoint_medians = checkpoint_medians or {}
+
+    def on_progress(progress: Dict):
+        generation = progress['generation']
+        result['generations'] = generation
+        result['elapsed'] = progress['elapsed']
+        if generation not in checkpoint_medians or tracker.solution is None:
+            return
+        score = reference.fit_func(tracker.solution)
+        result['checkpoints'][generation] = score
+        median = checkpoint_medians[generation]
+        if median is not None and score > median:
+            result['status'] = STATUS_PRUNED
+            result['pruned_at'] = generation
+            control.cancel()
+
+    np.random.seed(seed)
+    random.seed(seed)
+    tracker.attach()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if algorithm == 'GA':
+                _run_ga(simulator, config, budget, on_progress, control)
+            else:
+                _run_nsga2(simulator, config, budget, on_progress, control)
+    except Exception as e:
+        result['status'] = STATUS_FAILED
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        tracker.detach()
+    if tracker.solution is not None:
+        evaluation = reference.evaluate_solution(tracker.solution)
+        result['score'] = evaluation['fitness']
+        result['total_tardiness'] = evaluation['total_tardiness']
+    return result
+
+
+def _checkpoints(budget: int) -> List[int]:
+    return sorted({round(budget * f) for f in CHECKPOINT_FRACTIONS} - {0, budget})
+
+
+class _TrialPool:
+    """
+    试验调度: 进程池中最多保持jobs个试验在运行,完成一个再提交下一个,
+    使后提交的试验能使用已完成试验的检查点中位数
+    """
+
+    def __init__(self, data: Dict, jobs: int):
+        self.jobs = jobs
+        self.executor = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_init_worker, initargs=(data,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.executor.shutdown(cancel_futures=True)
+        return False
+
+    def run(self, algorithm: str, trials: List[Tuple[int, Dict, int]], budget: int,
+            prune_after: Optional[int] = None, time_limit: Optional[float] = None,
+            label: str = '') -> List[Dict]:
+        """
+        运行一批试验 [(配置编号, 配置, 种子)]
+
+        参数:
+            prune_after: 启用中位数停止规则时,检查点需已有的完成试验数(None表示不提前淘汰)
+        """
+        checkpoints = _checkpoints(budget) if prune_after else []
+        checkpoint_scores = {g: [] for g in checkpoints}
+        results: List[Optional[Dict]] = [None] * len(trials)
+        pending = {}
+        queue = list(enumerate(trials))
+
+        def medians():
+            return {g: float(np.median(scores)) if len(scores) >= prune_after else None
+                    for g, scores in checkpoint_scores.items()}
+
+        while queue or pending:
+            while queue and len(pending) < self.jobs:
+                index, (config_id, config, seed) = queue.pop(0)
+                future = self.executor.submit(run_trial, algorithm, config, seed, budget,
+                                              medians() if checkpoints else None, time_limit)
+                pending[future] = index
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                config_id, config, seed = trials[index]
+                result = dict(future.result(), config_id=config_id, seed=seed, budget=budget, **config)
+                results[index] = result
+                if result['status'] == STATUS_COMPLETED:
+                    for generation, score in result['checkpoints'].items():
+                        checkpoint_scores[generation].append(score)
+                _print_trial(label, result, config)
+        return results
+
+
+def _print_trial(label: str, result: Dict, config: Dict):
+    params = ' '.join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in config.items())
+    if result['status'] == STATUS_FAILED:
+        print(f"  ❌ {label}#{result['config_id']:<3} seed={result['seed']} {params}: {result['error']}")
+        return
+    mark = '✂️' if result['status'] == STATUS_PRUNED else '✓'
+    score = f"{result['score']:.4f}" if result['score'] is not None else '-'
+    suffix = f" (第{result['pruned_at']}代淘汰)" if result['status'] == STATUS_PRUNED else ''
+    print(f"  {mark} {label}#{result['config_id']:<3} seed={result['seed']} 得分={score}{suffix} | {params}")
+
+
+def _summarize(configs: List[Dict], results: List[Dict]) -> pd.DataFrame:
+    """按配置汇总各种子的试验: 均值/标准差; 任一种子被淘汰或失败时该配置记为相应状态"""
+    rows = []
+    for config_id, config in enumerate(configs):
+        trials = [r for r in results if r['config_id'] == config_id]
+        if not trials:
+            continue
+        scores = [r['score'] for r in trials if r['score'] is not None]
+        statuses = {r['status'] for r in trials}
+        status = next((s for s in (STATUS_FAILED, STATUS_PRUNED) if s in statuses), STATUS_COMPLETED)
+        rows.append({
+            'config_id': config_id, 'status': status, 'budget': trials[0]['budget'],
+            **config,
+            'score_mean': float(np.mean(scores)) if scores else None,
+            'score_std': float(np.std(scores)) if len(scores) > 1 else 0.0,
+            'total_tardiness_mean': float(np.mean([r['total_tardiness'] for r in trials
+                                                   if r['total_tardiness'] is not None] or [np.nan])),
+            'seeds': len(trials),
+            'pruned_at': min((r['pruned_at'] for r in trials if r['pruned_at']), default=None),
+            'elapsed_mean': float(np.mean([r['elapsed'] for r in trials])),
+        })
+    return pd.DataFrame(rows)
+
+
+def _rank(table: pd.DataFrame) -> pd.DataFrame:
+    """排序: 完成的配置在前(逐次减半时预算高者在前),同组按平均得分升序"""
+    order = {STATUS_COMPLETED: 0, STATUS_ELIMINATED: 1, STATUS_PRUNED: 2, STATUS_FAILED: 3}
+    table = table.assign(_status=table['status'].map(order), _budget=-table['budget'])
+    table = table.sort_values(['_status', '_budget', 'score_mean'], na_position='last', kind='stable')
+    table = table.drop(columns=['_status', '_budget']).reset_index(drop=True)
+    table.insert(0, 'rank', range(1, len(table) + 1))
+    return table
+
+
+def run_sweep(algorithm: str, data: Dict, method: str = 'random', space: Optional[Dict[str, object]] = None,
+              trials: int = 20, seeds: Sequence[int] = (0,), budget: Optional[int] = None,
+              min_budget: int = 5, eta: int = 3, prune: bool = True, prune_after: int = 5,
+              time_limit: Optional[float] = None, jobs: Optional[int] = None,
+              sample_seed: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    运行超参数搜索
+
+    参数:
+        algorithm: 'GA' / 'NSGA2'
+        data: 预处理后的数据字典(所有试验共用)
+        method: 'grid' / 'random' / 'halving'(逐次减半: 从随机配置开始,每轮预算×eta,保留前1/eta)
+        space: 搜索空间 {参数: 候选值列表 或 (下限, 上限, 'float'|'int'|'log')},默认DEFAULT_SPACES
+        trials: 随机搜索/逐次减半的初始配置数
+        seeds: 每个配置运行的随机种子(各配置使用相同种子)
+        budget: 完整预算(代数),默认GA 100 / NSGA-II 200
+        min_budget, eta: 逐次减半的起始预算与淘汰比例
+        prune, prune_after: 网格/随机搜索是否启用中位数停止规则,及启用前需完成的试验数
+        time_limit: 单次试验时间上限(秒)
+        jobs: 并行进程数(默认CPU核数)
+
+    返回:
+        (排序后的配置结果表, 全部试验明细表)
+    """
+    if algorithm not in ALGORITHM_PARAMS:
+        raise ValueError(f"未知算法: {algorithm}")
+    if method not in METHODS:
+        raise ValueError(f"未知搜索方法: {method} (可选: {METHODS})")
+    space = dict(DEFAULT_SPACES[algorithm] if space is None else space)
+    _validate_space(algorithm, space)
+    budget = budget or DEFAULT_BUDGETS[algorithm]
+    if method == 'grid':
+        configs = grid_configs(algorithm, space)
+    else:
+        configs = random_configs(algorithm, space, trials, sample_seed)
+    if not configs:
+        raise ValueError("搜索空间中没有有效配置")
+    seeds = list(seeds)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(configs) * len(seeds)))
+    print(f"🔍 {algorithm} {method} 搜索: {len(configs)} 组配置 × {len(seeds)} 个种子, 预算 {budget} 代, 并行 {jobs} 进程")
+
+    all_results = []
+    with _TrialPool(data, jobs) as pool:
+        if method != 'halving':
+            tasks = [(i, config, seed) for i, config in enumerate(configs) for seed in seeds]
+            all_results = pool.run(algorithm, tasks, budget, prune_after if prune else None, time_limit,
+                                   label=algorithm)
+            table = _summarize(configs, all_results)
+        else:
+            rung_budgets = []
+            rung_budget = min(min_budget, budget)
+            while rung_budget < budget:
+                rung_budgets.append(rung_budget)
+                rung_budget *= eta
+            rung_budgets.append(budget)
+            survivors = list(range(len(configs)))
+            rows = {}
+            for rung, rung_budget in enumerate(rung_budgets):
+                print(f"\n📶 第{rung + 1}/{len(rung_budgets)}轮: {len(survivors)} 组配置, 预算 {rung_budget} 代")
+                tasks = [(i, configs[i], seed) for i in survivors for seed in seeds]
+                results = pool.run(algorithm, tasks, rung_budget, time_limit=time_limit, label=f"R{rung + 1}")
+                for r in results:
+                    r['rung'] = rung + 1
+                all_results.extend(results)
+                rung_table = _summarize(configs, results).sort_values('score_mean', na_position='last',
+                                                                      kind='stable')
+                keep = len(survivors) if rung == len(rung_budgets) - 1 else max(1, len(survivors) // eta)
+                for position, row in enumerate(rung_table.to_dict('records')):
+                    if position >= keep and row['status'] == STATUS_COMPLETED:
+                        row['status'] = STATUS_ELIMINATED
+                    rows[row['config_id']] = dict(row, rung=rung + 1)
+                survivors = [row['config_id'] for row in rung_table.to_dict('records')[:keep]
+                             if row['status'] != STATUS_FAILED]
+                if not survivors:
+                    break
+            table = pd.DataFrame(list(rows.values()))
+    return _rank(table), pd.DataFrame(all_results).drop(columns=['checkpoints'], errors='ignore')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GA/NSGA-II超参数搜索(网格/随机/逐次减半,并行,提前淘汰)")
+    parser.add_argument('--algorithm', choices=list(ALGORITHM_PARAMS), default='GA', help='求解算法')
+    parser.add_argument('--method', choices=METHODS, default='random', help='搜索方法')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=SPEC',
+                        help='搜索空间(可多次指定,替代默认空间): 0.6,0.8 候选值 / 0.05:0.4 范围 / '
+                             '40:160:int 整数范围 / 1:100:log 对数范围')
+    parser.add_argument('--trials', type=int, default=20, help='随机搜索/逐次减半的配置数')
+    parser.add_argument('--seeds', type=int, default=1, help='每个配置运行的种子数(种子0..N-1)')
+    parser.add_argument('--budget', type=int, default=None, help='完整预算(代数,默认GA 100 / NSGA-II 200)')
+    parser.add_argument('--min-budget', type=int, default=5, help='逐次减半的起始预算(代数)')
+    parser.add_argument('--eta', type=int, default=3, help='逐次减半每轮保留前1/eta的配置')
+    parser.add_argument('--no-prune', action='store_true', help='网格/随机搜索不按中位数规则提前淘汰')
+    parser.add_argument('--prune-after', type=int, default=5, help='中位数规则生效前需完成的试验数')
+    parser.add_argument('--time-limit', type=float, default=None, help='单次试验时间上限(秒)')
+    parser.add_argument('--jobs', type=int, default=None, help='并行进程数(默认CPU核数)')
+    parser.add_argument('--sample-seed', type=int, default=0, help='随机采样配置的种子')
+    parser.add_argument('--input-dir', default='.', help='输入CSV所在目录')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='结果输出目录')
+    parser.add_argument('--top', type=int, default=10, help='打印排名前N的配置')
+    args = parser.parse_args()
+
+    space = dict(parse_param(text) for text in args.param) if args.param else None
+
+    # 预处理只做一次,数据随进程池初始化传给各工作进程
+    print("📥 加载并预处理数据...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = DataPreprocessor.from_directory(args.input_dir).process(cache_dir=DEFAULT_CACHE_DIR)
+    print(f"  ✓ {data['num_orders']} 个订单, {data['num_stages']} 道工序, {data['num_machines']} 台设备")
+
+    table, trials = run_sweep(
+        args.algorithm, data, method=args.method, space=space, trials=args.trials,
+        seeds=range(args.seeds), budget=args.budget, min_budget=args.min_budget, eta=args.eta,
+        prune=not args.no_prune, prune_after=args.prune_after, time_limit=args.time_limit,
+        jobs=args.jobs, sample_seed=args.sample_seed,
+    )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    prefix = os.path.join(args.output_dir, f"sweep_{args.algorithm}_{args.method}")
+    table.to_csv(f"{prefix}.csv", index=False, encoding='utf-8-sig')
+    trials.to_csv(f"{prefix}_trials.csv", index=False, encoding='utf-8-sig')
+
+    print(f"\n🏆 排名前 {args.top} 的配置(得分越小越好):")
+    print(table.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    print("\n📁 输出文件:")
+    print(f"  ✓ {prefix}.csv")
+    print(f"  ✓ {prefix}_trials.csv")
+
+
+if __name__ == "__main__":
+    main()
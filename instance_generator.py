@@ -0,0 +1,259 @@
+"""
+FFS算例生成器
+功能: 按订单数、工序数、每工序设备数、交期紧度、优先级构成与数量分布生成可复现的合成算例,
+输出DataPreprocessor读取的三个输入CSV(订单数据/工序加工时间/设备可用时间,格式同样例数据);
+预设若干命名规模档位(TIERS),供基准测试、Web端压测与算法对比使用
+
+工序加工时间表沿用流水线格式: 每个工序有"<工序名>设备"类型的若干台设备,
+Line_N行给出该工序第N台设备的单位加工时间(DataPreprocessor按Line_N → 第N台设备推断工艺路线)
+
+用法:
+    python instance_generator.py data/medium --tier medium --seed 1
+    python instance_generator.py data/custom --orders 2000 --stages 6 --machines-per-stage 3 --due-tightness 0.6
+"""
+
+import argparse
+import math
+import os
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from data_preprocessor import BASE_DATE, DEFAULT_MACHINES_FILE, DEFAULT_ORDERS_FILE, \
+    DEFAULT_PROCESS_TIMES_FILE, STAGE_MACHINE_TYPE_SUFFIX
+
+# 优先级标签(DataPreprocessor按P1/紧急 → 1.4, P4/低 → 0.8, 其余 → 1.0解析权重)
+DEFAULT_PRIORITY_MIX = {'P1-紧急': 0.15, 'P2-高': 0.15, 'P3-中': 0.5, 'P4-低': 0.2}
+QUANTITY_DISTRIBUTIONS = ('lognormal', 'uniform', 'fixed')
+
+# 命名规模档位: 未列出的参数取generate_instance的默认值
+TIERS = {
+    'sample': {'num_orders': 5, 'num_stages': 5, 'machines_per_stage': 2},
+    'small': {'num_orders': 50, 'num_stages': 5, 'machines_per_stage': 2},
+    'medium': {'num_orders': 500, 'num_stages': 5, 'machines_per_stage': 3},
+    'large': {'num_orders': 5000, 'num_stages': 6, 'machines_per_stage': 4},
+    'xlarge': {'num_orders': 50000, 'num_stages': 8, 'machines_per_stage': 6},
+    # 交期紧张、紧急订单占比高的中等规模算例(拖期优化压力测试)
+    'medium_tight': {'num_orders': 500, 'num_stages': 5, 'machines_per_stage': 3, 'due_tightness': 0.7,
+                     'priority_mix': {'P1-紧急': 0.4, 'P2-高': 0.2, 'P3-中': 0.3, 'P4-低': 0.1}},
+    # 设备数不均衡的瓶颈算例(第3道工序仅1台设备)
+    'bottleneck': {'num_orders': 500, 'num_stages': 5, 'machines_per_stage': [3, 3, 1, 3, 3]},
+}
+
+
+def _quantities(rng: np.random.Generator, num_orders: int, distribution: str, mean: float,
+                sigma: float, quantity_range: Sequence[int]) -> np.ndarray:
+    low, high = quantity_range
+    if distribution == 'lognormal':
+        # 以mean为中位数的对数正态分布(右偏,少量大单)
+        values = rng.lognormal(math.log(mean), sigma, num_orders)
+    elif distribution == 'uniform':
+        values = rng.uniform(low, high, num_orders)
+    elif distribution == 'fixed':
+        values = np.full(num_orders, float(mean))
+    else:
+        raise ValueError(f"未知数量分布: {distribution} (可选: {', '.join(QUANTITY_DISTRIBUTIONS)})")
+    return np.clip(np.round(values), low, high).astype(int)
+
+
+def generate_instance(output_dir: str, num_orders: int = 50, num_stages: int = 5,
+                      machines_per_stage: Union[int, Sequence[int]] = 2,
+                      due_tightness: float = 0.3, due_range: float = 0.6,
+                      priority_mix: Optional[Dict[str, float]] = None,
+                      quantity_distribution: str = 'lognormal', quantity_mean: float = 3000,
+                      quantity_sigma: float = 0.6, quantity_range: Sequence[int] = (100, 20000),
+                      num_products: int = 5, unit_time_range: Sequence[float] = (8.0, 25.0),
+                      machine_speed_spread: float = 0.1, daily_minutes_range: Sequence[float] = (1290.0, 1320.0),
+                      seed: Optional[int] = 0) -> Dict:
+    """
+    生成一个算例并写出三个输入CSV
+
+    参数:
+        output_dir: 输出目录
+        num_orders: 订单数
+        num_stages: 工序数
+        machines_per_stage: 每道工序的并行设备数(整数,或按工序给出的列表)
+        due_tightness: 交期紧度τ(0~1,越大越紧); 交期 ≈ 估计完工期 × (1 - τ ± due_range/2)
+        due_range: 交期分散度R(交期在估计完工期的 (1-τ-R/2) ~ (1-τ+R/2) 倍间均匀分布)
+        priority_mix: {优先级标签: 占比},默认DEFAULT_PRIORITY_MIX
+        quantity_distribution: 订单数量分布 'lognormal'(中位数quantity_mean,对数标准差quantity_sigma)/
+                               'uniform'(quantity_range内均匀)/'fixed'(均为quantity_mean)
+        quantity_range: 数量上下限(片)
+        num_products: 产品类型数
+        unit_time_range: 各工序基准单位加工时间范围(秒/片)
+        machine_speed_spread: 同工序设备间的速度差异(单位加工时间在基准值 ±该比例内浮动)
+        daily_minutes_range: 设备单日可用时间范围(分钟)
+        seed: 随机种子(相同参数与种子生成相同文件)
+
+    返回:
+        算例摘要 {'output_dir', 'files', 'num_orders', 'num_stages', 'num_machines',
+                  'estimated_makespan_days', 'due_days': (最早, 最晚), 'seed', 'params'}
+    """
+    if num_orders < 1 or num_stages < 1:
+        raise ValueError("订单数与工序数必须为正")
+    if isinstance(machines_per_stage, int):
+        machines_per_stage = [machines_per_stage] * num_stages
+    machines_per_stage = [int(m) for m in machines_per_stage]
+    if len(machines_per_stage) != num_stages or min(machines_per_stage) < 1:
+        raise ValueError("machines_per_stage须为正整数,或长度等于工序数的正整数列表")
+    priority_mix = priority_mix or DEFAULT_PRIORITY_MIX
+    rng = np.random.default_rng(seed)
+
+    # 工序与设备: 工序k的设备类型为"<工序名>设备",设备ID全局连续编号
+    stage_names = [f"工序{k + 1:02d}" for k in range(num_stages)]
+    machine_rows = []
+    process_rows = []
+    stage_capacity = []
+    mean_unit_times = []
+    for stage, count in zip(stage_names, machines_per_stage):
+        base_time = rng.uniform(*unit_time_range)
+        unit_times = base_time * rng.uniform(1 - machine_speed_spread, 1 + machine_speed_spread, count)
+        daily_minutes = rng.uniform(*daily_minutes_range, count)
+        for line_no, (unit_time, minutes) in enumerate(zip(unit_times, daily_minutes), start=1):
+            machine_rows.append({
+                '设备ID': f"EQ-{len(machine_rows) + 1:03d}",
+                '设备类型': f"{stage}{STAGE_MACHINE_TYPE_SUFFIX}",
+                '可用时间(分钟)': round(float(minutes), 2),
+            })
+            process_rows.append({
+                '流水线': f"Line_{line_no}",
+                '工序': stage,
+                '标准加工时间(秒/片)': round(float(unit_time), 2),
+                '工序良率(%)': round(float(rng.uniform(97.0, 99.9)), 2),
+            })
+        # 各工序每天可加工的片数(并行设备按各自速度合计)
+        stage_capacity.append(float(np.sum(daily_minutes * 60.0 / unit_times)))
+        mean_unit_times.append(float(unit_times.mean()))
+
+    # 订单: 产品、数量、优先级
+    quantities = _quantities(rng, num_orders, quantity_distribution, quantity_mean, quantity_sigma, quantity_range)
+    products = [f"Product_{chr(ord('A') + i)}" if i < 26 else f"Product_{i + 1:03d}" for i in range(num_products)]
+    labels = list(priority_mix)
+    shares = np.array([priority_mix[label] for label in labels], dtype=float)
+    priorities = rng.choice(labels, size=num_orders, p=shares / shares.sum())
+
+    # 交期: 以最忙工序的加工天数估计完工期P, 交期在P的(1-τ±R/2)倍间均匀分布(至少1天)
+    estimated_makespan = max(float(quantities.sum()) / capacity for capacity in stage_capacity)
+    factors = rng.uniform(1 - due_tightness - due_range / 2, 1 - due_tightness + due_range / 2, num_orders)
+    due_days = np.maximum(1, np.ceil(estimated_makespan * factors)).astype(int)
+    # 单个订单至少需要其各工序加工时间之和
+    min_days = np.ceil(quantities * sum(mean_unit_times) / 86400.0).astype(int)
+    due_days = np.maximum(due_days, min_days)
+
+    orders = pd.DataFrame({
+        '订单ID': [f"ORD-{i + 1:0{max(3, len(str(num_orders)))}d}" for i in range(num_orders)],
+        '产品类型': rng.choice(products, size=num_orders),
+        '数量': quantities,
+        '交货日期': (BASE_DATE + pd.to_timedelta(due_days, unit='D')).strftime('%Y-%m-%d'),
+        '订单优先级': priorities,
+    })
+
+    os.makedirs(output_dir, exist_ok=True)
+    files = {
+        'orders': os.path.join(output_dir, DEFAULT_ORDERS_FILE),
+        'process_times': os.path.join(output_dir, DEFAULT_PROCESS_TIMES_FILE),
+        'machines': os.path.join(output_dir, DEFAULT_MACHINES_FILE),
+    }
+    # 与样例数据一致: UTF-8 BOM,流水线表按Line分组
+    orders.to_csv(files['orders'], index=False, encoding='utf-8-sig')
+    process_df = pd.DataFrame(process_rows)
+    process_df['_line_no'] = process_df['流水线'].str.slice(5).astype(int)
+    process_df.sort_values(['_line_no'], kind='stable').drop(columns='_line_no').to_csv(
+        files['process_times'], index=False, encoding='utf-8-sig')
+    pd.DataFrame(machine_rows).to_csv(files['machines'], index=False, encoding='utf-8-sig')
+
+    return {
+        'output_dir': output_dir,
+        'files': files,
+        'num_orders': num_orders,
+        'num_stages': num_stages,
+        'num_machines': len(machine_rows),
+        'estimated_makespan_days': estimated_makespan,
+        'due_days': (int(due_days.min()), int(due_days.max())),
+        'seed': seed,
+        'params': {
+            'machines_per_stage': machines_per_stage, 'due_tightness': due_tightness, 'due_range': due_range,
+            'priority_mix': priority_mix, 'quantity_distribution': quantity_distribution,
+            'quantity_mean': quantity_mean, 'quantity_sigma': quantity_sigma,
+            'quantity_range': list(quantity_range), 'num_products': num_products,
+        },
+    }
+
+
+def generate_tier(name: str, output_dir: str, seed: Optional[int] = 0, **overrides) -> Dict:
+    """按命名档位生成算例,overrides覆盖档位中的参数"""
+    if name not in TIERS:
+        raise ValueError(f"未知档位: {name} (可选: {', '.join(TIERS)})")
+    return generate_instance(output_dir, seed=seed, **dict(TIERS[name], **overrides))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FFS合成算例生成器")
+    parser.add_argument('output_dir', nargs='?', help='输出目录')
+    parser.add_argument('--tier', choices=list(TIERS), default=None, help='命名规模档位(其余参数可覆盖档位设置)')
+    parser.add_argument('--list-tiers', action='store_true', help='列出命名档位')
+    parser.add_argument('--orders', type=int, default=None, help='订单数')
+    parser.add_argument('--stages', type=int, default=None, help='工序数')
+    parser.add_argument('--machines-per-stage', type=int, nargs='+', default=None,
+                        help='每道工序的设备数(一个值适用于全部工序,或按工序逐一给出)')
+    parser.add_argument('--due-tightness', type=float, default=None, help='交期紧度(0~1,越大越紧)')
+    parser.add_argument('--due-range', type=float, default=None, help='交期分散度')
+    parser.add_argument('--priority-mix', default=None,
+                        help='优先级构成,如 "P1-紧急=0.2,P3-中=0.6,P4-低=0.2"')
+    parser.add_argument('--quantity-dist', choices=QUANTITY_DISTRIBUTIONS, default=None, help='订单数量分布')
+    parser.add_argument('--quantity-mean', type=float, default=None, help='数量中位数/固定值(片)')
+    parser.add_argument('--quantity-sigma', type=float, default=None, help='对数正态分布的对数标准差')
+    parser.add_argument('--quantity-range', type=int, nargs=2, default=None, metavar=('MIN', 'MAX'),
+                        help='数量上下限(片)')
+    parser.add_argument('--products', type=int, default=None, help='产品类型数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    if args.list_tiers:
+        for name, params in TIERS.items():
+            print(f"  {name:<14} {params}")
+        return
+    if not args.output_dir:
+        parser.error("需要指定输出目录")
+
+    overrides = {
+        'num_orders': args.orders,
+        'num_stages': args.stages,
+        'due_tightness': args.due_tightness,
+        'due_range': args.due_range,
+        'quantity_distribution': args.quantity_dist,
+        'quantity_mean': args.quantity_mean,
+        'quantity_sigma': args.quantity_sigma,
+        'quantity_range': args.quantity_range,
+        'num_products': args.products,
+    }
+    if args.machines_per_stage:
+        mps = args.machines_per_stage
+        overrides['machines_per_stage'] = mps[0] if len(mps) == 1 else mps
+    if args.priority_mix:
+        overrides['priority_mix'] = {
+            label.strip(): float(share) for label, share in (item.split('=') for item in args.priority_mix.split(','))
+        }
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+    # 改变工序数时,档位中按工序给出的设备数列表不再适用
+    if args.tier and 'num_stages' in overrides and 'machines_per_stage' not in overrides \
+            and not isinstance(TIERS[args.tier].get('machines_per_stage', 2), int):
+        overrides['machines_per_stage'] = max(TIERS[args.tier]['machines_per_stage'])
+
+    if args.tier:
+        summary = generate_tier(args.tier, args.output_dir, seed=args.seed, **overrides)
+    else:
+        summary = generate_instance(args.output_dir, seed=args.seed, **overrides)
+
+    print(f"✅ 算例已生成: {summary['output_dir']}")
+    print(f"  - 订单数: {summary['num_orders']}")
+    print(f"  - 工序数: {summary['num_stages']}, 设备数: {summary['num_machines']} "
+          f"(每工序 {summary['params']['machines_per_stage']})")
+    print(f"  - 估计完工期: {summary['estimated_makespan_days']:.1f} 天, "
+          f"交期范围: {summary['due_days'][0]}~{summary['due_days'][1]} 天")
+    print(f"  - 随机种子: {summary['seed']}")
+
+
+if __name__ == "__main__":
+    main()
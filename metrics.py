@@ -0,0 +1,229 @@
+"""
+进程内指标注册表
+功能: 计数器/仪表/直方图,按Prometheus文本格式导出(Web端 /metrics);
+求解器仅在阶段结束或每代结束时更新(不在单次适应度评估中更新),对求解热循环无可测开销;
+常驻求解进程内累积的指标经snapshot()随求解摘要回传,由Web进程merge()汇总
+"""
+
+import bisect
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 默认直方图分桶(秒)
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    """指标基类: 每组标签值对应一个取值,读写由锁保护"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签: {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_text(self, key: Tuple[str, ...], extra: Iterable[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: Tuple[str, ...], value) -> List[str]:
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    """直方图: 每组标签保存[各桶计数(非累积), 总和, 总数],导出时转为累积桶"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _render_sample(self, key: Tuple[str, ...], value) -> List[str]:
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (math.inf,), counts):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{self._label_text(key, [('le', _format_value(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表: 按名称注册(重复注册返回已有指标),统一导出与跨进程汇总"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus文本格式(text/plain; version=0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self, reset: bool = True) -> Dict[str, Dict]:
+        """
+        可pickle的指标快照 {name: {key: value}},用于跨进程汇总
+
+        参数:
+            reset: 是否清零计数器与直方图(快照即为自上次快照以来的增量); 仪表值保留
+        """
+        snapshot = {}
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            with metric._lock:
+                if not metric._values:
+                    continue
+                if isinstance(metric, Histogram):
+                    snapshot[metric.name] = {k: [list(v[0]), v[1], v[2]] for k, v in metric._values.items()}
+                else:
+                    snapshot[metric.name] = dict(metric._values)
+                if reset and not isinstance(metric, Gauge):
+                    metric._values.clear()
+        return snapshot
+
+    def merge(self, snapshot: Optional[Dict[str, Dict]]):
+        """汇总另一进程的快照: 计数器与直方图累加,仪表取快照值; 本进程未注册的指标忽略"""
+        for name, values in (snapshot or {}).items():
+            with self._lock:
+                metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            with metric._lock:
+                for key, value in values.items():
+                    if isinstance(metric, Histogram):
+                        entry = metric._values.get(key)
+                        if entry is None:
+                            metric._values[key] = [list(value[0]), value[1], value[2]]
+                        else:
+                            entry[0] = [a + b for a, b in zip(entry[0], value[0])]
+                            entry[1] += value[1]
+                            entry[2] += value[2]
+                    elif isinstance(metric, Counter):
+                        metric._values[key] = metric._values.get(key, 0.0) + value
+                    else:
+                        metric._values[key] = value
+
+
+REGISTRY = MetricsRegistry()
+
+# 求解器指标(求解进程内更新)
+PHASE_SECONDS = REGISTRY.histogram(
+    'ffs_phase_duration_seconds', '求解各阶段耗时(preprocess/optimize/export)', ['algorithm', 'phase'])
+FITNESS_EVALUATIONS = REGISTRY.counter(
+    'ffs_fitness_evaluations_total', '适应度评估次数', ['algorithm'])
+EVALS_PER_SECOND = REGISTRY.gauge(
+    'ffs_fitness_evaluations_per_second', '最近一次优化的适应度评估速率', ['algorithm'])
+CACHE_REQUESTS = REGISTRY.counter(
+    'ffs_cache_requests_total', '缓存查询次数(preprocess: 预处理磁盘缓存; warm_inputs: 常驻进程内输入; '
+    'result: Web结果缓存)', ['cache', 'result'])
+
+
+def record_optimization(algorithm: str, evaluations: int, seconds: float):
+    """记录一次优化阶段: 耗时、评估次数与评估速率"""
+    PHASE_SECONDS.observe(seconds, algorithm=algorithm, phase='optimize')
+    FITNESS_EVALUATIONS.inc(evaluations, algorithm=algorithm)
+    if seconds > 0:
+        EVALS_PER_SECOND.set(evaluations / seconds, algorithm=algorithm)
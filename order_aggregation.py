@@ -0,0 +1,305 @@
+"""
+订单聚合/拆分模块
+功能: 将同产品、同工艺路线、交期相近的小订单聚合为批次任务,在批次层面优化后
+再按EDD顺序将批次调度拆回单个订单,以缩短染色体长度(2 × 订单数 × 工序数)
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from data_preprocessor import BASE_DATE, OpIndexMap, OpMachineMap
+
+
+AGGREGATE_ID_PREFIX = 'AGG-'
+
+
+def _route_machine_ids(data: Dict) -> List[List]:
+    """由CSR路线数组还原各路线行的可用设备ID列表"""
+    route_ptr = data['route_ptr']
+    route_machines = data['route_machines']
+    machine_list = data['machine_list']
+    return [
+        [machine_list[m] for m in route_machines[route_ptr[row]:route_ptr[row + 1]]]
+        for row in range(len(route_ptr) - 1)
+    ]
+
+
+def aggregate_orders(data: Dict, due_window_days: float = 3.0,
+                     max_batch_quantity: Optional[int] = None,
+                     max_batch_orders: Optional[int] = None) -> Tuple[Dict, Dict]:
+    """
+    将兼容订单聚合为批次任务
+    兼容条件: 产品类型相同且路线组相同; 组内按交期扫描,交期跨度超过窗口
+    或批次数量/订单数超限时开启新批次
+
+    参数:
+        data: 预处理数据字典(DataPreprocessor.get_preprocessed_data())
+        due_window_days: 同一批次内最早与最晚交期的最大跨度(天)
+        max_batch_quantity: 批次最大总数量(None表示不限; 单个订单超限时独立成批)
+        max_batch_orders: 批次最大订单数(None表示不限)
+
+    返回:
+        agg_data: 批次层面的预处理数据字典,可直接用于FFSSimulator
+        aggregation: 批次映射 {'batches': [[order_idx, ...], ...], 'batch_ids', 'num_orders', 'num_batches'}
+                     批次内订单按交期升序(EDD)排列
+    """
+    order_list = data['order_list']
+    quantities = data['quantities']
+    due_dates = data['due_dates']
+    weights = data['weights']
+    product_types = data.get('product_types', {})
+    order_groups = np.asarray(data['order_route_group'])
+    num_stages = data['num_stages']
+
+    # 按(产品类型, 路线组)分桶,桶内按交期排序后扫描
+    buckets: Dict[Tuple, List[int]] = {}
+    for order_idx, order_id in enumerate(order_list):
+        key = (product_types.get(order_id), int(order_groups[order_idx]))
+        buckets.setdefault(key, []).append(order_idx)
+
+    batches: List[List[int]] = []
+    for members in buckets.values():
+        members.sort(key=lambda i: due_dates[order_list[i]])
+        current: List[int] = []
+        batch_qty = 0
+        for order_idx in members:
+            qty = quantities[order_list[order_idx]]
+            if current and (
+                due_dates[order_list[order_idx]] - due_dates[order_list[current[0]]] > due_window_days
+                or (max_batch_quantity is not None and batch_qty + qty > max_batch_quantity)
+                or (max_batch_orders is not None and len(current) >= max_batch_orders)
+            ):
+                batches.append(current)
+                current, batch_qty = [], 0
+            current.append(order_idx)
+            batch_qty += qty
+        if current:
+            batches.append(current)
+
+    # 批次按最早交期排序,使聚合实例的订单顺序稳定可读
+    batches.sort(key=lambda b: (due_dates[order_list[b[0]]], b[0]))
+
+    batch_ids = [f"{AGGREGATE_ID_PREFIX}{k + 1:04d}" for k in range(len(batches))]
+    first_members = np.array([b[0] for b in batches], dtype=np.int64)
+    agg_groups = [int(order_groups[i]) for i in first_members]
+
+    agg_data = dict(data)
+    agg_data.update({
+        'order_list': batch_ids,
+        # 批次数量 = 成员数量之和; 交期取成员最早交期(保守); 权重 = 成员权重之和
+        'quantities': {bid: sum(quantities[order_list[i]] for i in b) for bid, b in zip(batch_ids, batches)},
+        'due_dates': {bid: due_dates[order_list[b[0]]] for bid, b in zip(batch_ids, batches)},
+        'weights': {bid: sum(weights[order_list[i]] for i in b) for bid, b in zip(batch_ids, batches)},
+        'product_types': {bid: product_types.get(order_list[b[0]]) for bid, b in zip(batch_ids, batches)},
+        # 同产品同路线组的订单加工时间相同,取首个成员的加工时间行
+        'p_matrix': np.ascontiguousarray(data['p_matrix'][first_members]),
+        'op_map_inv': OpIndexMap(batch_ids, num_stages),
+        'op_k_map': OpMachineMap(agg_groups, _route_machine_ids(data), num_stages),
+        'order_route_group': np.asarray(agg_groups, dtype=np.int32),
+        'num_orders': len(batch_ids),
+    })
+
+    aggregation = {
+        'batches': batches,
+        'batch_ids': batch_ids,
+        'num_orders': len(order_list),
+        'num_batches': len(batches),
+    }
+
+    print(f"📦 订单聚合: {len(order_list)} 个订单 → {len(batches)} 个批次 "
+          f"(染色体维度 {len(order_list) * num_stages * 2} → {len(batches) * num_stages * 2})")
+    return agg_data, aggregation
+
+
+def disaggregate_schedule(schedule: List[Dict], aggregation: Dict, data: Dict) -> Tuple[Dict, List[Dict]]:
+    """
+    将批次调度拆回订单级调度
+    每个批次工序在其设备与时间段内按成员EDD顺序依次加工,成员加工时间按自身数量计算;
+    成员在某工序的完成时刻不晚于批次完成时刻,因此工序先后约束自然满足
+
+    参数:
+        schedule: 批次层面的调度记录列表(FFSSimulator.evaluate_solution()['schedule'])
+        aggregation: aggregate_orders返回的批次映射
+        data: 原始(订单级)预处理数据字典
+
+    返回:
+        completion_times: {order_idx: completion_time_in_seconds}
+        order_schedule: 订单级调度记录列表
+    """
+    order_list = data['order_list']
+    quantities = data['quantities']
+    p_matrix = data['p_matrix']
+    machine_index = {m: i for i, m in enumerate(data['machine_list'])}
+    last_stage = data['num_stages'] - 1
+    batches = aggregation['batches']
+
+    order_schedule = []
+    completion_times = {order_idx: 0.0 for order_idx in range(len(order_list))}
+    for record in schedule:
+        stage_idx = record['stage_idx']
+        machine_id = record['machine_id']
+        machine_idx = machine_index[machine_id]
+        start_time = record['start_time']
+        for order_idx in batches[record['order_idx']]:
+            processing_time = float(p_matrix[order_idx, stage_idx, machine_idx]) * quantities[order_list[order_idx]]
+            finish_time = start_time + processing_time
+            order_schedule.append({
+                'order_idx': order_idx,
+                'order_id': order_list[order_idx],
+                'stage_idx': stage_idx,
+                'machine_id': machine_id,
+                'start_time': start_time,
+                'finish_time': finish_time,
+                'processing_time': processing_time
+            })
+            if stage_idx == last_stage:
+                completion_times[order_idx] = finish_time
+            start_time = finish_time
+
+    return completion_times, order_schedule
+
+
+def disaggregate_result(result: Dict, aggregation: Dict, simulator) -> Dict:
+    """
+    将批次层面的评估结果拆回订单级,并在完整模型上重新评估
+
+    参数:
+        result: 批次仿真器evaluate_solution()的返回值
+        aggregation: aggregate_orders返回的批次映射
+        simulator: 订单级FFSSimulator(提供原始数据与目标函数)
+
+    返回:
+        与evaluate_solution()结构一致的订单级结果字典,可直接用于export_results
+    """
+    completion_times, schedule = disaggregate_schedule(result['schedule'], aggregation, simulator.data)
+    return simulator.evaluate_schedule(completion_times, schedule)
+
+
+def compare_with_full_model(data: Dict, due_window_days: float = 3.0,
+                            max_batch_quantity: Optional[int] = None,
+                            max_batch_orders: Optional[int] = None,
+                            pop_size: int = 50, epochs: int = 50, seed: int = 42) -> Dict:
+    """
+    对比聚合模型与完整模型的问题规模、求解耗时与解质量
+
+    参数:
+        data: 订单级预处理数据字典
+        due_window_days, max_batch_quantity, max_batch_orders: 聚合参数(同aggregate_orders)
+        pop_size, epochs: GA参数(两种模型相同)
+        seed: 随机种子(两种模型相同)
+
+    返回:
+        对比结果字典(维度、耗时、完整模型上的适应度及质量差距百分比)
+    """
+    import random
+    from ffs_simulator import FFSSimulator
+    from run_ga import configure_objective, run_ga_optimization
+
+    full_sim = FFSSimulator(data)
+    configure_objective(full_sim)
+
+    # 完整模型
+    np.random.seed(seed)
+    random.seed(seed)
+    full_run = run_ga_optimization(full_sim, pop_size=pop_size, epochs=epochs, verbose=False)
+    full_fitness = full_run['best_fitness']
+
+    # 聚合模型(计时包含聚合与拆分)
+    np.random.seed(seed)
+    random.seed(seed)
+    agg_start = time.time()
+    agg_data, aggregation = aggregate_orders(data, due_window_days, max_batch_quantity, max_batch_orders)
+    agg_sim = FFSSimulator(agg_data)
+    configure_objective(agg_sim)
+    agg_run = run_ga_optimization(agg_sim, pop_size=pop_size, epochs=epochs, verbose=False)
+    agg_result = disaggregate_result(agg_sim.evaluate_solution(agg_run['best_position']), aggregation, full_sim)
+    agg_time = time.time() - agg_start
+
+    gap = (agg_result['fitness'] - full_fitness) / abs(full_fitness) * 100.0 if full_fitness else 0.0
+    return {
+        'num_orders': aggregation['num_orders'],
+        'num_batches': aggregation['num_batches'],
+        'full_dimension': full_sim.total_ops * 2,
+        'agg_dimension': agg_sim.total_ops * 2,
+        'size_reduction': 1.0 - aggregation['num_batches'] / max(aggregation['num_orders'], 1),
+        'full_time': full_run['optimization_time'],
+        'agg_time': agg_time,
+        'full_fitness': full_fitness,
+        'agg_fitness': agg_result['fitness'],
+        'quality_gap_pct': gap,
+    }
+
+
+def expand_instance(preprocessor, copies: int, due_jitter_days: int = 4, seed: int = 42):
+    """
+    以现有订单为模板复制生成大规模基准实例(数量与交期随机扰动)
+
+    参数:
+        preprocessor: 已完成process()的DataPreprocessor
+        copies: 每个订单额外复制的份数
+        due_jitter_days: 交期扰动范围(±天)
+        seed: 随机种子
+    """
+    rng = np.random.default_rng(seed)
+    base_ids = list(preprocessor.order_list)
+    new_orders = []
+    for k in range(copies):
+        for order_id in base_ids:
+            due = preprocessor.due_dates[order_id] + int(rng.integers(-due_jitter_days, due_jitter_days + 1))
+            due_date = BASE_DATE + np.timedelta64(max(1, int(due)), 'D')
+            new_orders.append({
+                'order_id': f"{order_id}-{k + 1:03d}",
+                'product_type': preprocessor.product_types[order_id],
+                'quantity': max(1, int(preprocessor.quantities[order_id] * rng.uniform(0.2, 1.0))),
+                'due_date': due_date.strftime('%Y-%m-%d'),
+                'priority': 'P3-中',
+            })
+    preprocessor.add_orders(new_orders)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="订单聚合 vs 完整模型对比")
+    parser.add_argument('--copies', type=int, nargs='+', default=[0, 4, 9],
+                        help='基准实例: 每个订单额外复制的份数(可指定多个)')
+    parser.add_argument('--due-window', type=float, default=3.0, help='聚合交期窗口(天)')
+    parser.add_argument('--max-batch-qty', type=int, default=None, help='批次最大总数量')
+    parser.add_argument('--max-batch-orders', type=int, default=None, help='批次最大订单数')
+    parser.add_argument('--pop-size', type=int, default=50)
+    parser.add_argument('--epochs', type=int, default=50)
+    args = parser.parse_args()
+
+    from data_preprocessor import DataPreprocessor, DEFAULT_CACHE_DIR
+
+    rows = []
+    for copies in args.copies:
+        preprocessor = DataPreprocessor(
+            orders_file='订单数据.csv',
+            process_times_file='工序加工时间.csv',
+            machines_file='设备可用时间.csv'
+        )
+        preprocessor.process(cache_dir=DEFAULT_CACHE_DIR)
+        if copies:
+            expand_instance(preprocessor, copies)
+        data = preprocessor.get_preprocessed_data()
+        rows.append(compare_with_full_model(
+            data, args.due_window, args.max_batch_qty, args.max_batch_orders,
+            pop_size=args.pop_size, epochs=args.epochs
+        ))
+
+    print("\n" + "=" * 100)
+    print("📊 订单聚合对比结果(适应度均在完整模型上评估,越小越好)")
+    print("=" * 100)
+    print(f"{'订单数':>8} {'批次数':>8} {'规模缩减':>10} {'完整维度':>10} {'聚合维度':>10} "
+          f"{'完整耗时(s)':>12} {'聚合耗时(s)':>12} {'完整适应度':>14} {'聚合适应度':>14} {'差距':>9}")
+    for r in rows:
+        print(f"{r['num_orders']:>8} {r['num_batches']:>8} {r['size_reduction']*100:>9.1f}% "
+              f"{r['full_dimension']:>10} {r['agg_dimension']:>10} "
+              f"{r['full_time']:>12.2f} {r['agg_time']:>12.2f} "
+              f"{r['full_fitness']:>14.4f} {r['agg_fitness']:>14.4f} {r['quality_gap_pct']:>8.2f}%")
+
+
+if __name__ == "__main__":
+    main()
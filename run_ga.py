@@ -4,13 +4,22 @@ GA主执行脚本
 严格遵循Agent 2蓝图的GA参数配置(第4节)
 """
 
+import os
+import sys
 import numpy as np
 import time
 import random
-from typing import List, Tuple
-from data_preprocessor import DataPreprocessor
+import argparse
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from data_preprocessor import DataPreprocessor, DEFAULT_CACHE_DIR
 from ffs_simulator import FFSSimulator
-from visualize import export_results
+from order_aggregation import aggregate_orders, disaggregate_result
+from solver_control import SolverControl
+from dispatching import DISPATCH_RULES, dispatch_solution
+from visualize import export_results_async
+from run_history import DEFAULT_HISTORY_DB
+from metrics import PHASE_SECONDS, record_optimization
+import tracing
 
 
 # ========== 新增: 自适应GA与局部搜索 ==========
@@ -31,6 +40,7 @@ class AdaptiveGA:
                 self.pc = max(0.6, self.pc * 0.9)  # 减少利用
 
 
+@tracing.traced('GA.local_search', cat='ga')
 def local_search(solution: np.ndarray, simulator: FFSSimulator) -> np.ndarray:
     """邻域搜索改进解: 尝试交换相邻基因"""
     best_solution = solution.copy()
@@ -48,6 +58,207 @@ def local_search(solution: np.ndarray, simulator: FFSSimulator) -> np.ndarray:
     return best_solution
 
 
+def configure_objective(simulator: FFSSimulator):
+    """调整目标函数权重与偏好设备以提升利用率与均衡度"""
+    simulator.lambda_balance = 30.0           # 加强均衡约束
+    simulator.lambda_utilization = 8.0        # 鼓励平均利用率提升
+    simulator.target_avg_util = 0.12          # 目标平均利用率(12%)
+    simulator.preferred_machines = {"EQ-06", "EQ-01", "EQ-03", "EQ-04"}
+    simulator.lambda_preferred = 2.0          # 偏好设备占比不足惩罚系数(温和)
+    simulator.target_preferred_ratio = 0.35   # 偏好设备目标占比(35%)
+
+
+def tournament_select(pop: List[np.ndarray], fit: np.ndarray, k_frac: float) -> List[np.ndarray]:
+    k = max(2, int(len(pop) * k_frac))
+    selected = []
+    for _ in range(len(pop)):
+        idxs = np.random.choice(len(pop), size=k, replace=False)
+        best_idx = idxs[np.argmin(fit[idxs])]  # 最小化目标
+        selected.append(pop[best_idx].copy())
+    return selected
+
+
+def uniform_crossover(p1: np.ndarray, p2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    mask = np.random.rand(len(p1)) < 0.5
+    c1 = np.where(mask, p1, p2)
+    c2 = np.where(mask, p2, p1)
+    return c1, c2
+
+
+def mutate(ind: np.ndarray, pm: float) -> np.ndarray:
+    # 逐基因随机重置
+    mask = np.random.rand(len(ind)) < pm
+    ind[mask] = np.random.uniform(0.0, 0.9999, size=mask.sum())
+    return np.clip(ind, 0.0, 0.9999)
+
+
+def build_initial_population(simulator: FFSSimulator, pop_size: int,
+                             seed_rules: Sequence[str] = ()) -> List[np.ndarray]:
+    """
+    生成混合初始种群(50%启发式 + 50%随机)
+    
+    参数:
+        seed_rules: 可选,调度规则列表(见dispatching.DISPATCH_RULES); 每条规则的排程编码为一个种子个体,
+                    其余个体按原比例生成
+    """
+    initial_population: List[np.ndarray] = [dispatch_solution(simulator, rule) for rule in seed_rules][:pop_size]
+    for i in range(len(initial_population), pop_size):
+        if i < pop_size // 2:
+            edd_sol = simulator.generate_edd_solution()
+            noise = np.random.normal(0, 0.05, len(edd_sol))
+            solution = np.clip(edd_sol + noise, 0, 0.9999)
+        else:
+            solution = np.random.uniform(0, 0.9999, simulator.total_ops * 2)
+        initial_population.append(solution)
+    return initial_population
+
+
+def evolve_generation(population: List[np.ndarray], fitness: np.ndarray, simulator: FFSSimulator,
+                      ga_ctrl: AdaptiveGA, k_tourn_frac: float = 0.2) -> Tuple[List[np.ndarray], np.ndarray, int]:
+    """
+    执行一代GA: 锦标赛选择 → 均匀交叉 → 随机重置变异 → 精英局部搜索 → 评估新种群(不修改传入的种群)
+    
+    返回:
+        (新种群, 新种群适应度, 本代适应度评估次数)
+    """
+    pop_size = len(population)
+    
+    # 选择
+    with tracing.span('GA.selection', cat='ga'):
+        mating_pool = tournament_select(population, fitness, k_tourn_frac)
+    
+    # 交叉
+    variation_start = tracing.now_us()
+    offspring: List[np.ndarray] = []
+    for i in range(0, pop_size, 2):
+        p1 = mating_pool[i]
+        p2 = mating_pool[(i+1) % pop_size]
+        if random.random() < ga_ctrl.pc:
+            c1, c2 = uniform_crossover(p1, p2)
+        else:
+            c1, c2 = p1.copy(), p2.copy()
+        offspring.append(c1)
+        offspring.append(c2)
+    
+    # 变异
+    for i in range(len(offspring)):
+        offspring[i] = mutate(offspring[i], ga_ctrl.pm)
+    tracing.complete('GA.variation', variation_start, cat='ga')
+    
+    # 局部搜索: 对当前最优个体进行邻域提升
+    best_idx = int(np.argmin(fitness))
+    best_ind = population[best_idx]
+    improved_best = local_search(best_ind, simulator)
+    
+    # 形成新一代: 保留改进的精英 + 其他子代
+    new_population = offspring
+    new_population[0] = improved_best  # 简单精英保留
+    
+    # 评估
+    with tracing.span('GA.evaluation', cat='ga', individuals=len(new_population)):
+        new_fitness = np.array([simulator.fit_func(ind) for ind in new_population])
+    
+    # 局部搜索评估次数: 初始解 + 最多200次相邻交换
+    evaluations = len(new_population) + min(len(best_ind) - 1, 200) + 1
+    return new_population, new_fitness, evaluations
+
+
+def run_ga_optimization(simulator: FFSSimulator, pop_size: int = 100, epochs: int = 100,
+                        pc: float = 0.8, pm: float = 0.2, k_tourn_frac: float = 0.2,
+                        verbose: bool = True,
+                        progress_callback: Optional[Callable[[Dict], None]] = None,
+                        progress_interval: float = 0.0,
+                        control: Optional[SolverControl] = None,
+                        seed_rules: Sequence[str] = ()) -> Dict:
+    """
+    运行自适应GA(锦标赛选择 + 均匀交叉 + 随机重置变异 + 精英局部搜索)
+    
+    参数:
+        simulator: 已配置目标函数的仿真器
+        pop_size: 种群规模
+        epochs: 迭代代数
+        pc, pm: 初始交叉/变异概率(由AdaptiveGA自适应调整)
+        k_tourn_frac: 锦标赛规模占种群比例
+        verbose: 是否打印迭代进度
+        progress_callback: 可选,每代结束时以进度字典调用(generation, generations, best_fitness,
+                           pc, pm, evaluations, evals_per_sec, elapsed); 为None时不构造进度数据
+        progress_interval: 两次回调的最小间隔(秒),最后一代总会回调
+        control: 可选,求解控制; 每代开始前检查,已取消或超出时间预算时提前结束并返回当前最优解
+        seed_rules: 可选,以这些调度规则的排程作为初始种群的种子个体(见build_initial_population)
+    
+    返回:
+        {'best_position', 'best_fitness', 'fitness_history', 'optimization_time', 'ga_ctrl',
+         'generations'(完成的代数), 'evaluations'(迭代中的适应度评估次数),
+         'stop_reason'(提前结束原因,正常结束为None)}
+    """
+    if control is not None:
+        control.start()
+    ga_ctrl = AdaptiveGA(pc=pc, pm=pm)
+    with tracing.span('GA.init_population', cat='ga', pop_size=pop_size):
+        population = build_initial_population(simulator, pop_size, seed_rules)
+        
+        # 评估初始种群
+        fitness = np.array([simulator.fit_func(ind) for ind in population])
+    
+    if verbose:
+        print("\n🔄 开始GA优化...")
+    optimization_start = time.time()
+    evaluations = 0
+    last_report = 0.0
+    generations = 0
+    
+    for gen in range(epochs):
+        if control is not None and control.should_stop():
+            if verbose:
+                print(f"⏹️ 第 {gen} 代后提前结束 ({control.stop_reason})")
+            break
+        generation_start = tracing.now_us()
+        
+        population, fitness, generation_evaluations = evolve_generation(
+            population, fitness, simulator, ga_ctrl, k_tourn_frac
+        )
+        best_fit = float(np.min(fitness))
+        ga_ctrl.best_fitness_history.append(best_fit)
+        
+        # 参数自适应
+        ga_ctrl.adapt_parameters(gen)
+        generations = gen + 1
+        evaluations += generation_evaluations
+        tracing.complete('GA.generation', generation_start, cat='ga', generation=gen + 1, best_fitness=best_fit)
+        
+        if progress_callback is not None:
+            now = time.time()
+            if gen == epochs - 1 or now - last_report >= progress_interval:
+                last_report = now
+                elapsed = now - optimization_start
+                progress_callback({
+                    'algorithm': 'GA',
+                    'generation': gen + 1,
+                    'generations': epochs,
+                    'best_fitness': best_fit,
+                    'pc': ga_ctrl.pc,
+                    'pm': ga_ctrl.pm,
+                    'evaluations': evaluations,
+                    'evals_per_sec': evaluations / elapsed if elapsed > 0 else 0.0,
+                    'elapsed': elapsed,
+                })
+        
+        if verbose and (gen % 20 == 0 or gen == epochs - 1):
+            print(f"代 {gen:03d} | 最优适应度={best_fit:.4f} | pc={ga_ctrl.pc:.3f} pm={ga_ctrl.pm:.3f}")
+    
+    best_idx = int(np.argmin(fitness))
+    return {
+        'best_position': population[best_idx],
+        'best_fitness': float(fitness[best_idx]),
+        'fitness_history': ga_ctrl.best_fitness_history,
+        'optimization_time': time.time() - optimization_start,
+        'ga_ctrl': ga_ctrl,
+        'generations': generations,
+        'evaluations': evaluations,
+        'stop_reason': control.stop_reason if control is not None else None,
+    }
+
+
 def print_banner():
     """打印启动横幅"""
     banner = """
@@ -63,10 +274,50 @@ def print_banner():
     print(banner)
 
 
-def main():
-    """主函数"""
+def main(aggregate: bool = False, due_window_days: float = 3.0,
+         max_batch_quantity: Optional[int] = None, max_batch_orders: Optional[int] = None,
+         columnar_format: Optional[str] = None, wait_export: bool = True,
+         data: Optional[Dict] = None, simulator: Optional[FFSSimulator] = None,
+         progress_callback: Optional[Callable[[Dict], None]] = None,
+         progress_interval: float = 0.0, seed: Optional[int] = None,
+         input_dir: str = '.', output_dir: str = '.',
+         control: Optional[SolverControl] = None, profile_every: Optional[int] = None,
+         seed_rules: Sequence[str] = (), include_plotlyjs: str = 'directory',
+         history_db: Optional[str] = DEFAULT_HISTORY_DB) -> Dict:
+    """
+    主函数
+    
+    参数:
+        aggregate: 是否先将同产品、交期相近的订单聚合为批次再优化
+        due_window_days: 聚合时同一批次内的交期窗口(天)
+        max_batch_quantity: 聚合批次的最大总数量(None表示不限)
+        max_batch_orders: 聚合批次的最大订单数(None表示不限)
+        columnar_format: 可选,额外导出列式结果文件('arrow'/'parquet')
+        wait_export: 是否在返回前等待后台导出完成(导出失败时抛出异常);
+                     为False时立即返回,可通过返回值中的export_handle检查
+        data: 可选,已预处理的数据字典(常驻进程复用,跳过阶段1)
+        simulator: 可选,基于data构建的仿真器(常驻进程复用,跳过构建)
+        progress_callback: 可选,每代进度回调(见run_ga_optimization)
+        progress_interval: 进度回调的最小间隔(秒)
+        seed: 可选,随机种子(相同输入与种子得到相同排程)
+        input_dir: 输入CSV所在目录(data为None时使用)
+        output_dir: 结果文件输出目录
+        control: 可选,求解控制(取消/时间预算); 提前结束时仍导出当前最优解
+        profile_every: 可选,开启仿真器热路径剖析,每N次评估对各阶段采样计时(结果打印并记入运行历史)
+        seed_rules: 可选,以这些调度规则(EDD/WSPT/ATC/SPT/LPT)的排程作为初始种群的种子个体
+        include_plotlyjs: 甘特图的plotly.js引用方式(默认同目录复制plotly.min.js; Web作业传共享脚本URL)
+        history_db: 运行历史SQLite库路径(相对路径相对于output_dir); None表示不记录
+    
+    返回:
+        {'best_position', 'best_fitness', 'result'(评估结果), 'export_handle', 'stop_reason',
+         'simulator_profile'(未开启剖析时为None)}
+    """
     print_banner()
     
+    if seed is not None:
+        np.random.seed(seed)
+        random.seed(seed)
+    
     # ========== 阶段1: 数据加载与预处理 ==========
     print("\n" + "="*60)
     print("阶段 1/3: 数据加载与预处理")
@@ -74,13 +325,13 @@ def main():
     
     start_time = time.time()
     
-    preprocessor = DataPreprocessor(
-        orders_file='订单数据.csv',
-        process_times_file='工序加工时间.csv',
-        machines_file='设备可用时间.csv'
-    )
-    
-    data = preprocessor.process()
+    if data is None:
+        preprocessor = DataPreprocessor.from_directory(input_dir)
+        
+        data = preprocessor.process(cache_dir=DEFAULT_CACHE_DIR)
+        PHASE_SECONDS.observe(time.time() - start_time, algorithm='GA', phase='preprocess')
+    else:
+        print("  ♻️ 使用预加载数据")
     
     preprocess_time = time.time() - start_time
     print(f"\n⏱️ 数据预处理耗时: {preprocess_time:.2f} 秒")
@@ -91,140 +342,97 @@ def main():
     print("="*60)
     
     # 创建FFSSimulator
-    print("\n🧬 初始化仿真器...")
-    simulator = FFSSimulator(data)
+    if simulator is None:
+        print("\n🧬 初始化仿真器...")
+        simulator = FFSSimulator(data)
     
     # 新增: 调整目标函数权重与偏好设备以提升利用率与均衡度
-    simulator.lambda_balance = 30.0           # 加强均衡约束
-    simulator.lambda_utilization = 8.0        # 鼓励平均利用率提升
-    simulator.target_avg_util = 0.12          # 目标平均利用率(12%)
-    simulator.preferred_machines = {"EQ-06", "EQ-01", "EQ-03", "EQ-04"}
-    simulator.lambda_preferred = 2.0          # 偏好设备占比不足惩罚系数(温和)
-    simulator.target_preferred_ratio = 0.35   # 偏好设备目标占比(35%)
+    configure_objective(simulator)
+    
+    # 订单聚合: 在批次层面优化,结果再拆回单个订单
+    solve_simulator = simulator
+    aggregation = None
+    if aggregate:
+        agg_data, aggregation = aggregate_orders(
+            data, due_window_days=due_window_days,
+            max_batch_quantity=max_batch_quantity, max_batch_orders=max_batch_orders
+        )
+        solve_simulator = FFSSimulator(agg_data)
+        configure_objective(solve_simulator)
     
     # 配置GA参数
     print("\n⚙️ GA参数配置:")
     pop_size = 100
     epochs = 100  # 提升到100以获得更稳定的自适应轨迹
     k_tourn_frac = 0.2
-    ga_ctrl = AdaptiveGA(pc=0.8, pm=0.2)
+    pc, pm = 0.8, 0.2
     print(f"  • pop_size: {pop_size}")
     print(f"  • epochs: {epochs}")
-    print(f"  • pc (初始): {ga_ctrl.pc}")
-    print(f"  • pm (初始): {ga_ctrl.pm}")
+    print(f"  • pc (初始): {pc}")
+    print(f"  • pm (初始): {pm}")
     print(f"  • selection: tournament (比例={k_tourn_frac})")
     print(f"  • crossover: uniform")
     print(f"  • mutation: random-reset")
+    if seed_rules:
+        print(f"  • 调度规则种子: {', '.join(seed_rules)}")
     
-    # 生成混合初始种群(50%启发式 + 50%随机)
+    # 生成混合初始种群(50%启发式 + 50%随机)并迭代
     print("\n🧬 生成混合初始种群...")
-    initial_population: List[np.ndarray] = []
-    for i in range(pop_size):
-        if i < pop_size // 2:
-            edd_sol = simulator.generate_edd_solution()
-            noise = np.random.normal(0, 0.05, len(edd_sol))
-            solution = np.clip(edd_sol + noise, 0, 0.9999)
-        else:
-            solution = np.random.uniform(0, 0.9999, simulator.total_ops * 2)
-        initial_population.append(solution)
-    
-    # 评估初始种群
-    fitness = np.array([simulator.fit_func(ind) for ind in initial_population])
-    
-    def tournament_select(pop: List[np.ndarray], fit: np.ndarray, k_frac: float) -> List[np.ndarray]:
-        k = max(2, int(len(pop) * k_frac))
-        selected = []
-        for _ in range(len(pop)):
-            idxs = np.random.choice(len(pop), size=k, replace=False)
-            best_idx = idxs[np.argmin(fit[idxs])]  # 最小化目标
-            selected.append(pop[best_idx].copy())
-        return selected
-    
-    def uniform_crossover(p1: np.ndarray, p2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        mask = np.random.rand(len(p1)) < 0.5
-        c1 = np.where(mask, p1, p2)
-        c2 = np.where(mask, p2, p1)
-        return c1, c2
-    
-    def mutate(ind: np.ndarray, pm: float) -> np.ndarray:
-        # 逐基因随机重置
-        mask = np.random.rand(len(ind)) < pm
-        ind[mask] = np.random.uniform(0.0, 0.9999, size=mask.sum())
-        return np.clip(ind, 0.0, 0.9999)
-    
-    population = initial_population
-    
-    print("\n🔄 开始GA优化...")
-    optimization_start = time.time()
-    
-    for gen in range(epochs):
-        # 选择
-        mating_pool = tournament_select(population, fitness, k_tourn_frac)
-    
-        # 交叉
-        offspring: List[np.ndarray] = []
-        for i in range(0, pop_size, 2):
-            p1 = mating_pool[i]
-            p2 = mating_pool[(i+1) % pop_size]
-            if random.random() < ga_ctrl.pc:
-                c1, c2 = uniform_crossover(p1, p2)
-            else:
-                c1, c2 = p1.copy(), p2.copy()
-            offspring.append(c1)
-            offspring.append(c2)
-    
-        # 变异
-        for i in range(len(offspring)):
-            offspring[i] = mutate(offspring[i], ga_ctrl.pm)
-    
-        # 局部搜索: 对当前最优个体进行邻域提升
-        best_idx = int(np.argmin(fitness))
-        best_ind = population[best_idx]
-        improved_best = local_search(best_ind, simulator)
-    
-        # 形成新一代: 保留改进的精英 + 其他子代
-        population = offspring
-        population[0] = improved_best  # 简单精英保留
-    
-        # 评估
-        fitness = np.array([simulator.fit_func(ind) for ind in population])
-        best_fit = float(np.min(fitness))
-        ga_ctrl.best_fitness_history.append(best_fit)
-    
-        # 参数自适应
-        ga_ctrl.adapt_parameters(gen)
-    
-        if gen % 20 == 0 or gen == epochs - 1:
-            print(f"代 {gen:03d} | 最优适应度={best_fit:.4f} | pc={ga_ctrl.pc:.3f} pm={ga_ctrl.pm:.3f}")
-    
-    optimization_time = time.time() - optimization_start
-    best_idx = int(np.argmin(fitness))
-    best_position = population[best_idx]
-    best_fitness = float(fitness[best_idx])
-    
-    print(f"\n✅ 优化完成!")
+    profiler = solve_simulator.enable_profiling(profile_every) if profile_every else None
+    try:
+        ga_result = run_ga_optimization(
+            solve_simulator, pop_size=pop_size, epochs=epochs, pc=pc, pm=pm, k_tourn_frac=k_tourn_frac,
+            progress_callback=progress_callback, progress_interval=progress_interval, control=control,
+            seed_rules=seed_rules
+        )
+    finally:
+        simulator_profile = solve_simulator.disable_profiling()
+    optimization_time = ga_result['optimization_time']
+    record_optimization('GA', ga_result['evaluations'], optimization_time)
+    best_position = ga_result['best_position']
+    best_fitness = ga_result['best_fitness']
+    
+    if ga_result['stop_reason'] is not None:
+        print(f"\n⏹️ 优化提前结束({ga_result['stop_reason']}),完成 {ga_result['generations']}/{epochs} 代")
+    else:
+        print(f"\n✅ 优化完成!")
     print(f"  ⏱️ 优化耗时: {optimization_time:.2f} 秒")
     print(f"  📈 最优适应度: {best_fitness:.4f}")
+    if profiler is not None:
+        profiler.print_report()
     
     # ========== 阶段3: 结果导出与可视化 ==========
     print("\n" + "="*60)
     print("阶段 3/3: 结果导出与可视化")
     print("="*60)
     
-    export_start = time.time()
-    
-    # 评估最优解以导出
-    eval_result = simulator.evaluate_solution(best_position)
-    result = export_results(
+    # 评估最优解以导出(聚合模式下拆回单个订单后在完整模型上评估)
+    eval_result = solve_simulator.evaluate_solution(best_position)
+    if aggregation is not None:
+        eval_result = disaggregate_result(eval_result, aggregation, simulator)
+        print(f"  📦 拆分后完整模型适应度: {eval_result['fitness']:.4f}")
+    # CSV/甘特图在后台线程写出,求解结果立即可用
+    export_handle = export_results_async(
         eval_result['completion_times'],
         eval_result['schedule'],
         eval_result['kpis'],
         data,
         algorithm="GA",
+        output_dir=output_dir,
+        columnar_format=columnar_format,
+        include_plotlyjs=include_plotlyjs,
+        history_db=history_db,
+        run_params={
+            'pop_size': pop_size, 'epochs': epochs, 'pc': pc, 'pm': pm, 'k_tourn_frac': k_tourn_frac,
+            'aggregate': aggregate, 'due_window_days': due_window_days,
+            'max_batch_quantity': max_batch_quantity, 'max_batch_orders': max_batch_orders,
+            'best_fitness': best_fitness, 'optimization_time': optimization_time, 'seed': seed,
+            'generations_completed': ga_result['generations'], 'stop_reason': ga_result['stop_reason'],
+            'simulator_profile': simulator_profile, 'seed_rules': list(seed_rules),
+        },
     )
     
-    export_time = time.time() - export_start
-    print(f"\n⏱️ 结果导出耗时: {export_time:.2f} 秒")
+    print(f"\n⏱️ 结果导出已转入后台 (状态: {export_handle.status_file})")
     
     # ========== 总结报告 ==========
     total_time = time.time() - start_time
@@ -235,7 +443,7 @@ def main():
     print(f"\n⏱️ 总耗时: {total_time:.2f} 秒")
     print(f"  • 数据预处理: {preprocess_time:.2f} 秒 ({preprocess_time/total_time*100:.1f}%)")
     print(f"  • GA优化: {optimization_time:.2f} 秒 ({optimization_time/total_time*100:.1f}%)")
-    print(f"  • 结果导出: {export_time:.2f} 秒 ({export_time/total_time*100:.1f}%)")
+    print(f"  • 结果导出: 后台进行中")
     
     print("\n📁 输出文件:")
     print("  ✓ schedule_results_GA.csv  - 详细调度方案")
@@ -244,7 +452,7 @@ def main():
     print("  ✓ schedule_gantt_GA.html   - 交互式甘特图")
     
     print("\n🎯 优化目标达成情况:")
-    kpis = result['kpis']
+    kpis = eval_result['kpis']
     
     # 计算改进指标
     on_time_rate = kpis['on_time_delivery_rate']
@@ -299,11 +507,51 @@ def main():
     print("  2. 查看 schedule_results_GA.csv 了解详细调度明细")
     print("  3. 参考 schedule_kpis_GA.csv 评估优化效果")
     print("\n")
+    
+    if wait_export:
+        export_handle.wait()  # 导出失败时在此抛出
+        print(f"✅ 后台结果导出完成,耗时: {export_handle.elapsed:.2f} 秒")
+    
+    return {
+        'best_position': best_position,
+        'best_fitness': best_fitness,
+        'result': eval_result,
+        'export_handle': export_handle,
+        'stop_reason': ga_result['stop_reason'],
+        'simulator_profile': simulator_profile,
+    }
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FFS调度GA求解器")
+    parser.add_argument('--aggregate', action='store_true', help='将同产品、交期相近的订单聚合为批次后优化')
+    parser.add_argument('--due-window', type=float, default=3.0, help='聚合交期窗口(天)')
+    parser.add_argument('--max-batch-qty', type=int, default=None, help='聚合批次最大总数量')
+    parser.add_argument('--max-batch-orders', type=int, default=None, help='聚合批次最大订单数')
+    parser.add_argument('--columnar', choices=['arrow', 'parquet'], default=None, help='额外导出列式结果文件')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子(用于复现结果)')
+    parser.add_argument('--input-dir', default='.', help='输入CSV所在目录')
+    parser.add_argument('--output-dir', default='.', help='结果文件输出目录')
+    parser.add_argument('--time-budget', type=float, default=None, help='优化时间预算(秒),超出后输出当前最优解')
+    parser.add_argument('--profile-every', type=int, default=None, help='剖析仿真器各阶段耗时,每N次评估采样一次')
+    parser.add_argument('--trace', default=None, help='写出Chrome trace-event格式的运行追踪(JSON路径)')
+    parser.add_argument('--seed-rules', nargs='+', type=str.upper, choices=DISPATCH_RULES, default=[],
+                        help='以这些调度规则的排程作为初始种群的种子个体')
+    parser.add_argument('--include-plotlyjs', default='directory',
+                        help="甘特图的plotly.js引用方式: directory(同目录复制)或共享脚本的路径/URL")
+    parser.add_argument('--history-db', default=DEFAULT_HISTORY_DB,
+                        help='运行历史库路径(相对路径相对于--output-dir,空字符串表示不记录)')
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable('run_ga')
     try:
-        main()
+        main(aggregate=args.aggregate, due_window_days=args.due_window,
+             max_batch_quantity=args.max_batch_qty, max_batch_orders=args.max_batch_orders,
+             columnar_format=args.columnar, seed=args.seed,
+             input_dir=args.input_dir, output_dir=args.output_dir,
+             control=SolverControl(time_budget=args.time_budget), profile_every=args.profile_every,
+             seed_rules=args.seed_rules, include_plotlyjs=args.include_plotlyjs,
+             history_db=args.history_db or None)
     except KeyboardInterrupt:
         print("\n\n⚠️ 用户中断执行")
     except Exception as e:
@@ -313,4 +561,8 @@ if __name__ == "__main__":
         print("\n💡 请检查:")
         print("  1. 数据文件是否存在且格式正确")
         print("  2. 依赖库是否正确安装 (pip install -r requirements.txt)")
-        print("  3. Python版本是否 >= 3.8")
\ No newline at end of file
+        print("  3. Python版本是否 >= 3.8")
+        sys.exit(1)
+    finally:
+        if args.trace:
+            print(f"🧭 运行追踪已写出: {tracing.disable().write(args.trace)}")
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+运行历史存储模块
+功能: 将每次求解的参数、输入数据哈希、KPI、订单完工、设备负载与调度明细
+记录到本地SQLite数据库,并提供跨运行的索引查询(KPI趋势、设备负载对比)
+"""
+
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+DEFAULT_HISTORY_DB = 'run_history.db'
+# 写锁等待时长(秒): 多个求解进程共用同一历史库时,并发写入排队等待而非立即报database is locked
+BUSY_TIMEOUT_SECONDS = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  REAL NOT NULL,
+    algorithm   TEXT NOT NULL,
+    data_hash   TEXT,
+    params      TEXT,
+    num_orders  INTEGER,
+    num_ops     INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_algorithm ON runs (algorithm, run_id);
+
+CREATE TABLE IF NOT EXISTS run_kpis (
+    run_id  INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    kpi     TEXT NOT NULL,
+    value   REAL,
+    PRIMARY KEY (run_id, kpi)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_run_kpis_kpi ON run_kpis (kpi, run_id);
+
+CREATE TABLE IF NOT EXISTS run_orders (
+    run_id           INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    order_id         TEXT NOT NULL,
+    completion_days  REAL,
+    due_date         REAL,
+    tardiness        REAL,
+    PRIMARY KEY (run_id, order_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_run_orders_order ON run_orders (order_id, run_id);
+
+CREATE TABLE IF NOT EXISTS run_machine_load (
+    run_id       INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    machine_id   TEXT NOT NULL,
+    busy_hours   REAL,
+    num_ops      INTEGER,
+    utilization  REAL,
+    PRIMARY KEY (run_id, machine_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_run_machine_load_machine ON run_machine_load (machine_id, run_id);
+
+CREATE TABLE IF NOT EXISTS run_schedule (
+    run_id           INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    order_id         TEXT NOT NULL,
+    stage_idx        INTEGER NOT NULL,
+    machine_id       TEXT NOT NULL,
+    start_time       REAL,
+    finish_time      REAL,
+    processing_time  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_run_schedule_run ON run_schedule (run_id);
+CREATE INDEX IF NOT EXISTS idx_run_schedule_order ON run_schedule (order_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_run_schedule_machine ON run_schedule (machine_id, run_id);
+"""
+
+
+class RunHistory:
+    """基于SQLite的运行历史库(WAL模式,写入单事务批量完成)"""
+
+    def __init__(self, db_path: str = DEFAULT_HISTORY_DB):
+        """
+        打开(不存在则创建)运行历史库
+
+        参数:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(self, algorithm: str, kpis: Dict, completion_times: Dict,
+                   cols: Dict[str, np.ndarray], data: Dict,
+                   params: Optional[Dict] = None) -> int:
+        """
+        记录一次运行
+
+        参数:
+            algorithm: 算法名称(GA/NSGA2等)
+            kpis: KPI字典
+            completion_times: {order_idx: completion_time_in_seconds}
+            cols: visualize.schedule_to_arrays()的列式调度数组
+            data: 预处理数据字典(提供订单/设备/产能与输入数据哈希)
+            params: 求解参数字典(JSON序列化存储)
+
+        返回:
+            新运行的run_id
+        """
+        order_list = data['order_list']
+        machine_list = data['machine_list']
+        order_ids = np.asarray([str(o) for o in order_list], dtype=object)
+        machine_ids = np.asarray([str(m) for m in machine_list], dtype=object)
+        num_orders = len(order_list)
+
+        # 订单完工
+        completion_days = np.fromiter(
+            (completion_times.get(i, 0.0) for i in range(num_orders)), dtype=np.float64, count=num_orders
+        ) / 86400.0
+        due = np.fromiter((data['due_dates'][o] for o in order_list), dtype=np.float64, count=num_orders)
+        tardiness = np.maximum(0.0, completion_days - due)
+
+        # 设备负载: 加工时长与工序数按设备汇总
+        busy = np.bincount(cols['machine_idx'], weights=cols['processing_time'], minlength=len(machine_list))
+        num_ops = np.bincount(cols['machine_idx'], minlength=len(machine_list))
+        capacity = np.array([data['machine_capacity'][m] for m in machine_list], dtype=np.float64)
+        utilization = np.divide(busy, capacity, out=np.zeros_like(busy), where=capacity > 0) * 100.0
+
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (created_at, algorithm, data_hash, params, num_orders, num_ops) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (time.time(), algorithm, data.get('data_hash'),
+                 json.dumps(params or {}, ensure_ascii=False, default=str),
+                 num_orders, len(cols['start_time']))
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO run_kpis (run_id, kpi, value) VALUES (?, ?, ?)",
+                [(run_id, name, float(value)) for name, value in kpis.items()]
+            )
+            self.conn.executemany(
+                "INSERT INTO run_orders (run_id, order_id, completion_days, due_date, tardiness) "
+                "VALUES (?, ?, ?, ?, ?)",
+                zip([run_id] * num_orders, order_ids.tolist(), completion_days.tolist(),
+                    due.tolist(), tardiness.tolist())
+            )
+            self.conn.executemany(
+                "INSERT INTO run_machine_load (run_id, machine_id, busy_hours, num_ops, utilization) "
+                "VALUES (?, ?, ?, ?, ?)",
+                zip([run_id] * len(machine_list), machine_ids.tolist(), (busy / 3600.0).tolist(),
+                    num_ops.tolist(), utilization.tolist())
+            )
+            self.conn.executemany(
+                "INSERT INTO run_schedule (run_id, order_id, stage_idx, machine_id, start_time, finish_time, processing_time) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                zip([run_id] * len(cols['start_time']), order_ids[cols['order_idx']].tolist(),
+                    cols['stage_idx'].tolist(), machine_ids[cols['machine_idx']].tolist(),
+                    cols['start_time'].tolist(), cols['finish_time'].tolist(), cols['processing_time'].tolist())
+            )
+        return run_id
+
+    def list_runs(self, last_n: int = 20, algorithm: Optional[str] = None) -> List[Dict]:
+        """最近last_n次运行(按run_id倒序),可按算法过滤"""
+        sql = "SELECT * FROM runs"
+        args: list = []
+        if algorithm:
+            sql += " WHERE algorithm = ?"
+            args.append(algorithm)
+        sql += " ORDER BY run_id DESC LIMIT ?"
+        args.append(last_n)
+        rows = []
+        for row in self.conn.execute(sql, args):
+            run = dict(row)
+            run['params'] = json.loads(run['params']) if run['params'] else {}
+            rows.append(run)
+        return rows
+
+    def kpi_trend(self, kpi: str, last_n: int = 20, algorithm: Optional[str] = None) -> List[Dict]:
+        """
+        最近last_n次运行的某项KPI走势(按run_id升序)
+
+        参数:
+            kpi: KPI名称,如 'total_weighted_tardiness'
+            last_n: 运行次数
+            algorithm: 可选,按算法过滤
+
+        返回:
+            [{'run_id', 'created_at', 'algorithm', 'value'}, ...]
+        """
+        sql = (
+            "SELECT r.run_id, r.created_at, r.algorithm, k.value "
+            "FROM runs r JOIN run_kpis k ON k.run_id = r.run_id AND k.kpi = ?"
+        )
+        args: list = [kpi]
+        if algorithm:
+            sql += " WHERE r.algorithm = ?"
+            args.append(algorithm)
+        sql += " ORDER BY r.run_id DESC LIMIT ?"
+        args.append(last_n)
+        return [dict(row) for row in self.conn.execute(sql, args)][::-1]
+
+    def machine_load(self, run_id: Optional[int] = None, machine_id: Optional[str] = None,
+                     last_n: int = 20) -> List[Dict]:
+        """
+        设备负载查询: 指定run_id时返回该次运行各设备负载;
+        指定machine_id时返回该设备最近last_n次运行的负载走势; 否则返回最新一次运行
+
+        返回:
+            [{'run_id', 'machine_id', 'busy_hours', 'num_ops', 'utilization'}, ...]
+        """
+        if machine_id is not None:
+            rows = self.conn.execute(
+                "SELECT * FROM run_machine_load WHERE machine_id = ? ORDER BY run_id DESC LIMIT ?",
+                (machine_id, last_n)
+            )
+            return [dict(row) for row in rows][::-1]
+        if run_id is None:
+            latest = self.conn.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+            if latest is None:
+                return []
+            run_id = latest
+        rows = self.conn.execute(
+            "SELECT * FROM run_machine_load WHERE run_id = ? ORDER BY busy_hours DESC", (run_id,)
+        )
+        return [dict(row) for row in rows]
+
+    def order_history(self, order_id: str, last_n: int = 20) -> List[Dict]:
+        """某订单最近last_n次运行的完工与拖期(按run_id升序)"""
+        rows = self.conn.execute(
+            "SELECT * FROM run_orders WHERE order_id = ? ORDER BY run_id DESC LIMIT ?",
+            (str(order_id), last_n)
+        )
+        return [dict(row) for row in rows][::-1]
+
+    def schedule(self, run_id: int) -> List[Dict]:
+        """某次运行的调度明细"""
+        rows = self.conn.execute(
+            "SELECT order_id, stage_idx, machine_id, start_time, finish_time, processing_time "
+            "FROM run_schedule WHERE run_id = ? ORDER BY start_time", (run_id,)
+        )
+        return [dict(row) for row in rows]
+
+
+def record_run(algorithm: str, kpis: Dict, completion_times: Dict, cols: Dict[str, np.ndarray],
+               data: Dict, params: Optional[Dict] = None, db_path: str = DEFAULT_HISTORY_DB) -> int:
+    """便捷函数: 打开历史库、记录一次运行并关闭,返回run_id"""
+    with RunHistory(db_path) as history:
+        return history.record_run(algorithm, kpis, completion_times, cols, data, params)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="运行历史查询")
+    parser.add_argument('--db', default=DEFAULT_HISTORY_DB, help='历史库路径')
+    parser.add_argument('--last', type=int, default=10, help='最近运行次数')
+    parser.add_argument('--algorithm', default=None, help='按算法过滤(GA/NSGA2)')
+    parser.add_argument('--kpi', default='total_weighted_tardiness', help='KPI趋势查询的指标名')
+    args = parser.parse_args()
+
+    with RunHistory(args.db) as history:
+        print(f"📚 最近 {args.last} 次运行:")
+        for run in history.list_runs(args.last, args.algorithm):
+            created = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['created_at']))
+            print(f"  #{run['run_id']:<5} {created}  {run['algorithm']:<6} 订单数={run['num_orders']} "
+                  f"数据={str(run['data_hash'])[:12]}")
+
+        print(f"\n📈 KPI趋势: {args.kpi}")
+        for row in history.kpi_trend(args.kpi, args.last, args.algorithm):
+            print(f"  #{row['run_id']:<5} {row['algorithm']:<6} {row['value']:.4f}")
+
+        print("\n🏭 最新一次运行设备负载:")
+        for row in history.machine_load():
+            print(f"  {row['machine_id']:<8} 工序数={row['num_ops']:<6} 加工小时={row['busy_hours']:.2f} "
+                  f"利用率={row['utilization']:.2f}%")
@@ -4,20 +4,34 @@ NSGA-II多目标优化主执行脚本
 生成帕累托前沿并分析最优解集
 """
 
+import os
+import sys
+import argparse
 import numpy as np
 import time
 import pandas as pd
 import matplotlib.pyplot as plt
 import random
+from typing import Callable, Dict, Optional
 from deap import algorithms, base, creator, tools
-from data_preprocessor import DataPreprocessor
+from data_preprocessor import DataPreprocessor, DEFAULT_CACHE_DIR
 from ffs_simulator import FFSSimulator
-from visualize import export_results
+from solver_control import SolverControl
+from visualize import export_results_async
+from run_history import DEFAULT_HISTORY_DB
+from metrics import PHASE_SECONDS, record_optimization
+import tracing
 
 
 # 全局变量存储仿真器
 simulator = None
 
+# NSGA-II参数
+POPULATION_SIZE = 80
+GENERATIONS = 200
+CROSSOVER_PROB = 0.9
+MUTATION_PROB = 0.1
+
 def evaluate_individual(individual):
     """评估个体的多目标适应度"""
     solution = np.array(individual)
@@ -25,25 +39,212 @@ def evaluate_individual(individual):
     return objectives
 
 
-def run_nsga2_optimization():
-    """运行NSGA-II多目标优化"""
+def _dominated_area_2d(points: np.ndarray, reference: np.ndarray) -> float:
+    """二维(最小化)点集相对参考点支配的面积: 按第一维升序扫描"""
+    area = 0.0
+    best_y = reference[1]
+    for x, y in points[np.argsort(points[:, 0])]:
+        if y < best_y:
+            area += (reference[0] - x) * (best_y - y)
+            best_y = y
+    return area
+
+
+def hypervolume_3d(points: np.ndarray, reference: np.ndarray) -> float:
+    """
+    三目标(均为最小化)超体积: 沿第三维切片,逐片累加二维支配面积
+    
+    参数:
+        points: (n, 3) 目标值(最小化方向)
+        reference: 参考点,劣于参考点的解不计入
+    """
+    points = points[np.all(points < reference, axis=1)]
+    if len(points) == 0:
+        return 0.0
+    points = points[np.argsort(points[:, 2])]
+    volume = 0.0
+    for i in range(len(points)):
+        z_next = points[i + 1, 2] if i + 1 < len(points) else reference[2]
+        depth = z_next - points[i, 2]
+        if depth > 0:
+            volume += _dominated_area_2d(points[:i + 1, :2], reference[:2]) * depth
+    return volume
+
+
+def create_deap_types():
+    """注册DEAP的多目标适应度类与个体类(常驻进程内重复运行时复用已创建的类)"""
+    if not hasattr(creator, "FitnessMulti"):
+        creator.create("FitnessMulti", base.Fitness, weights=(-1.0, 1.0, -1.0))  # 最小化拖期，最大化利用率，最小化makespan
+        creator.create("Individual", list, fitness=creator.FitnessMulti)
+
+
+def build_toolbox(chromosome_length: int, eta_crossover: float = 20.0, eta_mutation: float = 20.0) -> base.Toolbox:
+    """
+    构建DEAP工具箱: 随机实数编码个体、多目标评估(evaluate_individual)、SBX交叉、多项式变异、NSGA-II选择
+    
+    参数:
+        chromosome_length: 染色体长度
+        eta_crossover, eta_mutation: SBX交叉/多项式变异的分布指数(越大子代越接近父代)
+    """
+    # 创建适应度类和个体类
+    create_deap_types()
+    
+    # 创建工具箱
+    toolbox = base.Toolbox()
+    
+    # 注册基因生成函数
+    toolbox.register("attr_float", random.uniform, 0.0, 0.9999)
+    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_float, chromosome_length)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    
+    # 注册遗传操作
+    toolbox.register("evaluate", evaluate_individual)
+    toolbox.register("mate", tools.cxSimulatedBinaryBounded, low=0.0, up=0.9999, eta=eta_crossover)
+    toolbox.register("mutate", tools.mutPolynomialBounded, low=0.0, up=0.9999, eta=eta_mutation, indpb=1.0/chromosome_length)
+    toolbox.register("select", tools.selNSGA2)
+    return toolbox
+
+
+def _minimization_objectives(individuals) -> np.ndarray:
+    """个体加权适应度取反,统一为最小化方向"""
+    return -np.array([ind.fitness.wvalues for ind in individuals])
+
+
+def ea_mu_plus_lambda(population, toolbox, mu: int, lambda_: int, cxpb: float, mutpb: float, ngen: int,
+                      stats=None, verbose: bool = True,
+                      progress_callback: Optional[Callable[[Dict], None]] = None,
+                      progress_interval: float = 0.0,
+                      control: Optional[SolverControl] = None):
+    """
+    (mu + lambda)进化主循环,与deap.algorithms.eaMuPlusLambda一致,另支持每代进度回调
+    
+    参数:
+        progress_callback: 可选,每代结束时以进度字典调用(generation, generations, front_size,
+                           hypervolume, evaluations, evals_per_sec, elapsed); 为None时不计算前沿与超体积
+        progress_interval: 两次回调的最小间隔(秒),最后一代总会回调
+        control: 可选,求解控制; 每代开始前检查,已取消或超出时间预算时提前结束(返回当前种群)
+    
+    返回:
+        (population, logbook)
+    """
+    if control is not None:
+        control.start()
+    logbook = tools.Logbook()
+    logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+    
+    invalid_ind = [ind for ind in population if not ind.fitness.valid]
+    for ind, fit in zip(invalid_ind, toolbox.map(toolbox.evaluate, invalid_ind)):
+        ind.fitness.values = fit
+    
+    record = stats.compile(population) if stats is not None else {}
+    logbook.record(gen=0, nevals=len(invalid_ind), **record)
+    if verbose:
+        print(logbook.stream)
+    
+    if progress_callback is not None:
+        # 超体积按初始种群的目标范围归一化: 理想点→0, 最差点外扩10%作为参考点→1
+        initial = _minimization_objectives(population)
+        ideal = initial.min(axis=0)
+        scale = (initial.max(axis=0) - ideal) * 1.1
+        scale[scale <= 0] = 1.0
+        reference = np.ones(initial.shape[1])
+        start = time.time()
+        last_report = 0.0
+        evaluations = 0
+    
+    for gen in range(1, ngen + 1):
+        if control is not None and control.should_stop():
+            if verbose:
+                print(f"⏹️ 第 {gen - 1} 代后提前结束 ({control.stop_reason})")
+            break
+        generation_start = tracing.now_us()
+        
+        with tracing.span('NSGA2.variation', cat='nsga2'):
+            offspring = algorithms.varOr(population, toolbox, lambda_, cxpb, mutpb)
+        
+        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+        with tracing.span('NSGA2.evaluation', cat='nsga2', individuals=len(invalid_ind)):
+            for ind, fit in zip(invalid_ind, toolbox.map(toolbox.evaluate, invalid_ind)):
+                ind.fitness.values = fit
+        
+        with tracing.span('NSGA2.selection', cat='nsga2'):
+            population[:] = toolbox.select(population + offspring, mu)
+        
+        record = stats.compile(population) if stats is not None else {}
+        logbook.record(gen=gen, nevals=len(invalid_ind), **record)
+        if verbose:
+            print(logbook.stream)
+        tracing.complete('NSGA2.generation', generation_start, cat='nsga2', generation=gen)
+        
+        if progress_callback is not None:
+            evaluations += len(invalid_ind)
+            now = time.time()
+            if gen == ngen or now - last_report >= progress_interval:
+                last_report = now
+                front = tools.sortNondominated(population, len(population), first_front_only=True)[0]
+                points = (_minimization_objectives(front) - ideal) / scale
+                elapsed = now - start
+                progress_callback({
+                    'algorithm': 'NSGA2',
+                    'generation': gen,
+                    'generations': ngen,
+                    'front_size': len(front),
+                    'hypervolume': hypervolume_3d(points, reference),
+                    'evaluations': evaluations,
+                    'evals_per_sec': evaluations / elapsed if elapsed > 0 else 0.0,
+                    'elapsed': elapsed,
+                })
+    
+    return population, logbook
+
+
+def run_nsga2_optimization(columnar_format: Optional[str] = None, wait_export: bool = True,
+                           data: Optional[Dict] = None, sim: Optional[FFSSimulator] = None,
+                           progress_callback: Optional[Callable[[Dict], None]] = None,
+                           progress_interval: float = 0.0, seed: Optional[int] = None,
+                           input_dir: str = '.', output_dir: str = '.',
+                           control: Optional[SolverControl] = None, profile_every: Optional[int] = None,
+                           include_plotlyjs: str = 'directory', history_db: Optional[str] = DEFAULT_HISTORY_DB):
+    """
+    运行NSGA-II多目标优化
+    
+    参数:
+        columnar_format: 可选,额外导出列式结果文件('arrow'/'parquet')
+        wait_export: 是否在返回前等待后台导出完成(导出失败时抛出异常);
+                     为False时立即返回,可通过read_export_status('NSGA2')检查
+        data: 可选,已预处理的数据字典(常驻进程复用,跳过预处理)
+        sim: 可选,基于data构建的仿真器(常驻进程复用,跳过构建)
+        progress_callback: 可选,每代进度回调(见ea_mu_plus_lambda)
+        progress_interval: 进度回调的最小间隔(秒)
+        seed: 可选,随机种子(相同输入与种子得到相同帕累托前沿)
+        input_dir: 输入CSV所在目录(data为None时使用)
+        output_dir: 结果文件输出目录
+        control: 可选,求解控制(取消/时间预算); 提前结束时以当前种群的帕累托前沿输出结果
+        profile_every: 可选,开启仿真器热路径剖析,每N次评估对各阶段采样计时(结果打印并记入运行历史)
+        include_plotlyjs: 甘特图的plotly.js引用方式(默认同目录复制plotly.min.js; Web作业传共享脚本URL)
+        history_db: 运行历史SQLite库路径(相对路径相对于output_dir); None表示不记录
+    """
     global simulator
     
+    if seed is not None:
+        np.random.seed(seed)
+        random.seed(seed)
+    
     print("🚀 开始NSGA-II多目标优化...")
     start_time = time.time()
     
     # ========== 步骤1: 数据预处理 ==========
-    print("\n📊 加载和预处理数据...")
-    preprocessor = DataPreprocessor(
-        orders_file='订单数据.csv',
-        process_times_file='工序加工时间.csv',
-        machines_file='设备可用时间.csv'
-    )
-    data = preprocessor.process()
+    if data is None:
+        print("\n📊 加载和预处理数据...")
+        preprocessor = DataPreprocessor.from_directory(input_dir)
+        data = preprocessor.process(cache_dir=DEFAULT_CACHE_DIR)
+        PHASE_SECONDS.observe(time.time() - start_time, algorithm='NSGA2', phase='preprocess')
     
     # ========== 步骤2: 创建仿真器 ==========
-    print("🎯 创建FFS仿真器...")
-    simulator = FFSSimulator(data)
+    if sim is None:
+        print("🎯 创建FFS仿真器...")
+        sim = FFSSimulator(data)
+    simulator = sim
     
     # ========== 步骤3: 配置DEAP框架 ==========
     print("⚙️ 配置DEAP NSGA-II框架...")
@@ -51,34 +252,10 @@ def run_nsga2_optimization():
     # 染色体维度
     total_ops = data['num_orders'] * data['num_stages']
     CHROMOSOME_LENGTH = total_ops * 2  # OS + MS
-    
-    # 创建适应度类和个体类
-    creator.create("FitnessMulti", base.Fitness, weights=(-1.0, 1.0, -1.0))  # 最小化拖期，最大化利用率，最小化makespan
-    creator.create("Individual", list, fitness=creator.FitnessMulti)
-    
-    # 创建工具箱
-    toolbox = base.Toolbox()
-    
-    # 注册基因生成函数
-    toolbox.register("attr_float", random.uniform, 0.0, 0.9999)
-    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_float, CHROMOSOME_LENGTH)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-    
-    # 注册遗传操作
-    toolbox.register("evaluate", evaluate_individual)
-    toolbox.register("mate", tools.cxSimulatedBinaryBounded, low=0.0, up=0.9999, eta=20.0)
-    toolbox.register("mutate", tools.mutPolynomialBounded, low=0.0, up=0.9999, eta=20.0, indpb=1.0/CHROMOSOME_LENGTH)
-    toolbox.register("select", tools.selNSGA2)
+    toolbox = build_toolbox(CHROMOSOME_LENGTH)
     
     # ========== 步骤4: 运行NSGA-II优化 ==========
     print("🔄 开始NSGA-II优化...")
-    
-    # 参数设置
-    POPULATION_SIZE = 80
-    GENERATIONS = 200
-    CROSSOVER_PROB = 0.9
-    MUTATION_PROB = 0.1
-    
     print(f"  - 目标函数: [拖期+惩罚, -利用率, Makespan]")
     print(f"  - 种群大小: {POPULATION_SIZE}")
     print(f"  - 迭代次数: {GENERATIONS}")
@@ -86,12 +263,14 @@ def run_nsga2_optimization():
     print(f"  - 变异概率: {MUTATION_PROB}")
     
     # 创建初始种群
-    population = toolbox.population(n=POPULATION_SIZE)
-    
-    # 评估初始种群
-    fitnesses = list(map(toolbox.evaluate, population))
-    for ind, fit in zip(population, fitnesses):
-        ind.fitness.values = fit
+    optimization_start = time.time()
+    with tracing.span('NSGA2.init_population', cat='nsga2', pop_size=POPULATION_SIZE):
+        population = toolbox.population(n=POPULATION_SIZE)
+        
+        # 评估初始种群
+        fitnesses = list(map(toolbox.evaluate, population))
+        for ind, fit in zip(population, fitnesses):
+            ind.fitness.values = fit
     
     # 统计信息
     stats = tools.Statistics(lambda ind: ind.fitness.values)
@@ -100,14 +279,27 @@ def run_nsga2_optimization():
     stats.register("max", np.max, axis=0)
     
     # 运行NSGA-II算法
-    population, logbook = algorithms.eaMuPlusLambda(
-        population, toolbox, mu=POPULATION_SIZE, lambda_=POPULATION_SIZE,
-        cxpb=CROSSOVER_PROB, mutpb=MUTATION_PROB, ngen=GENERATIONS,
-        stats=stats, verbose=True
-    )
+    profiler = sim.enable_profiling(profile_every) if profile_every else None
+    try:
+        population, logbook = ea_mu_plus_lambda(
+            population, toolbox, mu=POPULATION_SIZE, lambda_=POPULATION_SIZE,
+            cxpb=CROSSOVER_PROB, mutpb=MUTATION_PROB, ngen=GENERATIONS,
+            stats=stats, verbose=True,
+            progress_callback=progress_callback, progress_interval=progress_interval, control=control
+        )
+    finally:
+        simulator_profile = sim.disable_profiling()
     
     optimization_time = time.time() - start_time
-    print(f"\n✅ NSGA-II优化完成! 耗时: {optimization_time:.2f}秒")
+    record_optimization('NSGA2', POPULATION_SIZE + sum(logbook.select('nevals')),
+                        time.time() - optimization_start)
+    stop_reason = control.stop_reason if control is not None else None
+    if stop_reason is not None:
+        print(f"\n⏹️ NSGA-II优化提前结束({stop_reason}),完成 {len(logbook) - 1}/{GENERATIONS} 代,耗时: {optimization_time:.2f}秒")
+    else:
+        print(f"\n✅ NSGA-II优化完成! 耗时: {optimization_time:.2f}秒")
+    if profiler is not None:
+        profiler.print_report()
     
     # ========== 步骤5: 获取帕累托前沿 ==========
     print("\n📈 分析帕累托前沿...")
@@ -198,20 +390,31 @@ def run_nsga2_optimization():
     # 选择平衡解作为最终解进行导出
     final_result = results["平衡解"]
     
-    # 导出调度结果
-    export_results(
+    # 导出调度结果(CSV/甘特图在后台线程写出)
+    export_handle = export_results_async(
         final_result['completion_times'],
         final_result['schedule'],
         final_result['kpis'],
         data,
-        algorithm="NSGA2"
+        algorithm="NSGA2",
+        output_dir=output_dir,
+        columnar_format=columnar_format,
+        include_plotlyjs=include_plotlyjs,
+        history_db=history_db,
+        run_params={
+            'population_size': POPULATION_SIZE, 'generations': GENERATIONS,
+            'crossover_prob': CROSSOVER_PROB, 'mutation_prob': MUTATION_PROB,
+            'selected_solution': '平衡解', 'seed': seed,
+            'generations_completed': len(logbook) - 1, 'stop_reason': stop_reason,
+            'simulator_profile': simulator_profile,
+        }
     )
     
     # 保存帕累托前沿数据
     pareto_df = pd.DataFrame(pareto_objectives, columns=['Tardiness_Penalty', 'Neg_Utilization', 'Makespan'])
     pareto_df['Utilization'] = -pareto_df['Neg_Utilization']
     pareto_df.drop('Neg_Utilization', axis=1, inplace=True)
-    pareto_df.to_csv('pareto_front_NSGA2.csv', index=False)
+    pareto_df.to_csv(os.path.join(output_dir, 'pareto_front_NSGA2.csv'), index=False)
     
     # 保存代表性解的KPI对比
     comparison_data = []
@@ -229,23 +432,51 @@ def run_nsga2_optimization():
         })
     
     comparison_df = pd.DataFrame(comparison_data)
-    comparison_df.to_csv('nsga2_solutions_comparison.csv', index=False)
+    comparison_df.to_csv(os.path.join(output_dir, 'nsga2_solutions_comparison.csv'), index=False)
     
     print(f"✅ 结果已导出:")
     print(f"  - 帕累托前沿: pareto_front_NSGA2.csv")
     print(f"  - 解集对比: nsga2_solutions_comparison.csv")
-    print(f"  - 调度结果: schedule_orders_NSGA2.csv, schedule_kpis_NSGA2.csv")
-    print(f"  - 甘特图: schedule_gantt_NSGA2.html")
+    print(f"  - 调度结果: schedule_orders_NSGA2.csv, schedule_kpis_NSGA2.csv (后台写出)")
+    print(f"  - 甘特图: schedule_gantt_NSGA2.html (后台写出)")
+    
+    if wait_export:
+        export_handle.wait()  # 导出失败时在此抛出
+        print(f"✅ 后台结果导出完成,耗时: {export_handle.elapsed:.2f} 秒")
     
     return results, pareto_objectives, pareto_solutions
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FFS调度NSGA-II求解器")
+    parser.add_argument('--columnar', choices=['arrow', 'parquet'], default=None, help='额外导出列式结果文件')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子(用于复现结果)')
+    parser.add_argument('--input-dir', default='.', help='输入CSV所在目录')
+    parser.add_argument('--output-dir', default='.', help='结果文件输出目录')
+    parser.add_argument('--time-budget', type=float, default=None, help='优化时间预算(秒),超出后输出当前帕累托前沿')
+    parser.add_argument('--profile-every', type=int, default=None, help='剖析仿真器各阶段耗时,每N次评估采样一次')
+    parser.add_argument('--trace', default=None, help='写出Chrome trace-event格式的运行追踪(JSON路径)')
+    parser.add_argument('--include-plotlyjs', default='directory',
+                        help="甘特图的plotly.js引用方式: directory(同目录复制)或共享脚本的路径/URL")
+    parser.add_argument('--history-db', default=DEFAULT_HISTORY_DB,
+                        help='运行历史库路径(相对路径相对于--output-dir,空字符串表示不记录)')
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable('run_nsga2')
     try:
-        results, pareto_front, pareto_solutions = run_nsga2_optimization()
+        results, pareto_front, pareto_solutions = run_nsga2_optimization(
+            columnar_format=args.columnar, seed=args.seed,
+            input_dir=args.input_dir, output_dir=args.output_dir,
+            control=SolverControl(time_budget=args.time_budget), profile_every=args.profile_every,
+            include_plotlyjs=args.include_plotlyjs, history_db=args.history_db or None
+        )
         print("\n🎉 NSGA-II多目标优化成功完成!")
         
     except Exception as e:
         print(f"\n❌ NSGA-II优化过程中出现错误: {e}")
         import traceback
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        if args.trace:
+            print(f"🧭 运行追踪已写出: {tracing.disable().write(args.trace)}")
\ No newline at end of file
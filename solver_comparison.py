@@ -0,0 +1,478 @@
+"""
+求解器对比评测
+功能: 在多个算例 × 多个随机种子上并行运行GA(run_ga)、NSGA-II(run_nsga2)与任意mealpy优化器,
+以同一标量目标(总加权拖期 + 惩罚,即fit_func / pareto_fitness第一目标)记录
+"最优值-时间"与"最优值-评估次数"的随时间改进轨迹(anytime profile);
+据此计算达到目标质量的时间/评估次数(time-to-target)分布与Dolan-Moré性能剖面,输出CSV与HTML报告,
+用于在时间预算内选出满足质量目标且代价最低的求解器
+
+目标质量: 各算例所有运行中的最优值 × (1 + gap),gap由--target-gaps给出(可多个)
+
+用法:
+    python solver_comparison.py --solvers GA NSGA2 mealpy:DE.OriginalDE --tiers sample small \\
+        --seeds 5 --time-budget 30 --jobs 4
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_preprocessor import DataPreprocessor
+from ffs_simulator import FFSSimulator
+from instance_generator import TIERS, generate_tier
+from solver_control import SolverControl
+
+DEFAULT_OUTPUT_DIR = 'comparison_results'
+DEFAULT_TARGET_GAPS = (0.01, 0.05)
+# mealpy优化器默认参数(epoch取其允许的上限,实际由时间/评估预算终止)
+MEALPY_EPOCHS = 100000
+MEALPY_POP_SIZE = 50
+# 评估次数上限达到后提前结束的原因
+STOP_MAX_EVALUATIONS = 'max_evaluations'
+# 轨迹插值网格点数(HTML曲线与分位数带)
+PROFILE_GRID_POINTS = 200
+
+# 工作进程内的算例缓存 {算例目录: 预处理数据}
+_instance_cache: Dict[str, Dict] = {}
+
+
+class AnytimeRecorder:
+    """
+    适应度评估记录器: 以实例属性替换仿真器的fit_func/pareto_fitness(同FFSSimulator.enable_profiling),
+    统计评估次数并在标量目标改进时记录(耗时, 评估次数, 最优值);
+    达到评估次数上限时请求求解控制停止(求解器在下一代开始前结束)
+    """
+
+    def __init__(self, simulator: FFSSimulator, control: Optional[SolverControl] = None,
+                 max_evaluations: Optional[int] = None):
+        self.simulator = simulator
+        self.control = control
+        self.max_evaluations = max_evaluations
+        self.evaluations = 0
+        self.best = math.inf
+        self.trace: List[Tuple[float, int, float]] = []
+        self.start = time.perf_counter()
+
+    def attach(self):
+        self.start = time.perf_counter()
+        self.simulator.fit_func = self._fit_func
+        self.simulator.pareto_fitness = self._pareto_fitness
+
+    def detach(self):
+        self.simulator.__dict__.pop('fit_func', None)
+        self.simulator.__dict__.pop('pareto_fitness', None)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def _record(self, value: float):
+        self.evaluations += 1
+        if value < self.best:
+            self.best = value
+            self.trace.append((self.elapsed(), self.evaluations, value))
+        if self.max_evaluations and self.evaluations >= self.max_evaluations and self.control is not None:
+            self.control.cancel()
+
+    def _fit_func(self, solution: np.ndarray) -> float:
+        value = FFSSimulator.fit_func(self.simulator, solution)
+        self._record(value)
+        return value
+
+    def _pareto_fitness(self, solution: np.ndarray) -> List[float]:
+        objectives = FFSSimulator.pareto_fitness(self.simulator, solution)
+        self._record(objectives[0])
+        return objectives
+
+
+def _load_instance(directory: str) -> Dict:
+    if directory not in _instance_cache:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _instance_cache[directory] = DataPreprocessor.from_directory(directory).process()
+    return _instance_cache[directory]
+
+
+def _run_ga(simulator: FFSSimulator, control: SolverControl, seed: int):
+    from run_ga import run_ga_optimization
+    np.random.seed(seed)
+    random.seed(seed)
+    run_ga_optimization(simulator, epochs=10 ** 9, verbose=False, control=control)
+
+
+def _run_nsga2(simulator: FFSSimulator, control: SolverControl, seed: int):
+    import run_nsga2
+    np.random.seed(seed)
+    random.seed(seed)
+    run_nsga2.simulator = simulator
+    toolbox = run_nsga2.build_toolbox(simulator.total_ops * 2)
+    population = toolbox.population(n=run_nsga2.POPULATION_SIZE)
+    for ind in population:
+        ind.fitness.values = toolbox.evaluate(ind)
+    run_nsga2.ea_mu_plus_lambda(
+        population, toolbox, mu=run_nsga2.POPULATION_SIZE, lambda_=run_nsga2.POPULATION_SIZE,
+        cxpb=run_nsga2.CROSSOVER_PROB, mutpb=run_nsga2.MUTATION_PROB, ngen=10 ** 9,
+        verbose=False, control=control,
+    )
+
+
+def _run_mealpy(spec: str, simulator: FFSSimulator, control: SolverControl, seed: int,
+                max_evaluations: Optional[int]):
+    # spec形如 "mealpy:DE.OriginalDE"(模块.类名)
+    import mealpy
+    module_name, _, class_name = spec.split(':', 1)[1].partition('.')
+    try:
+        optimizer_cls = getattr(getattr(mealpy, module_name), class_name)
+    except AttributeError:
+        raise ValueError(f"未找到mealpy优化器: {spec} (格式: mealpy:<模块>.<类名>,如 mealpy:DE.OriginalDE)")
+    termination = {'max_epoch': MEALPY_EPOCHS}
+    if control.time_budget is not None:
+        termination['max_time'] = control.time_budget
+    if max_evaluations:
+        termination['max_fe'] = max_evaluations
+    optimizer = optimizer_cls(epoch=MEALPY_EPOCHS, pop_size=MEALPY_POP_SIZE)
+    optimizer.solve(simulator, termination=termination, seed=seed)
+
+
+def run_single(solver: str, instance: str, directory: str, seed: int, time_budget: float,
+               max_evaluations: Optional[int] = None) -> Dict:
+    """
+    在一个算例上以一个种子运行一个求解器(进程池任务)
+
+    参数:
+        solver: 'GA' / 'NSGA2' / 'mealpy:<模块>.<类名>'
+        instance: 算例名称(报告中使用)
+        directory: 算例输入目录
+        seed: 随机种子
+        time_budget: 时间预算(秒)
+        max_evaluations: 可选,适应度评估次数上限
+
+    返回:
+        {'solver', 'instance', 'seed', 'best_fitness', 'evaluations', 'elapsed', 'stop_reason',
+         'trace': [(耗时, 评估次数, 最优值)], 'error'}
+    """
+    from run_ga import configure_objective
+    result = {'solver': solver, 'instance': instance, 'seed': seed, 'error': None}
+    recorder = None
+    control = SolverControl(time_budget=time_budget)
+    try:
+        data = _load_instance(directory)
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulator = FFSSimulator(data, log_to=None)
+        # 所有求解器使用与GA主流程相同的目标配置,标量目标可直接比较
+        configure_objective(simulator)
+        recorder = AnytimeRecorder(simulator, control, max_evaluations)
+        recorder.attach()
+        control.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if solver == 'GA':
+                _run_ga(simulator, control, seed)
+            elif solver == 'NSGA2':
+                _run_nsga2(simulator, control, seed)
+            elif solver.startswith('mealpy:'):
+                _run_mealpy(solver, simulator, control, seed, max_evaluations)
+            else:
+                raise ValueError(f"未知求解器: {solver}")
+        recorder.detach()
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    if recorder is None:
+        result.update(best_fitness=None, evaluations=0, elapsed=0.0, stop_reason=None, trace=[])
+        return result
+
+    stop_reason = control.stop_reason
+    if max_evaluations and recorder.evaluations >= max_evaluations:
+        stop_reason = STOP_MAX_EVALUATIONS
+    elif solver.startswith('mealpy:') and time_budget and recorder.elapsed() >= time_budget:
+        stop_reason = 'time_budget'
+    result.update(
+        best_fitness=recorder.best if recorder.trace else None,
+        evaluations=recorder.evaluations,
+        elapsed=recorder.elapsed(),
+        stop_reason=stop_reason,
+        trace=recorder.trace,
+    )
+    return result
+
+
+def run_comparison(solvers: Sequence[str], instances: Dict[str, str], seeds: Sequence[int],
+                   time_budget: float, max_evaluations: Optional[int] = None,
+                   jobs: Optional[int] = None) -> List[Dict]:
+    """
+    并行运行 求解器 × 算例 × 种子 的全部组合
+
+    参数:
+        instances: {算例名称: 输入目录}
+        jobs: 并行进程数(默认CPU核数); 并行运行会相互争用CPU,时间类指标请结合核数设置
+    """
+    tasks = [(solver, name, directory, seed) for name, directory in instances.items()
+             for solver in solvers for seed in seeds]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks)))
+    print(f"🚀 共 {len(tasks)} 次运行 ({len(solvers)} 求解器 × {len(instances)} 算例 × {len(seeds)} 种子), "
+          f"并行 {jobs} 进程, 每次预算 {time_budget} 秒")
+    results = []
+    # spawn: 与常驻求解进程池一致,避免fork继承父进程线程状态
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [pool.submit(run_single, *task, time_budget, max_evaluations) for task in tasks]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['error']:
+                print(f"  ❌ {result['solver']:<20} {result['instance']:<12} seed={result['seed']}: {result['error']}")
+            else:
+                print(f"  ✓ {result['solver']:<20} {result['instance']:<12} seed={result['seed']:<4} "
+                      f"最优={result['best_fitness']:.4f} 评估={result['evaluations']} ({result['elapsed']:.1f}秒)")
+    results.sort(key=lambda r: (r['instance'], r['solver'], r['seed']))
+    return results
+
+
+def _hit(trace: Sequence[Tuple[float, int, float]], target: float) -> Tuple[Optional[float], Optional[int]]:
+    """轨迹中首次达到target的(耗时, 评估次数); 未达到时为(None, None)"""
+    for elapsed, evaluations, value in trace:
+        if value <= target:
+            return elapsed, evaluations
+    return None, None
+
+
+def _target(best_known: float, gap: float) -> float:
+    return best_known + gap * abs(best_known)
+
+
+def analyze(results: List[Dict], target_gaps: Sequence[float] = DEFAULT_TARGET_GAPS) -> Dict[str, pd.DataFrame]:
+    """
+    由运行结果计算各类表格
+
+    返回:
+        {'traces': 改进轨迹, 'runs': 每次运行汇总(含各gap的达标时间/评估次数),
+         'time_to_target': 达标时间经验分布(ECDF), 'performance_profile': 性能剖面,
+         'summary': 求解器 × 算例汇总}
+    """
+    ok = [r for r in results if not r['error'] and r['best_fitness'] is not None]
+    best_known = {}
+    for r in ok:
+        best_known[r['instance']] = min(best_known.get(r['instance'], math.inf), r['best_fitness'])
+
+    trace_rows, run_rows = [], []
+    for r in results:
+        for elapsed, evaluations, value in r['trace']:
+            trace_rows.append({'solver': r['solver'], 'instance': r['instance'], 'seed': r['seed'],
+                               'elapsed': elapsed, 'evaluations': evaluations, 'best_fitness': value})
+        row = {key: r[key] for key in ('solver', 'instance', 'seed', 'best_fitness', 'evaluations',
+                                       'elapsed', 'stop_reason', 'error')}
+        row['evals_per_sec'] = r['evaluations'] / r['elapsed'] if r['elapsed'] else None
+        for gap in target_gaps:
+            hit_time, hit_evals = (None, None)
+            if r['instance'] in best_known and not r['error']:
+                hit_time, hit_evals = _hit(r['trace'], _target(best_known[r['instance']], gap))
+            row[f'time_to_target_{gap:g}'] = hit_time
+            row[f'evals_to_target_{gap:g}'] = hit_evals
+        run_rows.append(row)
+    runs = pd.DataFrame(run_rows)
+    traces = pd.DataFrame(trace_rows, columns=['solver', 'instance', 'seed', 'elapsed', 'evaluations', 'best_fitness'])
+
+    # 达标时间ECDF: 各求解器全部运行中,在t秒内达标的比例(未达标的运行计入分母)
+    ttt_rows, profile_rows = [], []
+    solvers = list(dict.fromkeys(runs['solver'])) if len(runs) else []
+    for gap in target_gaps:
+        for measure in ('time', 'evals'):
+            column = f'{measure}_to_target_{gap:g}'
+            for solver in solvers:
+                values = runs.loc[runs['solver'] == solver, column]
+                total = len(values)
+                reached = np.sort(values.dropna().to_numpy(dtype=float))
+                for i, value in enumerate(reached, start=1):
+                    ttt_rows.append({'target_gap': gap, 'measure': measure, 'solver': solver,
+                                     'value': value, 'fraction_solved': i / total})
+            # 性能剖面: 问题 = (算例, 种子); 代价比 = 该求解器达标代价 / 各求解器最小达标代价
+            costs = runs.pivot_table(index=['instance', 'seed'], columns='solver', values=column, aggfunc='first')
+            costs = costs.reindex(columns=solvers)
+            ratios = costs.div(costs.min(axis=1), axis=0).fillna(math.inf)
+            finite = ratios.to_numpy()[np.isfinite(ratios.to_numpy())]
+            taus = np.unique(np.concatenate([[1.0], finite])) if finite.size else np.array([1.0])
+            for solver in solvers:
+                column_ratios = ratios[solver].to_numpy() if solver in ratios else np.array([])
+                for tau in taus:
+                    fraction = float(np.mean(column_ratios <= tau)) if column_ratios.size else 0.0
+                    profile_rows.append({'target_gap': gap, 'measure': measure, 'solver': solver,
+                                         'tau': float(tau), 'fraction': fraction})
+    time_to_target = pd.DataFrame(ttt_rows, columns=['target_gap', 'measure', 'solver', 'value', 'fraction_solved'])
+    performance_profile = pd.DataFrame(profile_rows, columns=['target_gap', 'measure', 'solver', 'tau', 'fraction'])
+
+    summary_rows = []
+    for (solver, instance), group in runs.groupby(['solver', 'instance'], sort=False):
+        row = {
+            'solver': solver, 'instance': instance, 'runs': len(group),
+            'errors': int(group['error'].notna().sum()),
+            'best_known': best_known.get(instance),
+            'median_best_fitness': group['best_fitness'].median(),
+            'min_best_fitness': group['best_fitness'].min(),
+            'median_evals_per_sec': group['evals_per_sec'].median(),
+        }
+        for gap in target_gaps:
+            hits = group[f'time_to_target_{gap:g}']
+            row[f'success_rate_{gap:g}'] = float(hits.notna().mean())
+            row[f'median_time_to_target_{gap:g}'] = hits.median()
+            row[f'median_evals_to_target_{gap:g}'] = group[f'evals_to_target_{gap:g}'].median()
+        summary_rows.append(row)
+    summary = pd.DataFrame(summary_rows)
+    return {'traces': traces, 'runs': runs, 'time_to_target': time_to_target,
+            'performance_profile': performance_profile, 'summary': summary}
+
+
+def _step_values(trace: pd.DataFrame, column: str, grid: np.ndarray) -> np.ndarray:
+    """改进轨迹在grid各点处的最优值(阶梯函数; 首次评估前为NaN)"""
+    x = trace[column].to_numpy(dtype=float)
+    y = trace['best_fitness'].to_numpy(dtype=float)
+    idx = np.searchsorted(x, grid, side='right') - 1
+    values = np.where(idx >= 0, y[np.clip(idx, 0, None)], np.nan)
+    return values
+
+
+def write_html_report(tables: Dict[str, pd.DataFrame], path: str, time_budget: float):
+    """写出HTML报告: 各算例的最优值-时间/评估次数曲线(中位数与四分位带)、达标时间ECDF、性能剖面"""
+    import plotly.graph_objects as go
+    from plotly.offline import get_plotlyjs
+    from plotly.subplots import make_subplots
+
+    traces, runs = tables['traces'], tables['runs']
+    instances = list(dict.fromkeys(runs['instance']))
+    solvers = list(dict.fromkeys(runs['solver']))
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
+    figures = []
+
+    anytime = make_subplots(rows=max(1, len(instances)), cols=2, subplot_titles=[
+        title for name in instances for title in (f"{name}: 最优值-时间", f"{name}: 最优值-评估次数")])
+    for row, instance in enumerate(instances, start=1):
+        for s, solver in enumerate(solvers):
+            color = colors[s % len(colors)]
+            subset = traces[(traces['instance'] == instance) & (traces['solver'] == solver)]
+            if subset.empty:
+                continue
+            for col, column in ((1, 'elapsed'), (2, 'evaluations')):
+                upper = time_budget if column == 'elapsed' else subset[column].max()
+                grid = np.linspace(0.0, upper, PROFILE_GRID_POINTS)
+                curves = np.array([_step_values(group, column, grid) for _, group in subset.groupby('seed')])
+                # 首次评估前各种子均为NaN,此处分位数为NaN(曲线留空)
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    q25, median, q75 = np.nanpercentile(curves, [25, 50, 75], axis=0)
+                show = row == 1 and col == 1
+                anytime.add_trace(go.Scatter(x=np.concatenate([grid, grid[::-1]]),
+                                             y=np.concatenate([q75, q25[::-1]]), fill='toself',
+                                             fillcolor=color, opacity=0.15, line={'width': 0},
+                                             hoverinfo='skip', showlegend=False, legendgroup=solver),
+                                  row=row, col=col)
+                anytime.add_trace(go.Scatter(x=grid, y=median, mode='lines', name=solver, line={'color': color},
+                                             legendgroup=solver, showlegend=show), row=row, col=col)
+    anytime.update_layout(title='最优值随时间/评估次数的变化(中位数与四分位带)',
+                          height=320 * max(1, len(instances)))
+    anytime.update_yaxes(type='log')
+    figures.append(anytime)
+
+    for name, table, x_column, y_column, title in (
+            ('time_to_target', tables['time_to_target'], 'value', 'fraction_solved', '达标时间/评估次数经验分布'),
+            ('performance_profile', tables['performance_profile'], 'tau', 'fraction', '性能剖面(Dolan-Moré)')):
+        combos = list(dict.fromkeys(zip(table['target_gap'], table['measure'])))
+        if not combos:
+            continue
+        fig = make_subplots(rows=1, cols=len(combos), subplot_titles=[
+            f"gap={gap:g}, {'时间(秒)' if measure == 'time' else '评估次数'}" for gap, measure in combos])
+        for c, (gap, measure) in enumerate(combos, start=1):
+            for s, solver in enumerate(solvers):
+                subset = table[(table['target_gap'] == gap) & (table['measure'] == measure)
+                               & (table['solver'] == solver)]
+                if subset.empty:
+                    continue
+                fig.add_trace(go.Scatter(x=subset[x_column], y=subset[y_column], mode='lines',
+                                         line={'shape': 'hv', 'color': colors[s % len(colors)]},
+                                         name=solver, legendgroup=solver, showlegend=c == 1), row=1, col=c)
+        fig.update_layout(title=title, height=380)
+        fig.update_yaxes(range=[0, 1.02])
+        if name == 'performance_profile':
+            fig.update_xaxes(type='log', title_text='τ (相对最优求解器的代价比)')
+        figures.append(fig)
+
+    # plotly.js与HTML同目录共享(同甘特图)
+    directory = os.path.dirname(os.path.abspath(path))
+    bundle = os.path.join(directory, 'plotly.min.js')
+    if not os.path.exists(bundle):
+        with open(bundle, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+    summary_html = tables['summary'].to_html(index=False, float_format=lambda v: f"{v:.4g}", na_rep='-')
+    body = '\n'.join(fig.to_html(full_html=False, include_plotlyjs=False) for fig in figures)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>求解器对比评测</title>
+<script src="plotly.min.js"></script>
+<style>body{{font-family:sans-serif;margin:20px}} table{{border-collapse:collapse;font-size:13px}}
+td,th{{border:1px solid #ccc;padding:3px 6px;text-align:right}}</style></head>
+<body><h2>求解器对比评测</h2>
+<p>时间预算 {time_budget} 秒/次; 目标 = 各算例所有运行中的最优值 × (1 + gap)</p>
+{summary_html}
+{body}
+</body></html>""")
+
+
+def write_outputs(tables: Dict[str, pd.DataFrame], output_dir: str, time_budget: float) -> Dict[str, str]:
+    """写出CSV表格与HTML报告,返回{名称: 路径}"""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for name, table in tables.items():
+        paths[name] = os.path.join(output_dir, f'{name}.csv')
+        table.to_csv(paths[name], index=False, encoding='utf-8-sig')
+    paths['html'] = os.path.join(output_dir, 'solver_comparison.html')
+    write_html_report(tables, paths['html'], time_budget)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FFS求解器对比评测(达标时间与anytime剖面)")
+    parser.add_argument('--solvers', nargs='+', default=['GA', 'NSGA2'],
+                        help="求解器: GA / NSGA2 / mealpy:<模块>.<类名>(如 mealpy:DE.OriginalDE)")
+    parser.add_argument('--instances', nargs='*', default=[], help='算例输入目录(可多个)')
+    parser.add_argument('--tiers', nargs='*', default=[], choices=list(TIERS), help='按命名档位生成算例')
+    parser.add_argument('--instance-seed', type=int, default=0, help='生成档位算例的随机种子')
+    parser.add_argument('--seeds', type=int, default=5, help='每个求解器/算例的运行次数(种子0..N-1)')
+    parser.add_argument('--seed-base', type=int, default=0, help='起始种子')
+    parser.add_argument('--time-budget', type=float, default=30.0, help='每次运行的时间预算(秒)')
+    parser.add_argument('--max-evals', type=int, default=None, help='每次运行的适应度评估次数上限')
+    parser.add_argument('--target-gaps', type=float, nargs='+', default=list(DEFAULT_TARGET_GAPS),
+                        help='目标质量相对各算例最优值的差距(如0.05表示5%%以内)')
+    parser.add_argument('--jobs', type=int, default=None, help='并行进程数(默认CPU核数)')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='结果输出目录')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='ffs_compare_') as workdir:
+        instances = {os.path.basename(os.path.abspath(d)) or d: d for d in args.instances}
+        for tier in args.tiers:
+            instances[tier] = generate_tier(tier, os.path.join(workdir, tier), seed=args.instance_seed)['output_dir']
+        if not instances:
+            instances = {'default': '.'}
+        seeds = list(range(args.seed_base, args.seed_base + args.seeds))
+        results = run_comparison(args.solvers, instances, seeds, args.time_budget, args.max_evals, args.jobs)
+
+    tables = analyze(results, args.target_gaps)
+    paths = write_outputs(tables, args.output_dir, args.time_budget)
+
+    print("\n📊 汇总:")
+    columns = ['solver', 'instance', 'runs', 'median_best_fitness'] + \
+        [f'success_rate_{gap:g}' for gap in args.target_gaps] + \
+        [f'median_time_to_target_{gap:g}' for gap in args.target_gaps]
+    print(tables['summary'][columns].to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    print("\n📁 输出文件:")
+    for path in paths.values():
+        print(f"  ✓ {path}")
+
+
+if __name__ == "__main__":
+    main()
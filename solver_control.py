@@ -0,0 +1,111 @@
+"""
+求解控制
+功能: 协作式停止GA/NSGA-II求解 —— 求解器在每代之间检查SolverControl,
+收到取消请求或超出时间预算时提前结束,并照常评估/导出当前最优结果;
+控制状态可放入进程间共享内存,由Web端在求解进行中取消或调整时间预算
+"""
+
+import threading
+import time
+from typing import Dict, MutableSequence, Optional
+
+# 提前结束原因
+STOP_CANCELLED = 'cancelled'
+STOP_TIME_BUDGET = 'time_budget'
+
+# 控制状态槽位: [取消标志, 开始时间(0表示未开始), 时间预算秒数(<=0表示不限)]
+_CANCELLED, _STARTED_AT, _TIME_BUDGET = range(3)
+STATE_SIZE = 3
+
+
+class SolverControl:
+    """
+    求解控制: 取消请求与时间预算(自start()起计时)
+
+    状态保存在长度为STATE_SIZE的浮点序列中,默认为进程内列表;
+    attach()后改存于multiprocessing共享数组,另一进程以同一数组构造SolverControl即可读取
+    """
+
+    def __init__(self, time_budget: Optional[float] = None,
+                 state: Optional[MutableSequence[float]] = None):
+        """
+        参数:
+            time_budget: 时间预算(秒),None表示不限
+            state: 可选,已有的控制状态(如常驻求解进程收到的共享数组)
+        """
+        self._state = state if state is not None else [0.0] * STATE_SIZE
+        self._lock = threading.Lock()
+        self.stop_reason: Optional[str] = None
+        if time_budget is not None:
+            self.set_time_budget(time_budget)
+
+    def attach(self, shared: MutableSequence[float]):
+        """将当前状态复制到共享数组,此后的读写均作用于该数组"""
+        with self._lock:
+            shared[:] = list(self._state[:])
+            self._state = shared
+
+    def detach(self):
+        """将状态复制回进程内列表,解除与共享数组的关联(数组可复用于下一次求解)"""
+        with self._lock:
+            self._state = list(self._state[:])
+
+    def start(self):
+        """开始计时(已开始时不重复计时)"""
+        with self._lock:
+            if not self._state[_STARTED_AT]:
+                self._state[_STARTED_AT] = time.time()
+
+    def cancel(self):
+        """请求停止: 求解器在下一代开始前结束"""
+        with self._lock:
+            self._state[_CANCELLED] = 1.0
+
+    @property
+    def cancelled(self) -> bool:
+        return bool(self._state[_CANCELLED])
+
+    @property
+    def time_budget(self) -> Optional[float]:
+        budget = self._state[_TIME_BUDGET]
+        return budget if budget > 0 else None
+
+    def set_time_budget(self, seconds: Optional[float]):
+        """设置时间预算(自开始计时起的总秒数); None或0表示不限; 小于已用时间时下一代即停止"""
+        if seconds is not None and seconds < 0:
+            raise ValueError("时间预算不能为负数")
+        with self._lock:
+            self._state[_TIME_BUDGET] = float(seconds or 0.0)
+
+    def extend(self, seconds: float):
+        """延长(正数)或缩短(负数)时间预算"""
+        with self._lock:
+            budget = self._state[_TIME_BUDGET]
+            if budget <= 0:
+                raise ValueError("未设置时间预算,无法延长或缩短")
+            self._state[_TIME_BUDGET] = max(budget + seconds, 1e-6)
+
+    def elapsed(self) -> float:
+        started_at = self._state[_STARTED_AT]
+        return time.time() - started_at if started_at else 0.0
+
+    def remaining(self) -> Optional[float]:
+        """剩余时间预算(秒); 不限时返回None"""
+        budget = self.time_budget
+        return None if budget is None else max(budget - self.elapsed(), 0.0)
+
+    def should_stop(self) -> bool:
+        """求解器每代调用: 已取消或超出时间预算时返回True,并记录stop_reason"""
+        if self.cancelled:
+            self.stop_reason = STOP_CANCELLED
+        elif self.time_budget is not None and self._state[_STARTED_AT] and self.remaining() <= 0:
+            self.stop_reason = STOP_TIME_BUDGET
+        return self.stop_reason is not None
+
+    def to_dict(self) -> Dict:
+        return {
+            'cancel_requested': self.cancelled,
+            'time_budget': self.time_budget,
+            'elapsed': self.elapsed(),
+            'remaining': self.remaining(),
+        }
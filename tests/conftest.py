@@ -0,0 +1,88 @@
+"""
+测试公用夹具: 以instance_generator生成的小规模合成算例构建预处理数据与仿真器
+"""
+
+import contextlib
+import io
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from data_preprocessor import DEFAULT_MACHINES_FILE, DEFAULT_ORDERS_FILE, DEFAULT_PROCESS_TIMES_FILE, \
+    DEFAULT_ROUTING_FILE, STAGE_MACHINE_TYPE_SUFFIX, DataPreprocessor
+from ffs_simulator import FFSSimulator
+from instance_generator import generate_tier
+
+
+def quiet(fn, *args, **kwargs):
+    """调用fn并屏蔽其打印输出(预处理/仿真器构建的进度信息)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+@pytest.fixture(scope='session')
+def small_instance(tmp_path_factory):
+    """small档位(50单 × 5工序 × 每工序2台设备)算例的输入目录"""
+    directory = str(tmp_path_factory.mktemp('small'))
+    quiet(generate_tier, 'small', directory, seed=0)
+    return directory
+
+
+@pytest.fixture
+def small_data(small_instance):
+    """small算例的预处理数据(每个测试各自一份,不使用磁盘缓存)"""
+    return quiet(DataPreprocessor.from_directory(small_instance).process)
+
+
+@pytest.fixture
+def small_simulator(small_data):
+    """基于small算例、按GA主流程目标配置的仿真器"""
+    from run_ga import configure_objective
+    simulator = quiet(FFSSimulator, small_data, log_to=None)
+    configure_objective(simulator)
+    return simulator
+
+
+@pytest.fixture(scope='session')
+def routed_instance(tmp_path_factory, small_instance):
+    """
+    small算例 + 工艺路线表: 通用行沿用Line_N推断的设备与加工时间,
+    另给Product_A/Product_C设置专用路线(部分工序仅能在一台设备上加工),共3个路线组
+    """
+    directory = tmp_path_factory.mktemp('routed')
+    for name in (DEFAULT_ORDERS_FILE, DEFAULT_PROCESS_TIMES_FILE, DEFAULT_MACHINES_FILE):
+        shutil.copy(os.path.join(small_instance, name), directory / name)
+    process_times = pd.read_csv(directory / DEFAULT_PROCESS_TIMES_FILE, encoding='utf-8-sig')
+    machines = pd.read_csv(directory / DEFAULT_MACHINES_FILE, encoding='utf-8-sig')
+
+    rows = []
+    for stage, group in machines.groupby('设备类型', sort=False):
+        stage = stage[:-len(STAGE_MACHINE_TYPE_SUFFIX)]
+        for line, machine_id in enumerate(group['设备ID'], start=1):
+            unit_time = process_times.loc[(process_times['工序'] == stage) & (process_times['流水线'] == f'Line_{line}'),
+                                          '标准加工时间(秒/片)'].iloc[0]
+            rows.append({'工序': stage, '设备ID': machine_id, '单位加工时间(秒/片)': unit_time, '产品类型': None})
+    stages = list(dict.fromkeys(row['工序'] for row in rows))
+    by_stage = {stage: [row for row in rows if row['工序'] == stage] for stage in stages}
+    rows.append(dict(by_stage[stages[0]][0], 产品类型='Product_A'))
+    rows.append(dict(by_stage[stages[0]][1], 产品类型='Product_C'))
+    rows.append(dict(by_stage[stages[2]][1], 产品类型='Product_C'))
+    pd.DataFrame(rows).to_csv(directory / DEFAULT_ROUTING_FILE, index=False, encoding='utf-8-sig')
+    return str(directory)
+
+
+@pytest.fixture
+def routed_data(routed_instance):
+    """带专用工艺路线的small算例预处理数据"""
+    return quiet(DataPreprocessor.from_directory(routed_instance).process)
+
+
+@pytest.fixture
+def routed_simulator(routed_data):
+    """基于routed_data、按GA主流程目标配置的仿真器"""
+    from run_ga import configure_objective
+    simulator = quiet(FFSSimulator, routed_data, log_to=None)
+    configure_objective(simulator)
+    return simulator
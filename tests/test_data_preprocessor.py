@@ -0,0 +1,86 @@
+"""
+DataPreprocessor: 预处理缓存、流式读取与增量增删订单
+"""
+
+import os
+import shutil
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from data_preprocessor import DEFAULT_MACHINES_FILE, DEFAULT_ORDERS_FILE, DEFAULT_PROCESS_TIMES_FILE, \
+    DEFAULT_ROUTING_FILE, DataPreprocessor
+from ffs_simulator import FFSSimulator
+from tests.conftest import quiet
+
+
+def _process(directory, chunksize=None, cache_dir=None):
+    return quiet(DataPreprocessor.from_directory(directory, chunksize=chunksize).process, cache_dir)
+
+
+def _instance_with_orders(source, directory, orders):
+    """复制source算例的设备/工序/路线表,订单表替换为orders"""
+    os.makedirs(directory)
+    for name in (DEFAULT_PROCESS_TIMES_FILE, DEFAULT_MACHINES_FILE, DEFAULT_ROUTING_FILE):
+        shutil.copy(os.path.join(source, name), os.path.join(directory, name))
+    orders.to_csv(os.path.join(directory, DEFAULT_ORDERS_FILE), index=False, encoding='utf-8-sig')
+    return str(directory)
+
+
+def _simulator(data):
+    from run_ga import configure_objective
+    simulator = quiet(FFSSimulator, data, log_to=None)
+    configure_objective(simulator)
+    return simulator
+
+
+def test_cache_filled_by_streaming_run_gives_writable_p_matrix(small_instance, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    expected = _process(small_instance)
+    streamed = _process(small_instance, chunksize=16, cache_dir=cache_dir)
+    assert not streamed['p_matrix'].flags.writeable  # 流式模式: 共享模板的只读视图
+
+    cached = _process(small_instance, cache_dir=cache_dir)
+    assert cached['p_matrix'].flags.writeable
+    np.testing.assert_array_equal(cached['p_matrix'], expected['p_matrix'])
+
+
+def test_add_remove_add_matches_fresh_process(routed_instance, tmp_path):
+    orders = pd.read_csv(os.path.join(routed_instance, DEFAULT_ORDERS_FILE), encoding='utf-8-sig')
+    preprocessor = DataPreprocessor.from_directory(
+        _instance_with_orders(routed_instance, tmp_path / 'initial', orders.iloc[:20]))
+    simulator = _simulator(quiet(preprocessor.process))
+
+    def apply(method, *args):
+        changed = quiet(method, *args)
+        simulator.update_orders(preprocessor.get_preprocessed_data(), changed)
+
+    apply(preprocessor.add_orders, orders.iloc[20:])  # 超出缓冲区容量,倍增扩容
+    # 删除首个、中间与末尾订单(末尾订单交换到被删除位置)
+    removed = orders['订单ID'].iloc[[0, 7, 13, 25, 49]].tolist()
+    apply(preprocessor.remove_orders, removed)
+    apply(preprocessor.add_orders, orders[orders['订单ID'].isin(removed)])
+
+    # 相同订单集合(按增量修改后的订单顺序)从头预处理
+    final_orders = orders.set_index('订单ID').loc[preprocessor.order_list].reset_index()
+    expected = _process(_instance_with_orders(routed_instance, tmp_path / 'fresh', final_orders))
+    actual = preprocessor.get_preprocessed_data()
+
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if key == 'data_hash':
+            continue  # 增量修改后为None(已偏离输入文件)
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(actual[key], value, err_msg=key)
+        elif isinstance(value, Mapping):
+            assert dict(actual[key]) == dict(value), key
+        else:
+            assert actual[key] == value, key
+
+    fresh_simulator = _simulator(expected)
+    assert simulator._total_processing_times == fresh_simulator._total_processing_times
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        solution = rng.uniform(0, 0.9999, fresh_simulator.total_ops * 2)
+        assert simulator.fit_func(solution) == fresh_simulator.fit_func(solution)
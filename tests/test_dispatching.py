@@ -0,0 +1,53 @@
+"""
+dispatching: 各调度规则排程的可行性(工序先后、设备资格、设备不重叠)与种子编码
+"""
+
+from collections import defaultdict
+
+import pytest
+
+from dispatching import DISPATCH_RULES, dispatch_schedule, encode_schedule
+
+EPS = 1e-6
+
+
+def _check_feasible(simulator, completion_times, schedule):
+    assert len(schedule) == simulator.total_ops
+    by_order = defaultdict(dict)
+    by_machine = defaultdict(list)
+    for record in schedule:
+        order_idx, stage_idx = record['order_idx'], record['stage_idx']
+        assert stage_idx not in by_order[order_idx], '工序被重复排程'
+        by_order[order_idx][stage_idx] = record
+        op_idx = order_idx * simulator.num_stages + stage_idx
+        assert record['machine_id'] in simulator.op_k_map[op_idx], '设备不在该工序的工艺路线中'
+        assert record['finish_time'] == pytest.approx(record['start_time'] + record['processing_time'])
+        by_machine[record['machine_id']].append(record)
+
+    for order_idx, stages in by_order.items():
+        assert sorted(stages) == list(range(simulator.num_stages))
+        for stage_idx in range(1, simulator.num_stages):
+            assert stages[stage_idx]['start_time'] >= stages[stage_idx - 1]['finish_time'] - EPS, '违反工序先后'
+        assert completion_times[order_idx] == stages[simulator.num_stages - 1]['finish_time']
+
+    for records in by_machine.values():
+        records.sort(key=lambda r: r['start_time'])
+        for previous, current in zip(records, records[1:]):
+            assert current['start_time'] >= previous['finish_time'] - EPS, '同一设备上的工序重叠'
+
+
+@pytest.mark.parametrize('rule', DISPATCH_RULES)
+@pytest.mark.parametrize('instance', ['small_simulator', 'routed_simulator'])
+def test_dispatch_schedule_is_feasible(request, instance, rule):
+    simulator = request.getfixturevalue(instance)
+    completion_times, schedule = dispatch_schedule(simulator, rule)
+    _check_feasible(simulator, completion_times, schedule)
+
+
+@pytest.mark.parametrize('rule', DISPATCH_RULES)
+@pytest.mark.parametrize('instance', ['small_simulator', 'routed_simulator'])
+def test_encoded_schedule_is_no_worse(request, instance, rule):
+    simulator = request.getfixturevalue(instance)
+    completion_times, schedule = dispatch_schedule(simulator, rule)
+    dispatched = simulator.evaluate_schedule(completion_times, schedule)['fitness']
+    assert simulator.fit_func(encode_schedule(simulator, schedule)) <= dispatched + EPS
@@ -0,0 +1,65 @@
+"""
+order_aggregation: 聚合 → 批次层面求解 → 拆分回订单级的往返
+"""
+
+from collections import Counter, defaultdict
+
+import numpy as np
+import pytest
+
+from ffs_simulator import FFSSimulator
+from order_aggregation import aggregate_orders, disaggregate_result, disaggregate_schedule
+from tests.conftest import quiet
+
+EPS = 1e-6
+
+
+@pytest.mark.parametrize('instance', ['small', 'routed'])
+@pytest.mark.parametrize('max_batch_orders', [None, 3])
+def test_disaggregation_restores_orders_without_overlap(request, instance, max_batch_orders):
+    data = request.getfixturevalue(f'{instance}_data')
+    simulator = request.getfixturevalue(f'{instance}_simulator')
+    agg_data, aggregation = quiet(aggregate_orders, data, due_window_days=7.0, max_batch_orders=max_batch_orders)
+    assert aggregation['num_batches'] < aggregation['num_orders']  # 确实发生了聚合
+
+    # 每个订单恰属于一个批次,批次数量 = 成员数量之和,批次内成员同一路线组
+    members = [order_idx for batch in aggregation['batches'] for order_idx in batch]
+    assert sorted(members) == list(range(data['num_orders']))
+    for batch_id, batch in zip(aggregation['batch_ids'], aggregation['batches']):
+        assert agg_data['quantities'][batch_id] == sum(data['quantities'][data['order_list'][i]] for i in batch)
+        assert len({int(data['order_route_group'][i]) for i in batch}) == 1
+
+    agg_simulator = quiet(FFSSimulator, agg_data, log_to=None)
+    solution = np.random.default_rng(0).uniform(0, 0.9999, agg_simulator.total_ops * 2)
+    agg_result = agg_simulator.evaluate_solution(solution)
+    completion_times, schedule = disaggregate_schedule(agg_result['schedule'], aggregation, data)
+
+    # 每个原始订单的每道工序恰出现一次,加工时间按自身数量计算,设备在其工艺路线中
+    machine_index = {m: i for i, m in enumerate(data['machine_list'])}
+    ops = Counter((r['order_id'], r['stage_idx']) for r in schedule)
+    assert ops == Counter((o, s) for o in data['order_list'] for s in range(data['num_stages']))
+    by_order = defaultdict(dict)
+    by_machine = defaultdict(list)
+    for record in schedule:
+        order_idx, stage_idx = record['order_idx'], record['stage_idx']
+        assert record['order_id'] == data['order_list'][order_idx]
+        assert record['machine_id'] in data['op_k_map'][order_idx * data['num_stages'] + stage_idx]
+        unit_time = data['p_matrix'][order_idx, stage_idx, machine_index[record['machine_id']]]
+        quantity = data['quantities'][record['order_id']]
+        assert record['processing_time'] == pytest.approx(unit_time * quantity)
+        by_order[order_idx][stage_idx] = record
+        by_machine[record['machine_id']].append(record)
+
+    for records in by_machine.values():
+        records.sort(key=lambda r: r['start_time'])
+        for previous, current in zip(records, records[1:]):
+            assert current['start_time'] >= previous['finish_time'] - EPS, '同一设备上的工序重叠'
+    for order_idx, stages in by_order.items():
+        for stage_idx in range(1, data['num_stages']):
+            assert stages[stage_idx]['start_time'] >= stages[stage_idx - 1]['finish_time'] - EPS, '违反工序先后'
+        assert completion_times[order_idx] == stages[data['num_stages'] - 1]['finish_time']
+
+    # 拆分结果可在订单级模型上直接评估
+    result = disaggregate_result(agg_result, aggregation, simulator)
+    assert len(result['schedule']) == simulator.total_ops
+    assert np.isfinite(result['fitness'])
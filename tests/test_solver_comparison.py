@@ -0,0 +1,35 @@
+"""
+solver_comparison: mealpy优化器以种子运行时生成的染色体应逐维随机(非常数向量)
+"""
+
+import numpy as np
+
+import solver_comparison
+from solver_control import SolverControl
+from tests.conftest import quiet
+
+
+def test_seeded_mealpy_chromosomes_are_not_constant(small_simulator):
+    spreads = []
+    fit_func = small_simulator.fit_func
+
+    def recording_fit_func(solution):
+        spreads.append(np.ptp(solution))
+        return fit_func(solution)
+
+    small_simulator.fit_func = recording_fit_func
+    control = SolverControl(time_budget=10.0)
+    control.start()
+    quiet(solver_comparison._run_mealpy, 'mealpy:GA.BaseGA', small_simulator, control, 3, 500)
+
+    assert len(spreads) >= solver_comparison.MEALPY_POP_SIZE
+    assert min(spreads) > 0
+
+
+def test_mealpy_seed_is_reproducible(small_simulator):
+    initial = []
+    for _ in range(2):
+        small_simulator.set_seed(7)
+        initial.append(small_simulator.generate_solution())
+    np.testing.assert_array_equal(initial[0], initial[1])
+    assert np.ptp(initial[0]) > 0
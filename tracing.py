@@ -0,0 +1,174 @@
+"""
+运行追踪
+功能: 记录嵌套的时间区间(span),输出Chrome trace-event格式JSON(chrome://tracing / Perfetto可直接打开);
+未启用时span()返回共享的空上下文、traced装饰的函数直接调用原函数,开销可忽略;
+常驻求解进程内记录的事件随求解摘要回传,以该进程pid作为独立轨道合并到Web进程的追踪中
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+
+# 单个追踪保留的最大事件数(超出后丢弃新事件并计数)
+DEFAULT_MAX_EVENTS = 1_000_000
+
+_NULL_SPAN = nullcontext()
+_tracer: Optional['Tracer'] = None
+
+
+def now_us() -> int:
+    """追踪时间戳(微秒,墙上时钟,跨进程可比)"""
+    return time.time_ns() // 1000
+
+
+class Tracer:
+    """事件收集器: 线程安全; 每个线程在首次记录时登记线程名,作为trace中的一条轨道"""
+
+    def __init__(self, process_name: Optional[str] = None, max_events: int = DEFAULT_MAX_EVENTS):
+        self.pid = os.getpid()
+        self.max_events = max_events
+        self.dropped = 0
+        self._events: List[Dict] = []
+        self._named_threads = set()
+        self._lock = threading.Lock()
+        self._metadata('process_name', {'name': process_name or f'ffs-{self.pid}'})
+
+    def _metadata(self, name: str, args: Dict, tid: int = 0):
+        self._events.append({'name': name, 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': args})
+
+    def complete(self, name: str, start_us: int, end_us: Optional[int] = None, cat: str = 'ffs', **args):
+        """记录一个已结束的区间(Chrome trace 'X' 事件)"""
+        end_us = now_us() if end_us is None else end_us
+        tid = threading.get_ident()
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': start_us, 'dur': max(end_us - start_us, 0),
+                 'pid': self.pid, 'tid': tid}
+        if args:
+            event['args'] = args
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            if tid not in self._named_threads:
+                self._named_threads.add(tid)
+                self._metadata('thread_name', {'name': threading.current_thread().name}, tid)
+            self._events.append(event)
+
+    def async_span(self, name: str, span_id: str, start_us: int, end_us: int, cat: str = 'ffs', **args):
+        """
+        记录一个不绑定线程的区间(Chrome trace异步 'b'/'e' 事件对),
+        用于可能相互重叠的区间(如多个作业同时排队),按span_id显示为独立的异步轨道
+        """
+        begin = {'name': name, 'cat': cat, 'ph': 'b', 'id': span_id, 'ts': start_us, 'pid': self.pid, 'tid': 0}
+        if args:
+            begin['args'] = args
+        end = {'name': name, 'cat': cat, 'ph': 'e', 'id': span_id, 'ts': max(end_us, start_us),
+               'pid': self.pid, 'tid': 0}
+        with self._lock:
+            if len(self._events) + 2 > self.max_events:
+                self.dropped += 2
+                return
+            self._events.extend((begin, end))
+
+    def drain(self) -> List[Dict]:
+        """取出并清空已记录的事件(用于回传给另一进程)"""
+        with self._lock:
+            events, self._events = self._events, []
+            return events
+
+    def extend(self, events: List[Dict]):
+        """合并其他进程回传的事件(保留其pid/tid,显示为独立轨道)"""
+        with self._lock:
+            room = self.max_events - len(self._events)
+            self.dropped += max(len(events) - room, 0)
+            self._events.extend(events[:max(room, 0)])
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            events = list(self._events)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'dropped_events': self.dropped}}
+
+    def write(self, path: str) -> str:
+        """写出JSON追踪文件并返回路径"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        return path
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = now_us()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.start, cat=self.cat, **self.args)
+        return False
+
+
+def enable(process_name: Optional[str] = None, max_events: int = DEFAULT_MAX_EVENTS) -> Tracer:
+    """在当前进程启用追踪(已启用时返回现有追踪器)"""
+    global _tracer
+    if _tracer is None or _tracer.pid != os.getpid():
+        _tracer = Tracer(process_name, max_events)
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """停用追踪并返回原追踪器(可继续write)"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, cat: str = 'ffs', **args):
+    """
+    区间上下文: with span('GA.selection', cat='ga'): ...
+    未启用追踪时返回共享的空上下文
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+def complete(name: str, start_us: int, end_us: Optional[int] = None, cat: str = 'ffs', **args):
+    """记录自start_us(now_us()的返回值)至end_us(默认为现在)的区间; 未启用时不做任何事"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.complete(name, start_us, end_us, cat=cat, **args)
+
+
+def traced(name: Optional[str] = None, cat: str = 'ffs') -> Callable:
+    """函数装饰器: 启用追踪时以函数调用为一个区间"""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return fn(*args, **kwargs)
+            start = now_us()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.complete(span_name, start, cat=cat)
+        return wrapper
+    return decorator
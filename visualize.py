@@ -4,12 +4,103 @@
 严格遵循Agent 2蓝图第10节的输出格式要求
 """
 
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 import pandas as pd
-import plotly.figure_factory as ff
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
+from data_preprocessor import BASE_DATE
+import columnar_io
+from run_history import DEFAULT_HISTORY_DB, record_run
+from metrics import PHASE_SECONDS
+from tracing import traced
+
+
+# 甘特图任务数超过该阈值时启用分级显示: 缩小视图显示按设备合并的负载块,放大后显示明细工序
+GANTT_LOD_THRESHOLD = 2000
+# 负载块合并分辨率: 视图总跨度被划分的像素级区间数(间隙小于一个区间的相邻任务合并)
+GANTT_LOD_BINS = 2000
+GANTT_BAR_WIDTH = 18  # 甘特条线宽(像素)
+GANTT_PALETTE = ['#3498db', '#2ecc71', '#e74c3c', '#f39c12', '#9b59b6', '#1abc9c', '#d35400', '#34495e']
+
+# 视图缩放时按可见任务数估计切换明细/负载块图层(write_html的post_script, {plot_id}由plotly替换)
+GANTT_LOD_SCRIPT = """
+var gd = document.getElementById('{plot_id}');
+var lod = gd.layout.meta && gd.layout.meta.lod;
+if (lod) {
+    var showDetail = null;
+    var toMs = function(v) { return typeof v === 'number' ? v : new Date(String(v).replace(' ', 'T') + 'Z').getTime(); };
+    gd.on('plotly_relayout', function() {
+        var range = gd.layout.xaxis.range;
+        var span = range ? toMs(range[1]) - toMs(range[0]) : lod.span;
+        var detail = lod.tasks * Math.min(1, span / lod.span) <= lod.threshold;
+        if (detail === showDetail) { return; }
+        showDetail = detail;
+        var visible = lod.detail.map(function() { return detail; })
+            .concat(lod.coarse.map(function() { return !detail; }));
+        Plotly.restyle(gd, {visible: visible}, lod.detail.concat(lod.coarse));
+    });
+}
+"""
+
+
+def schedule_to_arrays(schedule: List[Dict], machine_list: List, order_list: List) -> Dict[str, np.ndarray]:
+    """
+    将调度记录列表转换为列式NumPy数组(单次遍历,不构建中间字典)
+    
+    参数:
+        schedule: 调度方案列表
+        machine_list: 设备ID列表(用于设备ID→索引)
+        order_list: 订单ID列表
+    
+    返回:
+        {'order_idx', 'stage_idx', 'machine_idx', 'start_time', 'finish_time', 'processing_time'}
+    """
+    n = len(schedule)
+    machine_index = {m: i for i, m in enumerate(machine_list)}
+    return {
+        'order_idx': np.fromiter((t['order_idx'] for t in schedule), dtype=np.int64, count=n),
+        'stage_idx': np.fromiter((t['stage_idx'] for t in schedule), dtype=np.int64, count=n),
+        'machine_idx': np.fromiter((machine_index[t['machine_id']] for t in schedule), dtype=np.int64, count=n),
+        'start_time': np.fromiter((t['start_time'] for t in schedule), dtype=np.float64, count=n),
+        'finish_time': np.fromiter((t['finish_time'] for t in schedule), dtype=np.float64, count=n),
+        'processing_time': np.fromiter((t['processing_time'] for t in schedule), dtype=np.float64, count=n),
+    }
+
+
+def _segments(values: np.ndarray, start: np.ndarray, finish: np.ndarray):
+    """将区间打包为单条折线数据: 每个区间占3个点(起点, 终点, NaN断开)"""
+    n = len(start)
+    x = np.empty(n * 3)
+    x[0::3], x[1::3], x[2::3] = start, finish, np.nan
+    y = np.repeat(values.astype(np.float32), 3)
+    y[2::3] = np.nan
+    return x, y
+
+
+def _merge_intervals(machine_idx: np.ndarray, start: np.ndarray, finish: np.ndarray, min_gap: float):
+    """
+    按设备合并间隙小于min_gap的相邻区间(向量化扫描)
+    
+    返回:
+        block_machine, block_start, block_finish, block_count: 合并后的负载块
+    """
+    order = np.lexsort((start, machine_idx))
+    m, s, f = machine_idx[order], start[order], finish[order]
+    # 按设备平移时间轴,使累积最大完工时刻不跨设备传递
+    offset = (f.max() - s.min() + min_gap) * 2 + 1.0
+    shifted_f = np.maximum.accumulate(f + m * offset)
+    new_block = np.ones(len(s), dtype=bool)
+    new_block[1:] = (m[1:] != m[:-1]) | (s[1:] + m[1:] * offset > shifted_f[:-1] + min_gap)
+    block_first = np.flatnonzero(new_block)
+    block_finish = np.maximum.reduceat(f, block_first)
+    block_count = np.diff(np.append(block_first, len(s)))
+    return m[block_first], s[block_first], block_finish, block_count
 
 
 class ScheduleVisualizer:
@@ -121,98 +212,269 @@ class ScheduleVisualizer:
         df.to_csv(output_file, index=False, encoding='utf-8-sig')
         print(f"✅ 订单汇总已导出: {output_file}")
     
-    def generate_gantt_chart(self, schedule: List[Dict], output_file: str):
+    def export_columnar(self, cols: Dict[str, np.ndarray], completion_times: Dict, kpis: Dict,
+                        algorithm: str, fmt: str = 'arrow', output_dir: str = '.') -> List[str]:
+        """
+        以带类型的列式文件(Arrow IPC/Parquet)导出调度明细、订单汇总与KPI
+        文件名与CSV对应,仅后缀不同(如 schedule_results_GA.arrow)
+        
+        参数:
+            cols: schedule_to_arrays()的列式调度数组
+            completion_times: {order_idx: completion_time}
+            kpis: KPI字典
+            algorithm: 算法名称(GA/NSGA2等)
+            fmt: 'arrow' 或 'parquet'
+            output_dir: 输出目录
+        
+        返回:
+            写出的文件路径列表
+        """
+        tables = {
+            f"schedule_results_{algorithm}": columnar_io.schedule_table(
+                cols, self.order_list, self.machine_list, self.stage_names
+            ),
+            f"schedule_orders_{algorithm}": columnar_io.order_summary_table(
+                completion_times, self.order_list, self.due_dates
+            ),
+            f"schedule_kpis_{algorithm}": columnar_io.kpi_table(kpis),
+        }
+        paths = [columnar_io.write_table(table, os.path.join(output_dir, base), fmt) for base, table in tables.items()]
+        print(f"✅ 列式结果已导出({fmt}): {', '.join(paths)}")
+        return paths
+    
+    def generate_gantt_chart(self, schedule: List[Dict], output_file: str,
+                             title: str = 'FFS调度甘特图 (Genetic Algorithm)',
+                             arrays: Optional[Dict[str, np.ndarray]] = None,
+                             include_plotlyjs: Union[bool, str] = 'directory'):
         """
         生成交互式甘特图(HTML)
         严格遵循Agent 2蓝图第10.2节要求
+        所有工序按工序阶段打包为少量WebGL折线轨迹(每个甘特条为一段粗线),
+        plotly.js默认以单独的plotly.min.js与HTML同目录共享,不再内联到每个文件;
+        任务数较多时缩小视图显示按设备合并的负载块,放大到可见任务数较少时切换为明细
         
         参数:
             schedule: 调度方案列表
             output_file: 输出HTML文件路径
+            title: 图表标题
+            arrays: 可选,schedule_to_arrays()的列式结果(已有时避免重复转换)
+            include_plotlyjs: plotly.js引用方式,同plotly write_html; 默认'directory'(同目录复制一份),
+                              也可传共享脚本的路径/URL(如Web端的'/plotly.min.js'),此时不再复制
         """
-        # 准备甘特图数据
-        gantt_data = []
-        base_date = datetime(2025, 10, 26)  # 基准日期
-        
-        for task in schedule:
-            # 处理可能的无穷大值
-            start_time = task['start_time'] if not np.isinf(task['start_time']) else 0
-            finish_time = task['finish_time'] if not np.isinf(task['finish_time']) else start_time + 3600  # 默认1小时
-            
-            start_datetime = base_date + timedelta(seconds=start_time)
-            finish_datetime = base_date + timedelta(seconds=finish_time)
-            
-            gantt_data.append({
-                'Task': f"{task['order_id']}-{self.stage_names[task['stage_idx']]}",
-                'Start': start_datetime,
-                'Finish': finish_datetime,
-                'Resource': task['machine_id'],
-                'Description': (
-                    f"订单: {task['order_id']}<br>"
-                    f"工序: {self.stage_names[task['stage_idx']]}<br>"
-                    f"设备: {task['machine_id']}<br>"
-                    f"开始: {task['start_time']/3600:.2f}h<br>"
-                    f"结束: {task['finish_time']/3600:.2f}h<br>"
-                    f"时长: {task['processing_time']/3600:.2f}h"
-                )
-            })
-        
-        # 创建甘特图
-        if not gantt_data:
+        if not schedule and arrays is None:
             print("⚠️ 警告: 调度方案为空,无法生成甘特图")
             return
         
-        # 使用plotly创建甘特图
-        # 创建一个简单的颜色映射，使用Resource作为索引列
-        unique_resources = set(task['Resource'] for task in gantt_data)
-        colors_dict = {}
-        color_palette = ['#3498db', '#2ecc71', '#e74c3c', '#f39c12', '#9b59b6', '#1abc9c', '#d35400', '#34495e']
+        cols = arrays if arrays is not None else schedule_to_arrays(schedule, self.machine_list, self.order_list)
+        num_tasks = len(cols['start_time'])
         
-        for i, resource in enumerate(unique_resources):
-            colors_dict[resource] = color_palette[i % len(color_palette)]
-            
-        fig = ff.create_gantt(
-            gantt_data,
-            colors=colors_dict,
-            index_col='Resource',
-            show_colorbar=True,
-            group_tasks=True,
-            showgrid_x=True,
-            showgrid_y=True,
-            title='FFS调度甘特图 (Genetic Algorithm)'
-        )
+        # 处理可能的无穷大值(开始取0,结束默认开始后1小时)
+        start = np.where(np.isinf(cols['start_time']), 0.0, cols['start_time'])
+        finish = np.where(np.isinf(cols['finish_time']), start + 3600.0, cols['finish_time'])
         
-        # 添加交货期垂直线
-        for order_idx, order_id in enumerate(self.order_list):
-            due_date_days = self.due_dates[order_id]
-            due_datetime = base_date + timedelta(days=due_date_days)
-            
-            fig.add_vline(
-                x=due_datetime.timestamp() * 1000,
-                line_dash="dash",
-                line_color=self.order_colors[order_id],
-                annotation_text=f"{order_id}交期",
-                annotation_position="top"
+        # 时间轴: 基准日期起的毫秒时间戳(plotly日期轴可直接使用数值)
+        base_ms = BASE_DATE.value / 1e6
+        start_ms = base_ms + start * 1000.0
+        finish_ms = base_ms + finish * 1000.0
+        machine_idx = cols['machine_idx']
+        order_ids = np.asarray(self.order_list, dtype=object)
+        
+        fig = go.Figure()
+        detail_traces = []
+        for stage_idx, stage_name in enumerate(self.stage_names):
+            mask = cols['stage_idx'] == stage_idx
+            if not mask.any():
+                continue
+            x, y = _segments(machine_idx[mask], start_ms[mask], finish_ms[mask])
+            hours = (np.column_stack([start[mask], finish[mask], finish[mask] - start[mask]]) / 3600.0).astype(np.float32)
+            detail_traces.append(len(fig.data))
+            fig.add_trace(go.Scattergl(
+                x=x, y=y,
+                mode='lines',
+                name=stage_name,
+                line=dict(width=GANTT_BAR_WIDTH, color=GANTT_PALETTE[stage_idx % len(GANTT_PALETTE)]),
+                text=np.repeat(order_ids[cols['order_idx'][mask]], 3),
+                customdata=np.repeat(hours, 3, axis=0),
+                hovertemplate=(
+                    "订单: %{text}<br>"
+                    f"工序: {stage_name}<br>"
+                    "开始: %{customdata[0]:.2f}h<br>"
+                    "结束: %{customdata[1]:.2f}h<br>"
+                    "时长: %{customdata[2]:.2f}h<extra></extra>"
+                )
+            ))
+        
+        # 交货期: 相同交期的订单合并为一条竖线
+        due_values = np.array([self.due_dates[o] for o in self.order_list], dtype=np.float64)
+        unique_dues, due_counts = np.unique(due_values, return_counts=True)
+        due_ms = base_ms + unique_dues * 86400000.0
+        x = np.repeat(due_ms, 3)
+        x[2::3] = np.nan
+        y = np.tile([-0.5, len(self.machine_list) - 0.5, np.nan], len(unique_dues))
+        fig.add_trace(go.Scattergl(
+            x=x, y=y,
+            mode='lines',
+            name='交期',
+            line=dict(width=1, color='#7f7f7f', dash='dash'),
+            customdata=np.repeat(np.column_stack([unique_dues, due_counts]), 3, axis=0),
+            hovertemplate="交期: 第%{customdata[0]:.0f}天<br>订单数: %{customdata[1]}<extra></extra>"
+        ))
+        
+        # 分级显示: 负载块图层(默认显示),明细图层初始隐藏
+        meta = None
+        if num_tasks > GANTT_LOD_THRESHOLD:
+            span_ms = float(finish_ms.max() - start_ms.min()) or 1.0
+            b_machine, b_start, b_finish, b_count = _merge_intervals(
+                machine_idx, start_ms, finish_ms, span_ms / GANTT_LOD_BINS
             )
+            x, y = _segments(b_machine, b_start, b_finish)
+            coarse_trace = len(fig.data)
+            fig.add_trace(go.Scattergl(
+                x=x, y=y,
+                mode='lines',
+                name='负载块(缩小视图)',
+                line=dict(width=GANTT_BAR_WIDTH, color='#95a5a6'),
+                customdata=np.repeat(np.column_stack([b_count, (b_finish - b_start) / 3.6e6]).astype(np.float32), 3, axis=0),
+                hovertemplate="合并任务数: %{customdata[0]}<br>跨度: %{customdata[1]:.2f}h<extra></extra>"
+            ))
+            for trace_idx in detail_traces:
+                fig.data[trace_idx].visible = False
+            meta = {'lod': {
+                'tasks': num_tasks, 'threshold': GANTT_LOD_THRESHOLD, 'span': span_ms,
+                'detail': detail_traces, 'coarse': [coarse_trace]
+            }}
         
         # 更新布局
         fig.update_layout(
-            xaxis_title="时间",
-            yaxis_title="设备",
+            title=title,
+            xaxis=dict(type='date', title="时间", showgrid=True),
+            yaxis=dict(
+                title="设备", showgrid=True, autorange='reversed',
+                tickmode='array', tickvals=list(range(len(self.machine_list))), ticktext=list(self.machine_list)
+            ),
             height=600,
             hovermode='closest',
-            font=dict(size=10)
+            font=dict(size=10),
+            meta=meta
         )
         
-        # 保存HTML
-        fig.write_html(output_file)
-        print(f"✅ 甘特图已生成: {output_file}")
-        print(f"  - 打开浏览器查看交互式图表")
+        # 保存HTML(默认plotly.js以同目录plotly.min.js共享,首次生成时复制)
+        fig.write_html(output_file, include_plotlyjs=include_plotlyjs, post_script=GANTT_LOD_SCRIPT)
+        print(f"✅ 甘特图已生成: {output_file} (任务数: {num_tasks})")
+        if include_plotlyjs == 'directory':
+            print(f"  - 打开浏览器查看交互式图表(需与plotly.min.js位于同一目录)")
+
+
+EXPORT_STATUS_FILE = 'export_status_{algorithm}.json'
+
+# 后台导出线程池: 单线程保证多次导出按提交顺序写文件,不会互相覆盖到一半
+_export_executor: Optional[ThreadPoolExecutor] = None
+_export_lock = threading.Lock()
+
+
+def _write_export_status(path: str, status: Dict):
+    """原子写出导出状态文件(供其他进程/Web端轮询)"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_export_status(algorithm: str = "GA", directory: str = '.') -> Optional[Dict]:
+    """
+    读取导出状态文件
+    
+    返回:
+        {'algorithm', 'state': 'running'/'done'/'failed', 'submitted_at', 'finished_at', 'error'}
+        或None(尚无导出记录)
+    """
+    path = os.path.join(directory, EXPORT_STATUS_FILE.format(algorithm=algorithm))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
 
+class ExportHandle:
+    """后台导出句柄: 查询是否完成、等待完成并取回结果(导出失败时重新抛出异常)"""
+    
+    def __init__(self, future: Future, status_file: str, status: Dict):
+        self._future = future
+        self.status_file = status_file
+        self.status = status  # 与状态文件内容一致,由后台线程更新
+        self.algorithm = status['algorithm']
+    
+    def done(self) -> bool:
+        """导出是否已结束(成功或失败)"""
+        return self._future.done()
+    
+    @property
+    def error(self) -> Optional[BaseException]:
+        """导出异常; 未结束或成功时为None"""
+        if not self._future.done():
+            return None
+        return self._future.exception()
+    
+    @property
+    def elapsed(self) -> float:
+        """导出耗时(秒); 未结束时为已等待时长"""
+        return (self.status['finished_at'] or time.time()) - self.status['submitted_at']
+    
+    def wait(self, timeout: Optional[float] = None) -> Dict:
+        """等待导出完成并返回export_results的结果; 导出失败时抛出原异常"""
+        return self._future.result(timeout)
+
+
+def export_results_async(completion_times: Dict, schedule: List, kpis: Dict, data: Dict,
+                         algorithm: str = "GA", output_dir: str = '.', **kwargs) -> ExportHandle:
+    """
+    在后台线程中导出所有结果文件(参数同export_results),立即返回句柄
+    导出状态同时写入 output_dir/export_status_{algorithm}.json(running/done/failed及错误信息),
+    供Web端等其他进程检查; 解释器退出前会等待已提交的导出完成
+    
+    返回:
+        ExportHandle
+    """
+    global _export_executor
+    with _export_lock:
+        if _export_executor is None:
+            _export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ffs-export')
+    
+    os.makedirs(output_dir, exist_ok=True)
+    status_file = os.path.join(output_dir, EXPORT_STATUS_FILE.format(algorithm=algorithm))
+    status = {'algorithm': algorithm, 'state': 'running', 'submitted_at': time.time(),
+              'finished_at': None, 'error': None}
+    _write_export_status(status_file, status)
+    
+    # 快照输入,避免调用方后续修改影响后台导出
+    completion_times = dict(completion_times)
+    schedule = list(schedule)
+    kpis = dict(kpis)
+    
+    def run():
+        try:
+            result = export_results(completion_times, schedule, kpis, data, algorithm,
+                                    output_dir=output_dir, **kwargs)
+        except Exception as e:
+            status.update(state='failed', finished_at=time.time(),
+                          error=f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+            print(f"❌ 后台导出失败({algorithm}): {e}")
+            raise
+        else:
+            status.update(state='done', finished_at=time.time())
+            return result
+        finally:
+            _write_export_status(status_file, status)
+    
+    return ExportHandle(_export_executor.submit(run), status_file, status)
 
+
+@traced('export_results', cat='export')
 def export_results(completion_times: Dict, schedule: List, kpis: Dict, data: Dict, 
-                   algorithm: str = "GA"):
+                   algorithm: str = "GA", columnar_format: Optional[str] = None,
+                   run_params: Optional[Dict] = None, history_db: Optional[str] = DEFAULT_HISTORY_DB,
+                   output_dir: str = '.', include_plotlyjs: Union[bool, str] = 'directory'):
     """
     导出所有结果文件
     
@@ -222,19 +484,46 @@ def export_results(completion_times: Dict, schedule: List, kpis: Dict, data: Dic
         kpis: KPI指标字典
         data: 预处理数据
         algorithm: 算法名称(GA/NSGA2等)
+        columnar_format: 可选,额外导出列式文件('arrow'/'parquet',需pyarrow)
+        run_params: 求解参数(记录到运行历史)
+        history_db: 运行历史SQLite库路径(相对路径相对于output_dir); None表示不记录
+        output_dir: 结果文件输出目录(不存在时创建)
+        include_plotlyjs: 甘特图的plotly.js引用方式(见generate_gantt_chart); 默认同目录复制,
+                          多个输出目录共用一份脚本时传其路径/URL
     """
     print("\n📤 导出结果...")
+    export_start = time.time()
+    os.makedirs(output_dir, exist_ok=True)
+    
+    def out(filename: str) -> str:
+        return os.path.join(output_dir, filename)
     
     # 创建可视化工具
     visualizer = ScheduleVisualizer(data)
+    cols = schedule_to_arrays(schedule, visualizer.machine_list, visualizer.order_list)
     
     # 导出CSV
-    visualizer.export_schedule_csv(schedule, f"schedule_results_{algorithm}.csv")
-    visualizer.export_kpis_csv(kpis, completion_times, f"schedule_kpis_{algorithm}.csv")
-    visualizer.export_order_summary_csv(completion_times, f"schedule_orders_{algorithm}.csv")
+    visualizer.export_schedule_csv(schedule, out(f"schedule_results_{algorithm}.csv"))
+    visualizer.export_kpis_csv(kpis, completion_times, out(f"schedule_kpis_{algorithm}.csv"))
+    visualizer.export_order_summary_csv(completion_times, out(f"schedule_orders_{algorithm}.csv"))
+    
+    # 导出列式文件(可选)
+    if columnar_format:
+        if columnar_io.is_available():
+            visualizer.export_columnar(cols, completion_times, kpis, algorithm, columnar_format, output_dir)
+        else:
+            print("⚠️ 警告: 未安装pyarrow,跳过列式导出")
+    
+    # 记录运行历史
+    run_id = None
+    if history_db:
+        history_db = out(history_db)  # 绝对路径时os.path.join原样返回
+        run_id = record_run(algorithm, kpis, completion_times, cols, data, run_params, history_db)
+        print(f"✅ 运行历史已记录: {history_db} (run_id={run_id})")
     
     # 生成甘特图
-    visualizer.generate_gantt_chart(schedule, f"schedule_gantt_{algorithm}.html")
+    visualizer.generate_gantt_chart(schedule, out(f"schedule_gantt_{algorithm}.html"), arrays=cols,
+                                    include_plotlyjs=include_plotlyjs)
     
     # 打印KPI摘要
     print("\n📊 优化结果KPI:")
@@ -246,10 +535,12 @@ def export_results(completion_times: Dict, schedule: List, kpis: Dict, data: Dic
     print(f"  ✓ 瓶颈设备负载率: {kpis['bottleneck_load']:.2f} %")
     print(f"  ✓ 负载均衡度: {kpis['load_balance_std']:.2f} %")
     
+    PHASE_SECONDS.observe(time.time() - export_start, algorithm=algorithm, phase='export')
     return {
         'completion_times': completion_times,
         'schedule': schedule,
-        'kpis': kpis
+        'kpis': kpis,
+        'run_id': run_id
     }
 
 
@@ -1,6 +1,15 @@
 import os
+import sys
+import json
+import time
+import atexit
+import mimetypes
+import threading
+import traceback
 import subprocess
-from flask import Flask, render_template, request, redirect, url_for, send_from_directory, flash, jsonify
+import multiprocessing
+from urllib.parse import quote
+from flask import Flask, Response, abort, render_template, request, redirect, url_for, flash, jsonify, stream_with_context
 
 APP_ROOT = os.path.dirname(os.path.abspath(__file__))
 REPO_ROOT = os.path.abspath(os.path.join(APP_ROOT, os.pardir))
@@ -15,12 +24,125 @@ OUTPUT_FILES = [
     "schedule_kpis_NSGA2.csv",
     "schedule_orders_NSGA2.csv",
     "schedule_gantt_NSGA2.html",
+    # 甘特图共享的plotly.js(与HTML同目录,离线查看需一并下载)
+    "plotly.min.js",
 ]
 
+sys.path.insert(0, REPO_ROOT)
+import columnar_io  # noqa: E402
+import metrics  # noqa: E402
+import tracing  # noqa: E402
+from visualize import read_export_status  # noqa: E402
+from jobs import FINISHED_STATES, JOB_RUNNING, PRIORITY_INTERACTIVE, PRIORITY_NAMES, JobCancelled, JobManager, QueueFullError  # noqa: E402
+from worker_pool import WarmWorkerPool  # noqa: E402
+from result_cache import ResultCache, compute_request_key  # noqa: E402
+from workspaces import WorkspaceManager  # noqa: E402
+from http_cache import BodyCache, conditional_response, file_signature, make_etag  # noqa: E402
+from werkzeug.security import safe_join  # noqa: E402
+from data_preprocessor import DEFAULT_CACHE_DIR, DEFAULT_ROUTING_FILE, PREPROCESS_VERSION  # noqa: E402
+from dispatching import DEFAULT_RULE, DISPATCH_RULES  # noqa: E402
+from run_history import DEFAULT_HISTORY_DB  # noqa: E402
+
+# 上传字段 → 求解器输入文件名
+UPLOAD_MAPPING = {
+    'process_times': '工序加工时间.csv',
+    'orders': '订单数据.csv',
+    'machines': '设备可用时间.csv',
+}
+# 求解脚本与算法名
+SOLVER_SCRIPTS = {
+    'GA': 'run_ga.py',
+    'NSGA2': 'run_nsga2.py',
+    'DISPATCH': 'dispatching.py',
+}
+# 作业工作区中的甘特图引用Web端共享的plotly.js,不再在每个工作区复制一份
+SHARED_PLOTLY_JS = '/plotly.min.js'
+# 并发作业数: 每个API作业在独立工作区读写,可并行执行(每个并发作业占用一个常驻求解进程)
+JOB_WORKERS = int(os.environ.get('FFS_JOB_WORKERS', max(1, min(4, (os.cpu_count() or 2) // 2))))
+# 全局CPU预算: 同时运行作业的CPU占用之和上限(默认为CPU核数),超出的作业排队
+CPU_BUDGET = int(os.environ.get('FFS_CPU_BUDGET', os.cpu_count() or 1))
+# 各求解器作业的CPU占用(求解进程数; 目前均为单进程串行评估)
+SOLVER_CPU_COST = {
+    'GA': 1,
+    'NSGA2': 1,
+    'DISPATCH': 1,
+}
+# 最大排队作业数: 超出时返回429,并以Retry-After提示客户端稍后重试
+MAX_QUEUE = int(os.environ.get('FFS_MAX_QUEUE', 32))
+RETRY_AFTER_SECONDS = 30
+# 默认作业时间预算(秒,0表示不限): 超出后求解器在下一代前停止并输出当前最优解; 提交时可用time_budget覆盖
+JOB_TIME_BUDGET = float(os.environ.get('FFS_JOB_TIME_BUDGET', 0)) or None
+# 运行追踪: 设置后记录作业生命周期与求解各阶段(含常驻求解进程)的区间,
+# 可经 GET /api/trace 下载,进程退出时写出到该路径(Chrome trace-event JSON,可用Perfetto打开)
+TRACE_FILE = os.environ.get('FFS_TRACE_FILE')
+# 仿真器热路径剖析采样间隔(每N次评估计时一次,0表示关闭): 剖析汇总记入运行历史
+SIMULATOR_PROFILE_EVERY = int(os.environ.get('FFS_SIMULATOR_PROFILE_EVERY', 0)) or None
+# DELETE /api/jobs/<id> 默认等待运行中作业停止的时长(秒),期间停止则响应直接包含当前最优结果
+CANCEL_WAIT_SECONDS = 10
+# 是否使用常驻求解进程(已预加载求解栈与预处理数据); 设为0时回退为每次作业启动子进程
+USE_WARM_WORKERS = os.environ.get('FFS_WARM_WORKERS', '1') != '0'
+# SSE心跳间隔(秒): 无进度时发送注释行,避免代理断开空闲连接
+SSE_KEEPALIVE_SECONDS = 15
+# 排程结果缓存: 相同输入内容 + 算法 + 参数 + 种子的请求直接返回已有结果
+RESULT_CACHE_DIR = os.environ.get('FFS_RESULT_CACHE_DIR', os.path.join(REPO_ROOT, DEFAULT_CACHE_DIR, 'results'))
+RESULT_CACHE_ENTRIES = int(os.environ.get('FFS_RESULT_CACHE_ENTRIES', 64))
+RESULT_CACHE_MB = int(os.environ.get('FFS_RESULT_CACHE_MB', 256))
+# 作业工作区: 每个API作业的输入与输出文件位于 WORKSPACE_DIR/<job_id>/,按数量与时长清理
+WORKSPACE_DIR = os.environ.get('FFS_WORKSPACE_DIR', os.path.join(REPO_ROOT, '.ffs_jobs'))
+WORKSPACE_RETENTION = int(os.environ.get('FFS_WORKSPACE_RETENTION', 50))
+WORKSPACE_TTL_HOURS = float(os.environ.get('FFS_WORKSPACE_TTL_HOURS', 24))
+# 运行历史库: 所有作业(含各作业工作区中的求解)记录到同一SQLite库,不随工作区清理; 设为空字符串时不记录
+HISTORY_DB = os.environ.get('FFS_HISTORY_DB', os.path.join(REPO_ROOT, DEFAULT_HISTORY_DB))
+# 内存中缓存的(压缩后)响应体总量上限
+RESPONSE_CACHE_MB = int(os.environ.get('FFS_RESPONSE_CACHE_MB', 64))
+# 作业结果中以URL引用(而非内联)的大字段: 字段名 → (文件名, MIME类型)
+RESULT_ARTIFACTS = {
+    'gantt_html': ('gantt.html', 'text/html'),
+    'schedule_csv': ('schedule.csv', 'text/csv'),
+}
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'dev-key'
 app.config['UPLOAD_FOLDER'] = REPO_ROOT
 
+# 常驻求解进程(spawn)启动时会重新导入本模块,追踪只在Web主进程启用与写出
+if TRACE_FILE and multiprocessing.current_process().name == 'MainProcess':
+    tracing.enable('ffs-web')
+    atexit.register(lambda: tracing.get_tracer() and tracing.get_tracer().write(TRACE_FILE))
+job_manager = JobManager(max_workers=JOB_WORKERS, max_queue=MAX_QUEUE, cpu_budget=CPU_BUDGET)
+result_cache = ResultCache(RESULT_CACHE_DIR, max_entries=RESULT_CACHE_ENTRIES, max_bytes=RESULT_CACHE_MB * 1024 * 1024)
+# 排队/运行中的作业(缓存键 → 作业): 相同请求并发到达时共享同一作业
+_pending_jobs = {}
+_pending_jobs_lock = threading.Lock()
+workspaces = WorkspaceManager(WORKSPACE_DIR, max_workspaces=WORKSPACE_RETENTION,
+                              max_age_seconds=WORKSPACE_TTL_HOURS * 3600)
+# /input 页面上传到REPO_ROOT的文件由 /run 作业在REPO_ROOT原地求解,这类作业之间须串行
+_repo_root_lock = threading.Lock()
+# 压缩后响应体缓存(按ETag) 与 结果文件解析缓存(按文件签名失效)
+body_cache = BodyCache(max_bytes=RESPONSE_CACHE_MB * 1024 * 1024)
+_parsed_cache = {}
+_parsed_cache_lock = threading.Lock()
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+# /metrics 抓取时刷新的仪表(其余指标由作业管理器、常驻求解进程与求解器在运行中更新)
+QUEUE_DEPTH = metrics.REGISTRY.gauge('ffs_job_queue_depth', '排队中的作业数')
+RUNNING_JOBS = metrics.REGISTRY.gauge('ffs_jobs_running', '运行中的作业数(占用的工作线程/常驻求解进程)')
+JOB_WORKERS_GAUGE = metrics.REGISTRY.gauge('ffs_job_workers', '作业工作线程数')
+CPU_BUDGET_GAUGE = metrics.REGISTRY.gauge('ffs_cpu_budget', '运行作业的CPU预算')
+CPU_IN_USE = metrics.REGISTRY.gauge('ffs_cpu_in_use', '运行中作业占用的CPU预算')
+RESULT_CACHE_BYTES = metrics.REGISTRY.gauge('ffs_result_cache_bytes', '结果缓存占用字节数')
+RESULT_CACHE_ENTRIES_GAUGE = metrics.REGISTRY.gauge('ffs_result_cache_entries', '结果缓存条目数')
+
+
+def _get_worker_pool():
+    # 惰性创建常驻进程池(避免调试重载器的父进程也启动一份)
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = WarmWorkerPool(JOB_WORKERS, REPO_ROOT)
+            atexit.register(_worker_pool.shutdown)
+        return _worker_pool
+
 
 @app.route('/')
 def index():
@@ -58,21 +180,14 @@ def input_page():
 
 @app.route('/run', methods=['POST'])
 def run_schedule():
+    # 提交后台排程作业,不阻塞请求线程(结果页读取REPO_ROOT下的输出文件,不走结果缓存与独立工作区)
     try:
-        # 触发后端排程脚本
-        result = subprocess.run(
-            ["uv", "run", "python", "run_ga.py"],
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        flash("排程运行完成。", "success")
+        job, _ = _submit_solver_job('GA', {}, use_cache=False, in_repo_root=True)
+    except QueueFullError:
+        flash("排程作业排队已满，请稍后再试。", "warning")
         return redirect(url_for('result'))
-    except subprocess.CalledProcessError as e:
-        err = e.stderr or e.stdout
-        flash(f"排程运行失败: {err[:500]}", "danger")
-        return redirect(url_for('index'))
+    flash(f"排程作业已提交(ID: {job.job_id}),完成后刷新结果页查看。", "success")
+    return redirect(url_for('result'))
 
 
 @app.route('/result')
@@ -81,9 +196,30 @@ def result():
     return render_template('result.html', files=existing)
 
 
+def _send_file(directory, filename, as_attachment=False, max_age=0):
+    # 发送文件: ETag取自文件签名(mtime/大小),If-None-Match命中返回304,文本类内容按需压缩并缓存
+    path = safe_join(directory, filename)
+    signature = file_signature(path) if path else None
+    if signature is None:
+        abort(404)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    if mimetype.startswith('text/') and 'charset' not in mimetype:
+        mimetype += '; charset=utf-8'
+    
+    def load():
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    headers = {}
+    if as_attachment:
+        headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(os.path.basename(filename))}"
+    return conditional_response(request, make_etag(path, signature), mimetype, load,
+                                cache=body_cache, max_age=max_age, headers=headers)
+
+
 @app.route('/download/<path:filename>')
 def download(filename):
-    return send_from_directory(REPO_ROOT, filename, as_attachment=True)
+    return _send_file(REPO_ROOT, filename, as_attachment=True)
 
 
 @app.route('/gantt')
@@ -91,7 +227,7 @@ def gantt():
     # 内嵌甘特图（如果存在）
     gantt_path = os.path.join(REPO_ROOT, 'schedule_gantt_GA.html')
     if os.path.exists(gantt_path):
-        return send_from_directory(REPO_ROOT, 'schedule_gantt_GA.html')
+        return _send_file(REPO_ROOT, 'schedule_gantt_GA.html')
     flash("尚未生成甘特图，请先运行排程。", "warning")
     return redirect(url_for('index'))
 
@@ -100,10 +236,30 @@ def gantt_nsga2():
     # 内嵌 NSGA-II 甘特图（如果存在）
     gantt_path = os.path.join(REPO_ROOT, 'schedule_gantt_NSGA2.html')
     if os.path.exists(gantt_path):
-        return send_from_directory(REPO_ROOT, 'schedule_gantt_NSGA2.html')
+        return _send_file(REPO_ROOT, 'schedule_gantt_NSGA2.html')
     flash("尚未生成 NSGA-II 甘特图，请先运行排程（NSGA-II）。", "warning")
     return redirect(url_for('index'))
 
+@app.route('/plotly.min.js')
+def plotly_js():
+    # 甘特图HTML以相对路径引用plotly.min.js; 内嵌(srcDoc/iframe)时按页面根路径解析到此
+    # 作业工作区内生成的甘特图以SHARED_PLOTLY_JS直接引用此文件; REPO_ROOT中没有时使用plotly包自带的副本
+    if os.path.exists(os.path.join(REPO_ROOT, 'plotly.min.js')):
+        return _send_file(REPO_ROOT, 'plotly.min.js', max_age=86400)
+    import plotly
+    package_data = os.path.join(os.path.dirname(plotly.__file__), 'package_data')
+    if os.path.exists(os.path.join(package_data, 'plotly.min.js')):
+        return _send_file(package_data, 'plotly.min.js', max_age=86400)
+    return ("plotly.min.js not found", 404)
+
+@app.route('/api/export_status/<algorithm>', methods=['GET'])
+def api_export_status(algorithm):
+    # 后台导出状态(running/done/failed及错误信息)
+    status = read_export_status(algorithm, REPO_ROOT)
+    if status is None:
+        return jsonify({'algorithm': algorithm, 'state': 'none'})
+    return jsonify(status)
+
 def _read_text(path):
     try:
         with open(path, 'r', encoding='utf-8') as f:
@@ -111,11 +267,42 @@ def _read_text(path):
     except Exception:
         return None
 
+def _read_columnar(csv_path):
+    # 同名列式文件(.arrow/.parquet)存在时零拷贝读取,返回pyarrow.Table; 否则返回None
+    columnar_path = columnar_io.find_columnar(os.path.splitext(csv_path)[0])
+    if not columnar_path:
+        return None
+    try:
+        return columnar_io.read_table(columnar_path)
+    except Exception:
+        return None
+
+def _result_file_signature(csv_path):
+    # 结果文件及其同名列式文件的签名: 任一变化即视为结果已更新
+    columnar_path = columnar_io.find_columnar(os.path.splitext(csv_path)[0])
+    return file_signature(csv_path), columnar_path, file_signature(columnar_path) if columnar_path else None
+
+def _cached_parse(parser, path):
+    # 解析结果按文件签名缓存: 轮询时文件未变化则不再读取/解析
+    signature = _result_file_signature(path)
+    key = (parser.__name__, path)
+    with _parsed_cache_lock:
+        entry = _parsed_cache.get(key)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    parsed = parser(path)
+    with _parsed_cache_lock:
+        _parsed_cache[key] = (signature, parsed)
+    return parsed
+
 def _parse_kpis_csv(path):
+    table = _read_columnar(path)
+    if table is not None and table.num_rows:
+        return {name: table.column(name)[0].as_py() for name in table.column_names}
     import csv
     kpis = {}
     try:
-        with open(path, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8-sig') as f:
             reader = csv.DictReader(f)
             for row in reader:
                 name = row.get('指标')
@@ -141,10 +328,13 @@ def _parse_kpis_csv(path):
     return kpis
 
 def _parse_orders_csv(path):
+    table = _read_columnar(path)
+    if table is not None:
+        return table.select(['order_id', 'completion_days', 'due_date', 'tardiness', 'on_time']).to_pylist()
     import csv
     orders = []
     try:
-        with open(path, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8-sig') as f:
             reader = csv.DictReader(f)
             for row in reader:
                 try:
@@ -163,6 +353,15 @@ def _parse_orders_csv(path):
 
 @app.route('/api/results', methods=['GET'])
 def api_results():
+    # 仪表盘轮询接口: ETag仅由结果文件签名计算(不读取内容),文件未变化时返回304
+    signature = [(f, _result_file_signature(os.path.join(REPO_ROOT, f))) for f in OUTPUT_FILES]
+    return conditional_response(
+        request, make_etag('results', signature), 'application/json',
+        lambda: json.dumps(_build_results(), ensure_ascii=False).encode('utf-8'),
+        cache=body_cache,
+    )
+
+def _build_results():
     # 汇总当前已存在的结果文件列表及下载链接（两种算法）
     existing = []
     for f in OUTPUT_FILES:
@@ -180,9 +379,9 @@ def api_results():
     ga_gantt = os.path.join(REPO_ROOT, 'schedule_gantt_GA.html')
     ga_results = os.path.join(REPO_ROOT, 'schedule_results_GA.csv')
     if os.path.exists(ga_kpis):
-        ga['kpis'] = _parse_kpis_csv(ga_kpis)
+        ga['kpis'] = _cached_parse(_parse_kpis_csv, ga_kpis)
     if os.path.exists(ga_orders):
-        ga['orders'] = _parse_orders_csv(ga_orders)
+        ga['orders'] = _cached_parse(_parse_orders_csv, ga_orders)
     if os.path.exists(ga_gantt):
         ga['gantt_url'] = url_for('download', filename='schedule_gantt_GA.html')
     if os.path.exists(ga_results):
@@ -195,93 +394,437 @@ def api_results():
     ns_gantt = os.path.join(REPO_ROOT, 'schedule_gantt_NSGA2.html')
     ns_results = os.path.join(REPO_ROOT, 'schedule_results_NSGA2.csv')
     if os.path.exists(ns_kpis):
-        ns['kpis'] = _parse_kpis_csv(ns_kpis)
+        ns['kpis'] = _cached_parse(_parse_kpis_csv, ns_kpis)
     if os.path.exists(ns_orders):
-        ns['orders'] = _parse_orders_csv(ns_orders)
+        ns['orders'] = _cached_parse(_parse_orders_csv, ns_orders)
     if os.path.exists(ns_gantt):
         ns['gantt_url'] = url_for('download', filename='schedule_gantt_NSGA2.html')
     if os.path.exists(ns_results):
         ns['schedule_csv_url'] = url_for('download', filename='schedule_results_NSGA2.csv')
 
-    return jsonify({
+    return {
         'files': existing,
         'ga': ga,
         'nsga2': ns,
-    })
-
-@app.route('/api/schedule', methods=['POST'])
-def api_schedule():
-    # 保存上传文件
-    mapping = {
-        'process_times': '工序加工时间.csv',
-        'orders': '订单数据.csv',
-        'machines': '设备可用时间.csv',
     }
-    for field, filename in mapping.items():
+
+def _read_uploads():
+    # 在请求线程内读取上传内容(请求结束后文件流即失效),作业开始执行时再写入
+    uploads = {}
+    for field, filename in UPLOAD_MAPPING.items():
         file = request.files.get(field)
         if file and file.filename:
-            file.save(os.path.join(REPO_ROOT, filename))
+            uploads[filename] = file.read()
+    return uploads
+
+@tracing.traced('job.collect_results', cat='web')
+def _collect_results(algorithm, directory=REPO_ROOT):
+    # 读取求解器输出文件,组装与原同步接口一致的结果
+    return {
+        'kpis': _parse_kpis_csv(os.path.join(directory, f'schedule_kpis_{algorithm}.csv')),
+        'orders': _parse_orders_csv(os.path.join(directory, f'schedule_orders_{algorithm}.csv')),
+        'gantt_html': _read_text(os.path.join(directory, f'schedule_gantt_{algorithm}.html')),
+        'schedule_csv': _read_text(os.path.join(directory, f'schedule_results_{algorithm}.csv')),
+        'algorithm': algorithm,
+    }
 
-    # 运行GA
+def _read_priority():
+    # 可选字段priority: interactive(默认,交互式重排)/batch(批量作业,让位于交互式作业)
+    value = (request.values.get('priority') or 'interactive').strip().lower()
+    if value not in PRIORITY_NAMES:
+        abort(400, description=f"priority须为: {', '.join(PRIORITY_NAMES)}")
+    return PRIORITY_NAMES[value]
+
+def _read_seed():
+    # 可选表单字段seed: 指定后求解结果可复现; 非整数返回400
+    value = request.form.get('seed', '').strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, description='seed必须为整数')
+
+def _read_time_budget():
+    # 可选字段time_budget: 作业时间预算(秒); 未提供时使用FFS_JOB_TIME_BUDGET,0表示不限
+    value = (request.values.get('time_budget') or '').strip()
+    if not value:
+        return JOB_TIME_BUDGET
+    try:
+        budget = float(value)
+    except ValueError:
+        abort(400, description='time_budget必须为数字(秒)')
+    if budget < 0:
+        abort(400, description='time_budget不能为负数')
+    return budget or None
+
+def _effective_inputs(uploads):
+    # 求解器实际读取的全部输入(提交时快照): 上传内容,未上传的文件取REPO_ROOT中的当前版本
+    inputs = {}
+    for filename in list(UPLOAD_MAPPING.values()) + [DEFAULT_ROUTING_FILE]:
+        if filename in uploads:
+            inputs[filename] = uploads[filename]
+        elif os.path.exists(os.path.join(REPO_ROOT, filename)):
+            with open(os.path.join(REPO_ROOT, filename), 'rb') as f:
+                inputs[filename] = f.read()
+    return inputs
+
+@tracing.traced('job.prepare_workspace', cat='web')
+def _prepare_workspace(job, inputs):
+    # 创建作业工作区并写入输入快照
+    workspace = workspaces.create(job.job_id)
+    for filename, content in inputs.items():
+        with open(os.path.join(workspace, filename), 'wb') as f:
+            f.write(content)
+    return workspace
+
+def _cleanup_workspaces():
+    active = [j.job_id for j in job_manager.list_jobs() if j.state not in FINISHED_STATES]
     try:
-        subprocess.run([
-            'uv', 'run', 'python', 'run_ga.py'
-        ], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
-    except subprocess.CalledProcessError as e:
-        err = e.stderr or e.stdout
-        return jsonify({'error': err[:500]}), 500
-
-    # 读取结果
-    kpis = _parse_kpis_csv(os.path.join(REPO_ROOT, 'schedule_kpis_GA.csv'))
-    orders = _parse_orders_csv(os.path.join(REPO_ROOT, 'schedule_orders_GA.csv'))
-    gantt_html = _read_text(os.path.join(REPO_ROOT, 'schedule_gantt_GA.html'))
-    schedule_csv = _read_text(os.path.join(REPO_ROOT, 'schedule_results_GA.csv'))
+        workspaces.cleanup(keep=active)
+    except OSError:
+        traceback.print_exc()
+
+def _run_solver_job(job, algorithm, inputs, seed=None, cache_key=None, in_repo_root=False, solver_params=None):
+    # 作业函数: 准备工作区 → 运行求解 → 读取结果(并写入结果缓存)
+    if in_repo_root:
+        with _repo_root_lock:
+            return _solve_in(job, algorithm, REPO_ROOT, seed, cache_key, solver_params)
+    job.set_progress(0.05, '写入输入数据')
+    workspace = _prepare_workspace(job, inputs)
+    try:
+        return _solve_in(job, algorithm, workspace, seed, cache_key, solver_params)
+    finally:
+        _cleanup_workspaces()
+
+def _solve_in(job, algorithm, workspace, seed, cache_key, solver_params=None):
+    # solver_params: 求解器专属参数(如调度规则rule),常驻进程中作为关键字参数传入,回退模式转为命令行参数
+    job.set_progress(0.1, f'{algorithm}求解中')
+    # /run作业写入REPO_ROOT,保持同目录plotly.min.js以便整体下载离线查看; 作业工作区引用共享脚本
+    plotlyjs = 'directory' if workspace == REPO_ROOT else SHARED_PLOTLY_JS
+    solver_params = {'include_plotlyjs': plotlyjs, 'history_db': HISTORY_DB, **(solver_params or {})}
+    if USE_WARM_WORKERS:
+        def on_progress(event):
+            # 求解阶段占总进度的10%-95%
+            fraction = event['generation'] / max(event['generations'], 1)
+            job.publish(event, 0.1 + 0.85 * fraction, f"{algorithm}求解中 第{event['generation']}/{event['generations']}代")
+        params = {'seed': seed, 'input_dir': workspace, 'output_dir': workspace,
+                  'profile_every': SIMULATOR_PROFILE_EVERY, **(solver_params or {})}
+        _get_worker_pool().solve(algorithm, params, on_progress=on_progress, control=job.control)
+    else:
+        _solve_subprocess(job, algorithm, workspace, seed, solver_params)
+    
+    job.set_progress(0.95, '读取结果')
+    results = _collect_results(algorithm, workspace)
+    results['stop_reason'] = job.control.stop_reason
+    if job.control.stop_reason is not None:
+        cache_key = None  # 提前结束的结果不是该请求的完整结果,不写入结果缓存
+    if cache_key is not None:
+        try:
+            with tracing.span('job.result_cache_put', cat='web'):
+                result_cache.put(cache_key, results)
+        except OSError:
+            traceback.print_exc()  # 缓存写入失败不影响本次结果
+            cache_key = None
+    return _light_result(results, cache_key)
+
+@tracing.traced('job.solve_subprocess', cat='web')
+def _solve_subprocess(job, algorithm, workspace, seed, solver_params=None):
+    # 回退模式: 子进程求解; 时间预算在启动时以--time-budget传入(之后调整不再生效),
+    # 取消时终止子进程(没有可输出的最优解,作业以cancelled结束)
+    command = ['uv', 'run', 'python', SOLVER_SCRIPTS[algorithm], '--input-dir', workspace, '--output-dir', workspace]
+    if seed is not None:
+        command += ['--seed', str(seed)]
+    if job.control.time_budget is not None:
+        command += ['--time-budget', str(job.control.remaining())]
+    if SIMULATOR_PROFILE_EVERY:
+        command += ['--profile-every', str(SIMULATOR_PROFILE_EVERY)]
+    for name, value in (solver_params or {}).items():
+        command += ['--' + name.replace('_', '-'), str(value)]
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=0.5)
+            break
+        except subprocess.TimeoutExpired:
+            if job.control.cancelled:
+                process.kill()
+                process.communicate()
+                raise JobCancelled() from None
+    if process.returncode != 0:
+        err = stderr or stdout
+        raise RuntimeError(err[-500:])
+    job.control.should_stop()  # 超出时间预算即视为提前结束(记录stop_reason)
+
+def _light_result(results, cache_key=None):
+    # 作业内保存的结果不含甘特图/排程CSV大字段,响应时由_artifact_urls补充其URL
+    light = {k: v for k, v in results.items() if k not in RESULT_ARTIFACTS}
+    light['result_key'] = cache_key
+    return light
+
+def _artifact_urls(job, result):
+    # 甘特图/排程CSV的URL: 有缓存键时指向结果缓存,否则指向作业工作区(/run作业为REPO_ROOT)中的文件
+    algorithm = result['algorithm']
+    if result.get('result_key'):
+        key = result['result_key']
+        return {
+            'gantt_url': url_for('api_result_artifact', key=key, artifact='gantt.html'),
+            'schedule_csv_url': url_for('api_result_artifact', key=key, artifact='schedule.csv'),
+        }
+    if job.params.get('workspace') == 'repo_root':
+        return {
+            'gantt_url': url_for('gantt_nsga2' if algorithm == 'NSGA2' else 'gantt'),
+            'schedule_csv_url': url_for('download', filename=f'schedule_results_{algorithm}.csv'),
+        }
+    return {
+        'gantt_url': url_for('api_job_file', job_id=job.job_id, filename=f'schedule_gantt_{algorithm}.html'),
+        'schedule_csv_url': url_for('api_job_file', job_id=job.job_id, filename=f'schedule_results_{algorithm}.csv'),
+    }
 
-    return jsonify({
-        'kpis': kpis,
-        'orders': orders,
-        'gantt_html': gantt_html,
-        'schedule_csv': schedule_csv,
-        'algorithm': 'GA',
-    })
+def _run_pending_job(job, cache_key, *args, **kwargs):
+    try:
+        return _run_solver_job(job, *args, cache_key=cache_key, **kwargs)
+    finally:
+        with _pending_jobs_lock:
+            if _pending_jobs.get(cache_key) is job:
+                del _pending_jobs[cache_key]
+
+def _submit_solver_job(algorithm, uploads, seed=None, use_cache=True, in_repo_root=False,
+                       priority=PRIORITY_INTERACTIVE, time_budget=JOB_TIME_BUDGET, solver_params=None):
+    # 提交求解作业,返回(job, 是否已完成); use_cache为True时缓存命中则登记一个已完成作业,
+    # 相同请求正在排队/运行时直接返回该作业(并按需提升其优先级); 队列已满时抛出QueueFullError
+    # solver_params为求解器专属参数,参与结果缓存键
+    params = {'uploads': sorted(uploads), 'seed': seed, 'time_budget': time_budget}
+    if solver_params:
+        params['solver_params'] = solver_params
+    if in_repo_root:
+        params['workspace'] = 'repo_root'
+    inputs = {} if in_repo_root else _effective_inputs(uploads)
+    if not use_cache:
+        job = job_manager.submit(
+            algorithm,
+            lambda job: _run_solver_job(job, algorithm, inputs, seed, in_repo_root=in_repo_root,
+                                        solver_params=solver_params),
+            params=params, priority=priority, cost=SOLVER_CPU_COST[algorithm], time_budget=time_budget,
+        )
+        return job, False
+
+    key = compute_request_key(inputs, algorithm, params=solver_params, seed=seed, version=PREPROCESS_VERSION)
+    cached = result_cache.get(key)
+    metrics.CACHE_REQUESTS.inc(cache='result', result='miss' if cached is None else 'hit')
+    if cached is not None:
+        return job_manager.add_finished(algorithm, _light_result(cached, key), params=dict(params, cache='hit')), True
+    with _pending_jobs_lock:
+        job = _pending_jobs.get(key)
+        if job is None or job.control.cancelled:
+            # 已取消的作业不再共享(其结果为提前结束的部分结果)
+            job = job_manager.submit(
+                algorithm,
+                lambda job: _run_pending_job(job, key, algorithm, inputs, seed, solver_params=solver_params),
+                params=params, priority=priority, cost=SOLVER_CPU_COST[algorithm], time_budget=time_budget,
+            )
+            _pending_jobs[key] = job
+        elif priority < job.priority:
+            job_manager.set_priority(job, priority)
+    return job, False
+
+def _job_info(job):
+    info = job.to_dict()
+    info['queue_position'] = job_manager.queue_position(job)
+    info['status_url'] = url_for('api_job', job_id=job.job_id)
+    info['events_url'] = url_for('api_job_events', job_id=job.job_id)
+    info['files'] = [
+        url_for('api_job_file', job_id=job.job_id, filename=name, download=1)
+        for name in workspaces.list_files(job.job_id)
+    ] if job.state in FINISHED_STATES else []
+    if info.get('result'):
+        info['result'] = dict(info['result'], **_artifact_urls(job, info['result']))
+    return info
+
+def _job_response(job, status=200):
+    return jsonify(_job_info(job)), status
+
+@app.errorhandler(QueueFullError)
+def queue_full(e):
+    # 背压: 排队已满时拒绝新作业,客户端按Retry-After重试
+    response = jsonify({'error': str(e), 'admission': job_manager.stats()})
+    response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response, 429
+
+@app.route('/api/schedule', methods=['POST'])
+def api_schedule():
+    # 提交GA作业,立即返回作业ID(202),通过 GET /api/jobs/<id> 查询进度与结果;
+    # 相同输入/参数/种子已有缓存结果时直接返回已完成作业(200)
+    job, finished = _submit_solver_job('GA', _read_uploads(), _read_seed(), priority=_read_priority(),
+                                       time_budget=_read_time_budget())
+    return _job_response(job, 200 if finished else 202)
 
 @app.route('/api/schedule_nsga2', methods=['POST'])
 def api_schedule_nsga2():
-    # 保存上传文件（与GA相同映射）
-    mapping = {
-        'process_times': '工序加工时间.csv',
-        'orders': '订单数据.csv',
-        'machines': '设备可用时间.csv',
-    }
-    for field, filename in mapping.items():
-        file = request.files.get(field)
-        if file and file.filename:
-            file.save(os.path.join(REPO_ROOT, filename))
-
-    # 运行NSGA-II
+    # 提交NSGA-II作业,立即返回作业ID(202); 缓存命中时返回已完成作业(200)
+    job, finished = _submit_solver_job('NSGA2', _read_uploads(), _read_seed(), priority=_read_priority(),
+                                       time_budget=_read_time_budget())
+    return _job_response(job, 200 if finished else 202)
+
+@app.route('/api/schedule_dispatch', methods=['POST'])
+def api_schedule_dispatch():
+    # 提交调度规则排程作业(毫秒~秒级的基准方案); 可选字段rule: EDD/WSPT/ATC(默认)/SPT/LPT/ALL(取最优规则)
+    rule = (request.values.get('rule') or DEFAULT_RULE).strip().upper()
+    if rule not in DISPATCH_RULES and rule != 'ALL':
+        abort(400, description=f"rule须为: {', '.join(DISPATCH_RULES + ('ALL',))}")
+    job, finished = _submit_solver_job('DISPATCH', _read_uploads(), priority=_read_priority(),
+                                       time_budget=_read_time_budget(), solver_params={'rule': rule})
+    return _job_response(job, 200 if finished else 202)
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job(job_id):
+    # 作业状态/进度; 成功时包含result(结构同原同步接口)
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '作业不存在'}), 404
+    # 轮询时状态未变化返回304
+    body = json.dumps(_job_info(job), ensure_ascii=False).encode('utf-8')
+    return conditional_response(request, make_etag(body), 'application/json', lambda: body)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def api_cancel_job(job_id):
+    # 取消作业: 排队作业立即取消; 运行中作业在下一代开始前停止,并以当前最优解完成(结果不写入缓存)。
+    # 最多等待wait秒(默认CANCEL_WAIT_SECONDS)使响应直接包含该结果(200),仍未结束时返回202
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '作业不存在'}), 404
+    if not job_manager.cancel(job):
+        return jsonify(dict(_job_info(job), error='作业已结束')), 409
+    try:
+        wait = min(float(request.args.get('wait', CANCEL_WAIT_SECONDS)), 60.0)
+    except ValueError:
+        abort(400, description='wait必须为数字(秒)')
+    deadline = time.time() + wait
+    seq = -1
+    while job.state not in FINISHED_STATES and time.time() < deadline:
+        seq, _ = job.wait_event(seq, timeout=deadline - time.time())
+    return _job_response(job, 200 if job.state in FINISHED_STATES else 202)
+
+@app.route('/api/jobs/<job_id>', methods=['PATCH'])
+def api_update_job(job_id):
+    # 调整作业时间预算(排队或运行中均可,运行中即时生效):
+    #   time_budget: 自开始执行起的总秒数,0或null表示不限; extend_seconds: 在当前预算上延长(负数为缩短)
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '作业不存在'}), 404
+    if job.state in FINISHED_STATES:
+        return jsonify(dict(_job_info(job), error='作业已结束')), 409
+    body = request.get_json(silent=True) or request.values
     try:
-        subprocess.run([
-            'uv', 'run', 'python', 'run_nsga2.py'
-        ], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
-    except subprocess.CalledProcessError as e:
-        err = e.stderr or e.stdout
-        return jsonify({'error': err[:500]}), 500
-
-    # 读取NSGA-II结果
-    kpis = _parse_kpis_csv(os.path.join(REPO_ROOT, 'schedule_kpis_NSGA2.csv'))
-    orders = _parse_orders_csv(os.path.join(REPO_ROOT, 'schedule_orders_NSGA2.csv'))
-    gantt_html = _read_text(os.path.join(REPO_ROOT, 'schedule_gantt_NSGA2.html'))
-    schedule_csv = _read_text(os.path.join(REPO_ROOT, 'schedule_results_NSGA2.csv'))
+        if 'time_budget' in body:
+            value = body.get('time_budget')
+            job.control.set_time_budget(float(value) if value not in (None, '') else None)
+        elif 'extend_seconds' in body:
+            job.control.extend(float(body.get('extend_seconds')))
+        else:
+            abort(400, description='需提供time_budget或extend_seconds')
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    job.set_progress(job.progress)  # 通知SSE订阅方预算已变化
+    return _job_response(job)
+
+@app.route('/api/results/<key>/<artifact>', methods=['GET'])
+def api_result_artifact(key, artifact):
+    # 结果缓存中的甘特图/排程CSV(作业结果以URL引用,不内联); ETag取自缓存条目版本
+    if len(key) != 64 or any(c not in '0123456789abcdef' for c in key):
+        abort(404)
+    if artifact == 'plotly.min.js':
+        # 甘特图HTML以相对路径引用plotly.min.js
+        return redirect(url_for('plotly_js'))
+    fields = {name: (field, mimetype) for field, (name, mimetype) in RESULT_ARTIFACTS.items()}
+    signature = result_cache.signature(key)
+    if artifact not in fields or signature is None:
+        return jsonify({'error': '结果不存在或已从缓存淘汰'}), 404
+    field, mimetype = fields[artifact]
+    
+    def load():
+        cached = result_cache.get(key)
+        if cached is None or cached.get(field) is None:
+            abort(404)
+        return cached[field].encode('utf-8')
+    
+    return conditional_response(request, make_etag(key, artifact, signature), f'{mimetype}; charset=utf-8',
+                                load, cache=body_cache)
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def api_job_events(job_id):
+    # SSE进度流: 每次状态/进度变化推送一条 progress 事件(含求解器每代事件),
+    # 作业结束时推送 done 事件后关闭; 结果仍通过 status_url 获取
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '作业不存在'}), 404
+    
+    def stream():
+        seq = -1
+        while True:
+            new_seq, snapshot = job.wait_event(seq, timeout=SSE_KEEPALIVE_SECONDS)
+            if new_seq == seq and snapshot['state'] not in FINISHED_STATES:
+                yield ': keepalive\n\n'
+                continue
+            seq = new_seq
+            event_type = 'done' if snapshot['state'] in FINISHED_STATES else 'progress'
+            yield f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(snapshot, ensure_ascii=False)}\n\n"
+            if event_type == 'done':
+                return
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
 
+@app.route('/api/jobs/<job_id>/files/<path:filename>', methods=['GET'])
+def api_job_file(job_id, filename):
+    # 作业工作区中的文件(输入CSV、结果CSV、甘特图等); 工作区被清理后返回404
+    # HTML(甘特图)默认内联返回以便iframe嵌入,其余文件及 ?download=1 时作为附件下载
+    workspace = workspaces.path(job_id)
+    if workspace is None or not os.path.isfile(os.path.join(workspace, filename)):
+        return jsonify({'error': '文件不存在或工作区已清理'}), 404
+    as_attachment = request.args.get('download') == '1' or not filename.lower().endswith('.html')
+    return _send_file(workspace, filename, as_attachment=as_attachment)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    # Prometheus抓取接口: 作业延迟直方图、队列深度、运行中作业、评估速率、缓存命中、各阶段耗时
+    # (常驻求解进程的指标在每次求解结束时汇总; FFS_WARM_WORKERS=0 时子进程内的求解器指标不计入)
+    stats = job_manager.stats()
+    QUEUE_DEPTH.set(stats['queued'])
+    RUNNING_JOBS.set(sum(1 for job in job_manager.list_jobs() if job.state == JOB_RUNNING))
+    JOB_WORKERS_GAUGE.set(stats['workers'])
+    CPU_BUDGET_GAUGE.set(stats['cpu_budget'])
+    CPU_IN_USE.set(stats['running_cost'])
+    cache_stats = result_cache.stats()
+    RESULT_CACHE_BYTES.set(cache_stats['bytes'])
+    RESULT_CACHE_ENTRIES_GAUGE.set(cache_stats['entries'])
+    return Response(metrics.REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/trace', methods=['GET'])
+def api_trace():
+    # 当前运行追踪(Chrome trace-event JSON); 未设置FFS_TRACE_FILE时返回404
+    tracer = tracing.get_tracer()
+    if tracer is None:
+        return jsonify({'error': '未启用运行追踪(设置FFS_TRACE_FILE)'}), 404
+    response = jsonify(tracer.to_dict())
+    response.headers['Content-Disposition'] = 'attachment; filename=ffs_trace.json'
+    return response
+
+@app.route('/api/jobs', methods=['GET'])
+def api_jobs():
     return jsonify({
-        'kpis': kpis,
-        'orders': orders,
-        'gantt_html': gantt_html,
-        'schedule_csv': schedule_csv,
-        'algorithm': 'NSGA2',
+        'workers': job_manager.max_workers,
+        'admission': job_manager.stats(),
+        'result_cache': result_cache.stats(),
+        'jobs': [job.to_dict(include_result=False) for job in job_manager.list_jobs()],
     })
 
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8003))
+    # 启动即预热常驻求解进程(调试重载器下仅在实际服务进程中启动)
+    if USE_WARM_WORKERS and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        _get_worker_pool()
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+HTTP响应缓存与压缩
+功能: 基于ETag的条件请求(If-None-Match → 304)、按Accept-Encoding压缩响应体(gzip,
+安装brotli时优先br),并在内存中按ETag缓存压缩结果,避免轮询时重复读取/压缩大文件
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # brotli为可选依赖,缺失时仅使用gzip
+    brotli = None
+
+# 小于该字节数的响应不压缩(压缩收益低于开销)
+MIN_COMPRESS_BYTES = 1024
+# 可压缩的MIME类型前缀
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript')
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """文件的(mtime_ns, size)签名; 文件不存在时返回None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def make_etag(*parts) -> str:
+    """由任意可转为字符串的部分计算ETag"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """按客户端Accept-Encoding选择压缩方式('br'/'gzip'),不支持时返回None"""
+    accepted = {token.split(';')[0].strip().lower() for token in (accept_encoding or '').split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def encode_body(body: bytes, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """按encoding压缩响应体,返回(响应体, 实际使用的编码); 过小的响应体不压缩"""
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == 'br':
+        return brotli.compress(body, quality=5), 'br'
+    return gzip.compress(body, compresslevel=6), 'gzip'
+
+
+class BodyCache:
+    """按(ETag, 请求编码)缓存的(响应体, 实际编码),总字节数超限时淘汰最久未用的条目"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple[str, Optional[str]], Tuple[bytes, Optional[str]]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, encoding: Optional[str], load: Callable[[], bytes]) -> Tuple[bytes, Optional[str]]:
+        """
+        取缓存的(响应体, 实际编码); 未命中时调用load()读取原文并按encoding压缩后缓存
+
+        参数:
+            etag: 内容标识(内容变化时必须变化)
+            encoding: 请求的编码 None/'gzip'/'br'
+            load: 返回未压缩原文的函数
+        """
+        key = (etag, encoding)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = encode_body(load(), encoding)
+        size = len(entry[0])
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = entry
+                self._size += size
+                while self._size > self.max_bytes:
+                    _, (evicted, _) = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return entry
+
+
+def conditional_response(request, etag: str, mimetype: str, load: Callable[[], bytes],
+                         cache: Optional[BodyCache] = None, max_age: int = 0,
+                         headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    构造带ETag的条件响应: If-None-Match命中时返回304且不调用load();
+    否则按Accept-Encoding压缩(大于MIN_COMPRESS_BYTES的可压缩类型)
+
+    参数:
+        request: 当前Flask请求
+        etag: 内容标识(不含编码; 压缩版本自动追加后缀)
+        mimetype: 响应Content-Type(原样使用,文本类型由调用方附带charset)
+        load: 返回未压缩原文的函数(仅在需要发送响应体时调用)
+        cache: 可选,缓存原文/压缩结果
+        max_age: Cache-Control max-age(秒); 0表示每次使用前须向服务器验证
+        headers: 额外响应头
+    """
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', '')) \
+        if mimetype.startswith(COMPRESSIBLE_TYPES) else None
+    base_headers = {'Vary': 'Accept-Encoding', 'Cache-Control': f'max-age={max_age}, must-revalidate'}
+    base_headers.update(headers or {})
+
+    # 同一内容的不同编码使用不同的强ETag(压缩版本追加编码后缀); 任一版本命中均可304
+    candidates = [etag] + ([f"{etag}-{encoding}"] if encoding else [])
+    for candidate in candidates:
+        if request.if_none_match.contains(candidate):
+            response = Response(status=304, headers=base_headers)
+            response.set_etag(candidate)
+            return response
+
+    if cache is not None:
+        body, applied = cache.get(etag, encoding, load)
+    else:
+        body, applied = encode_body(load(), encoding)
+    if applied:
+        base_headers['Content-Encoding'] = applied
+    response = Response(body, content_type=mimetype, headers=base_headers)
+    response.set_etag(f"{etag}-{applied}" if applied else etag)
+    return response
@@ -0,0 +1,351 @@
+"""
+Web端异步作业子系统
+功能: 提交即返回作业ID,按优先级排队并在CPU预算内由工作线程执行排程作业,
+通过作业ID查询状态、进度与结果; 求解器进度事件经Job.publish发布,
+供SSE等订阅方通过Job.wait_event等待; 排队作业可直接取消,运行中作业经Job.control
+(SolverControl)协作式停止或调整时间预算
+"""
+
+import itertools
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import tracing
+from metrics import REGISTRY
+from solver_control import SolverControl
+
+
+# 作业状态
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+# 作业优先级(数值越小越先执行): 交互式重排优先于夜间批量作业
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+PRIORITY_NAMES = {
+    'interactive': PRIORITY_INTERACTIVE,
+    'batch': PRIORITY_BATCH,
+}
+
+
+# 作业延迟分桶(秒): 交互式作业为秒级,批量作业可达数十分钟
+JOB_LATENCY_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+JOB_QUEUE_SECONDS = REGISTRY.histogram(
+    'ffs_job_queue_wait_seconds', '作业从提交到开始执行的等待时间', ['kind'], buckets=JOB_LATENCY_BUCKETS)
+JOB_RUN_SECONDS = REGISTRY.histogram(
+    'ffs_job_run_seconds', '作业执行时间(按结束状态)', ['kind', 'state'], buckets=JOB_LATENCY_BUCKETS)
+
+
+class QueueFullError(RuntimeError):
+    """排队作业数已达上限,拒绝新作业(Web端映射为HTTP 429)"""
+
+
+class JobCancelled(Exception):
+    """作业函数因取消而放弃执行且没有可返回的结果时抛出,作业以cancelled状态结束"""
+
+
+class Job:
+    """单个排程作业(状态字段由执行线程更新,读取时通过to_dict获取一致快照)"""
+
+    def __init__(self, kind: str, params: Optional[Dict] = None,
+                 priority: int = PRIORITY_INTERACTIVE, cost: int = 1,
+                 time_budget: Optional[float] = None):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.priority = priority
+        self.cost = cost  # 执行时占用的CPU预算(求解进程/线程数)
+        self.seq = 0  # 提交序号,同优先级按提交顺序执行
+        self.state = JOB_QUEUED
+        self.progress = 0.0
+        self.message = '排队中'
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.last_event: Optional[Dict] = None
+        # 取消请求与时间预算(自开始执行起计时),由作业函数传给求解器
+        self.control = SolverControl(time_budget=time_budget)
+        self._event_seq = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def set_progress(self, progress: float, message: Optional[str] = None):
+        """更新进度(0-1)与进度说明,供作业函数调用"""
+        with self._lock:
+            self.progress = max(0.0, min(1.0, float(progress)))
+            if message is not None:
+                self.message = message
+            self._notify()
+
+    def publish(self, event: Dict, progress: Optional[float] = None, message: Optional[str] = None):
+        """
+        发布求解器进度事件(如每代最优适应度),同时可更新进度与进度说明
+
+        订阅方只关心最新状态: 两次读取之间的多个事件合并为最后一个
+        """
+        with self._lock:
+            self.last_event = event
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, float(progress)))
+            if message is not None:
+                self.message = message
+            self._notify()
+
+    def _notify(self):
+        # 调用方须持有self._lock
+        self._event_seq += 1
+        self._changed.notify_all()
+
+    def wait_event(self, last_seq: int, timeout: Optional[float] = None) -> Tuple[int, Dict]:
+        """
+        等待作业状态/进度在last_seq之后发生变化(或超时),返回(当前序号, 状态快照)
+
+        快照包含state/progress/message/event; 作业已结束时立即返回
+        """
+        with self._lock:
+            if self._event_seq == last_seq and self.state not in FINISHED_STATES:
+                self._changed.wait(timeout)
+            return self._event_seq, {
+                'job_id': self.job_id,
+                'state': self.state,
+                'progress': self.progress,
+                'message': self.message,
+                'event': self.last_event,
+                'error': self.error,
+            }
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        with self._lock:
+            info = {
+                'job_id': self.job_id,
+                'kind': self.kind,
+                'params': self.params,
+                'priority': self.priority,
+                'cost': self.cost,
+                'state': self.state,
+                'progress': self.progress,
+                'message': self.message,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'error': self.error,
+                'event': self.last_event,
+                'control': self.control.to_dict(),
+            }
+            if include_result and self.state == JOB_SUCCEEDED:
+                info['result'] = self.result
+            return info
+
+
+class JobManager:
+    """
+    优先级作业管理器: 作业按(优先级, 提交顺序)排队,在CPU预算内由max_workers个工作线程执行;
+    排队数达max_queue时拒绝新作业,已结束作业保留最近max_history个
+    """
+
+    def __init__(self, max_workers: int = 1, max_history: int = 200,
+                 max_queue: Optional[int] = None, cpu_budget: Optional[int] = None):
+        """
+        参数:
+            max_workers: 并发执行的作业数上限
+            max_history: 内存中保留的作业数上限(超出时淘汰最早的已结束作业)
+            max_queue: 排队作业数上限(None表示不限),超出时submit抛出QueueFullError
+            cpu_budget: 同时运行作业的cost总和上限(None表示等于max_workers)
+        """
+        self.max_workers = max_workers
+        self.max_history = max_history
+        self.max_queue = max_queue
+        self.cpu_budget = cpu_budget if cpu_budget is not None else max_workers
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._queue: List[Tuple[Job, Callable[[Job], Dict]]] = []
+        self._running_cost = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._dispatch = threading.Condition(self._lock)
+        for i in range(max_workers):
+            threading.Thread(target=self._worker_loop, name=f'ffs-job-{i}', daemon=True).start()
+
+    def submit(self, kind: str, fn: Callable[[Job], Dict], params: Optional[Dict] = None,
+               priority: int = PRIORITY_INTERACTIVE, cost: int = 1,
+               time_budget: Optional[float] = None) -> Job:
+        """
+        提交作业,立即返回
+
+        参数:
+            kind: 作业类型(如 'GA' / 'NSGA2')
+            fn: 作业函数,接收Job(可调用job.set_progress),返回结果字典;抛出异常即作业失败
+            params: 作业参数(仅用于展示)
+            priority: 优先级(PRIORITY_*,数值越小越先执行)
+            cost: 运行时占用的CPU预算,须不超过cpu_budget
+            time_budget: 可选,运行时间预算(秒),经job.control传给求解器
+
+        异常:
+            QueueFullError: 排队作业数已达max_queue
+        """
+        if cost > self.cpu_budget:
+            raise ValueError(f"作业CPU占用({cost})超过总预算({self.cpu_budget})")
+        job = Job(kind, params, priority=priority, cost=cost, time_budget=time_budget)
+        with self._lock:
+            if self.max_queue is not None and len(self._queue) >= self.max_queue:
+                raise QueueFullError(f"排队作业数已达上限({self.max_queue})")
+            job.seq = next(self._seq)
+            self._jobs[job.job_id] = job
+            self._queue.append((job, fn))
+            self._evict()
+            self._dispatch.notify_all()
+        return job
+
+    def set_priority(self, job: Job, priority: int):
+        """调整排队作业的优先级(已开始执行的作业不受影响)"""
+        with self._lock:
+            if job.state == JOB_QUEUED:
+                job.priority = priority
+                self._dispatch.notify_all()
+
+    def cancel(self, job: Job) -> bool:
+        """
+        取消作业: 排队作业直接移出队列并以cancelled结束; 运行中作业请求求解器在下一代前停止,
+        作业随后以当前最优结果完成
+
+        返回:
+            是否受理(已结束的作业返回False)
+        """
+        with self._lock:
+            queued = [entry for entry in self._queue if entry[0] is job]
+            if queued:
+                self._queue.remove(queued[0])
+                self._dispatch.notify_all()
+        with job._lock:
+            if job.state in FINISHED_STATES:
+                return False
+            job.control.cancel()
+            if queued:
+                job.state = JOB_CANCELLED
+                job.message = '已取消'
+                job.finished_at = time.time()
+            else:
+                job.message = '正在停止,输出当前最优结果'
+            job._notify()
+            return True
+
+    def _next_runnable(self) -> Optional[Tuple[Job, Callable[[Job], Dict]]]:
+        # 调用方须持有self._lock; 队首作业超出剩余预算时等待,不让后面的作业插队(避免大作业饿死)
+        if not self._queue:
+            return None
+        entry = min(self._queue, key=lambda e: (e[0].priority, e[0].seq))
+        if self._running_cost + entry[0].cost > self.cpu_budget:
+            return None
+        return entry
+
+    def _worker_loop(self):
+        while True:
+            with self._dispatch:
+                entry = self._next_runnable()
+                while entry is None:
+                    self._dispatch.wait()
+                    entry = self._next_runnable()
+                self._queue.remove(entry)
+                self._running_cost += entry[0].cost
+            try:
+                self._run(*entry)
+            finally:
+                with self._dispatch:
+                    self._running_cost -= entry[0].cost
+                    self._dispatch.notify_all()
+
+    def add_finished(self, kind: str, result: Dict, params: Optional[Dict] = None) -> Job:
+        """登记一个无需执行、直接成功的作业(如命中结果缓存),使客户端沿用同一查询流程"""
+        job = Job(kind, params)
+        job.state = JOB_SUCCEEDED
+        job.progress = 1.0
+        job.message = '完成(缓存)'
+        job.result = result
+        job.started_at = job.finished_at = job.created_at
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict()
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Dict]):
+        with job._lock:
+            job.state = JOB_RUNNING
+            job.started_at = time.time()
+            job.message = '运行中'
+            job._notify()
+        JOB_QUEUE_SECONDS.observe(job.started_at - job.created_at, kind=job.kind)
+        job.control.start()
+        try:
+            result = fn(job)
+        except JobCancelled:
+            with job._lock:
+                job.state = JOB_CANCELLED
+                job.message = '已取消'
+                job.finished_at = time.time()
+                job._notify()
+        except Exception as e:
+            with job._lock:
+                job.state = JOB_FAILED
+                job.error = f"{type(e).__name__}: {e}"
+                job.message = '失败'
+                job.finished_at = time.time()
+                job._notify()
+            traceback.print_exc()
+        else:
+            with job._lock:
+                job.result = result
+                job.state = JOB_SUCCEEDED
+                job.progress = 1.0
+                job.message = '完成' if job.control.stop_reason is None else f'已提前结束({job.control.stop_reason})'
+                job.finished_at = time.time()
+                job._notify()
+        JOB_RUN_SECONDS.observe(job.finished_at - job.started_at, kind=job.kind, state=job.state)
+        tracer = tracing.get_tracer()
+        if tracer is not None:
+            # 排队区间可能相互重叠,记为异步区间; 执行区间位于执行线程的轨道上
+            tracer.async_span('job.queued', job.job_id, int(job.created_at * 1e6), int(job.started_at * 1e6),
+                              cat='job', kind=job.kind, priority=job.priority)
+            tracer.complete('job.run', int(job.started_at * 1e6), int(job.finished_at * 1e6), cat='job',
+                            job_id=job.job_id, kind=job.kind, state=job.state)
+
+    def _evict(self):
+        """淘汰超出保留上限的最早已结束作业(排队/运行中的作业不淘汰)"""
+        excess = len(self._jobs) - self.max_history
+        if excess <= 0:
+            return
+        for job_id in [j.job_id for j in self._jobs.values() if j.state in FINISHED_STATES][:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        """全部保留作业(按提交时间倒序)"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def queue_position(self, job: Job) -> int:
+        """排队作业前方(按执行顺序)的排队作业数(非排队状态返回0)"""
+        with self._lock:
+            queued = sorted((j for j, _ in self._queue), key=lambda j: (j.priority, j.seq))
+        return queued.index(job) if job in queued else 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'cpu_budget': self.cpu_budget,
+                'running_cost': self._running_cost,
+                'queued': len(self._queue),
+                'max_queue': self.max_queue,
+            }
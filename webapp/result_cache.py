@@ -0,0 +1,130 @@
+"""
+排程结果缓存
+功能: 以输入文件内容 + 算法 + 求解参数 + 随机种子的联合哈希为键,
+将已完成作业的结果(KPI、订单、排程CSV、甘特图)持久化到磁盘;
+条目数/总字节数超限时按最近使用时间(文件atime,命中时显式刷新)淘汰;
+mtime保持为写入时间,可作为条目内容的版本标识
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+ENTRY_SUFFIX = '.json'
+
+
+def compute_request_key(input_files: Dict[str, bytes], algorithm: str,
+                        params: Optional[Dict] = None, seed: Optional[int] = None,
+                        version: str = '') -> str:
+    """
+    计算排程请求的缓存键
+
+    参数:
+        input_files: {文件名: 内容} 求解器实际读取的全部输入
+        algorithm: 'GA' 或 'NSGA2'
+        params: 求解参数(须可JSON序列化)
+        seed: 随机种子(None也参与哈希,与指定种子的请求区分)
+        version: 求解/预处理逻辑版本,变更后旧条目自动失效
+
+    返回:
+        十六进制SHA-256摘要
+    """
+    digest = hashlib.sha256()
+    header = {'algorithm': algorithm, 'params': params or {}, 'seed': seed, 'version': version}
+    digest.update(json.dumps(header, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    for name in sorted(input_files):
+        content = input_files[name]
+        digest.update(b'\x00' + name.encode('utf-8') + b'\x00' + str(len(content)).encode('ascii') + b'\x00')
+        digest.update(content)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """磁盘LRU结果缓存: 每个条目一个JSON文件,命中时刷新atime作为最近使用时间"""
+
+    def __init__(self, directory: str, max_entries: int = 64, max_bytes: int = 256 * 1024 * 1024):
+        """
+        参数:
+            directory: 缓存目录
+            max_entries: 最大条目数
+            max_bytes: 全部条目的最大总字节数
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """读取条目并标记为最近使用; 未命中或条目损坏时返回None"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+                os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: Dict):
+        """写入条目(临时文件 + 原子替换),随后按LRU淘汰超限条目"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            with self._lock:
+                os.replace(tmp_path, self._path(key))
+                self._evict()
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def signature(self, key: str) -> Optional[Tuple[int, int]]:
+        """条目的(写入时间mtime_ns, 字节数),内容变化时随之变化; 不存在时返回None"""
+        try:
+            st = os.stat(self._path(key))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _entries(self) -> List[os.DirEntry]:
+        """全部条目,按最近使用时间升序"""
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(ENTRY_SUFFIX)]
+        return sorted(entries, key=lambda e: e.stat().st_atime_ns)
+
+    def _evict(self):
+        # 调用方须持有self._lock
+        entries = self._entries()
+        total = sum(e.stat().st_size for e in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            try:
+                os.remove(oldest.path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._entries()
+            return {
+                'entries': len(entries),
+                'bytes': sum(e.stat().st_size for e in entries),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -32,6 +32,26 @@ const AlertCircle = (props: any) => <Icon label="⚠️" {...props} />;
 const CheckCircle = (props: any) => <Icon label="✅" {...props} />;
 const Loader = (props: any) => <Icon label="⏳" {...props} />;
 
+// /api/jobs/<id>/events 推送的作业进度快照（event 为求解器每代进度）
+type JobProgress = {
+  job_id?: string;
+  state: string;
+  progress: number;
+  message: string;
+  error?: string | null;
+  event?: {
+    algorithm: 'GA' | 'NSGA2';
+    generation: number;
+    generations: number;
+    evals_per_sec: number;
+    best_fitness?: number;
+    pc?: number;
+    pm?: number;
+    front_size?: number;
+    hypervolume?: number;
+  } | null;
+};
+
 type Results = {
   kpis: {
     total_weighted_tardiness: number;
@@ -46,11 +66,11 @@ type Results = {
     tardiness: number;
     on_time: boolean;
   }>;
-  gantt_html: string;
-  schedule_csv: string;
-  // 以下为兼容老版接口的可选字段
+  // 作业结果以URL引用甘特图与排程CSV；内联字段仅兼容老版接口
   gantt_url?: string;
   schedule_csv_url?: string;
+  gantt_html?: string;
+  schedule_csv?: string;
   files?: Array<{ name: string; url: string }>;
 };
 
@@ -204,7 +224,48 @@ function LogicDisplay() {
   );
 }
 
-function DataInput({ files, onFilesChange, onRun, onRunNsga2, isRunning, error }: { files: Record<string, File | null>; onFilesChange: (f: Record<string, File | null>) => void; onRun: () => void; onRunNsga2: () => void; isRunning: boolean; error?: string | null; }) {
+function JobProgressPanel({ progress }: { progress: JobProgress }) {
+  const ev = progress.event;
+  // 停止求解：服务器在下一代开始前结束，并以当前最优解完成作业
+  const stopJob = () => {
+    if (progress.job_id) fetch(`/api/jobs/${progress.job_id}?wait=0`, { method: 'DELETE' });
+  };
+  return (
+    <div className="mt-4 rounded-lg border border-gray-200 bg-gray-50 p-4">
+      <div className="flex items-center justify-between text-sm text-gray-700">
+        <span>{progress.message}</span>
+        <span className="flex items-center gap-3">
+          {Math.round(progress.progress * 100)}%
+          {progress.job_id && progress.state === 'running' && (
+            <button onClick={stopJob} className="px-2 py-1 rounded-md border border-gray-300 bg-white text-xs text-gray-700 hover:bg-gray-100">停止并输出当前最优解</button>
+          )}
+        </span>
+      </div>
+      <div className="mt-2 h-2 w-full rounded-full bg-gray-200">
+        <div className="h-2 rounded-full bg-indigo-600 transition-all" style={{ width: `${progress.progress * 100}%` }} />
+      </div>
+      {ev && (
+        <div className="mt-3 grid grid-cols-2 md:grid-cols-4 gap-2 text-xs text-gray-600">
+          <span>代数：{ev.generation}/{ev.generations}</span>
+          <span>评估速率：{ev.evals_per_sec.toFixed(0)} 次/秒</span>
+          {ev.algorithm === 'GA' ? (
+            <>
+              <span>最优适应度：{ev.best_fitness?.toFixed(4)}</span>
+              <span>pc/pm：{ev.pc?.toFixed(3)} / {ev.pm?.toFixed(3)}</span>
+            </>
+          ) : (
+            <>
+              <span>前沿规模：{ev.front_size}</span>
+              <span>超体积：{ev.hypervolume?.toFixed(4)}</span>
+            </>
+          )}
+        </div>
+      )}
+    </div>
+  );
+}
+
+function DataInput({ files, onFilesChange, onRun, onRunNsga2, isRunning, progress, error }: { files: Record<string, File | null>; onFilesChange: (f: Record<string, File | null>) => void; onRun: () => void; onRunNsga2: () => void; isRunning: boolean; progress?: JobProgress | null; error?: string | null; }) {
   const handleFile = (key: string, file: File | null) => {
     onFilesChange({ ...files, [key]: file });
   };
@@ -289,16 +350,57 @@ function DataInput({ files, onFilesChange, onRun, onRunNsga2, isRunning, error }
             </button>
           </div>
           <p className="mt-2 text-sm text-gray-600">未上传数据时，将使用当前系统内的 CSV 文件运行。</p>
+          {isRunning && progress && <JobProgressPanel progress={progress} />}
         </div>
       </div>
     </div>
   );
 }
 
+// 等待作业结束：通过 SSE 接收进度，连接失败时返回 false 由调用方回退为轮询
+function followJobEvents(eventsUrl: string, onProgress: (p: JobProgress) => void): Promise<boolean> {
+  return new Promise((resolve) => {
+    if (typeof EventSource === 'undefined') return resolve(false);
+    const source = new EventSource(eventsUrl);
+    source.addEventListener('progress', (e) => onProgress(JSON.parse((e as MessageEvent).data)));
+    source.addEventListener('done', (e) => {
+      onProgress(JSON.parse((e as MessageEvent).data));
+      source.close();
+      resolve(true);
+    });
+    source.onerror = () => {
+      source.close();
+      resolve(false);
+    };
+  });
+}
+
+// 提交排程作业，经 SSE（或轮询 /api/jobs/<id>）等待结束，返回作业结果
+const JOB_POLL_INTERVAL_MS = 1000;
+async function runScheduleJob(url: string, formData: FormData, onProgress?: (p: JobProgress) => void): Promise<any> {
+  const resp = await fetch(url, { method: 'POST', body: formData });
+  if (resp.status === 429) throw new Error(`服务器繁忙（排队已满），请 ${resp.headers.get('Retry-After') || 30} 秒后重试`);
+  if (!resp.ok) throw new Error(`后端错误：${resp.status}`);
+  const job = await resp.json();
+  if (job.state === 'succeeded') return job.result; // 命中结果缓存
+  const streamed = onProgress && job.events_url ? await followJobEvents(job.events_url, onProgress) : false;
+  while (true) {
+    if (!streamed) await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    const statusResp = await fetch(job.status_url);
+    if (!statusResp.ok) throw new Error(`后端错误：${statusResp.status}`);
+    const status = await statusResp.json();
+    onProgress?.(status);
+    if (status.state === 'succeeded') return status.result;
+    if (status.state === 'failed') throw new Error(status.error || '排程作业失败');
+    if (status.state === 'cancelled') throw new Error('排程作业已取消');
+  }
+}
+
 function FFSSchedulerApp() {
   const [activeTab, setActiveTab] = useState<'logic' | 'input' | 'results'>('results');
   const [files, setFiles] = useState<Record<string, File | null>>({ orders: null, process_times: null, machines: null });
   const [isRunning, setIsRunning] = useState(false);
+  const [progress, setProgress] = useState<JobProgress | null>(null);
   const [results, setResults] = useState<Results | null>(null);
   const [error, setError] = useState<string | null>(null);
 
@@ -322,14 +424,13 @@ function FFSSchedulerApp() {
   const runScheduler = async () => {
     setError(null);
     setIsRunning(true);
+    setProgress(null);
     try {
       const formData = new FormData();
       if (files.orders) formData.append('orders', files.orders);
       if (files.process_times) formData.append('process_times', files.process_times);
       if (files.machines) formData.append('machines', files.machines);
-      const resp = await fetch('/api/schedule', { method: 'POST', body: formData });
-      if (!resp.ok) throw new Error(`后端错误：${resp.status}`);
-      const data = await resp.json();
+      const data = await runScheduleJob('/api/schedule', formData, setProgress);
       setResults(data);
       setActiveTab('results');
     } catch (e: any) {
@@ -342,14 +443,13 @@ function FFSSchedulerApp() {
   const runSchedulerNsga2 = async () => {
     setError(null);
     setIsRunning(true);
+    setProgress(null);
     try {
       const formData = new FormData();
       if (files.orders) formData.append('orders', files.orders);
       if (files.process_times) formData.append('process_times', files.process_times);
       if (files.machines) formData.append('machines', files.machines);
-      const resp = await fetch('/api/schedule_nsga2', { method: 'POST', body: formData });
-      if (!resp.ok) throw new Error(`后端错误：${resp.status}`);
-      const data = await resp.json();
+      const data = await runScheduleJob('/api/schedule_nsga2', formData, setProgress);
       setResults(data);
       setActiveTab('results');
     } catch (e: any) {
@@ -381,7 +481,7 @@ function FFSSchedulerApp() {
       </div>
 
       {activeTab === 'logic' && <LogicDisplay />}
-      {activeTab === 'input' && <DataInput files={files} onFilesChange={handleFileUpload} onRun={runScheduler} onRunNsga2={runSchedulerNsga2} isRunning={isRunning} error={error} />}
+      {activeTab === 'input' && <DataInput files={files} onFilesChange={handleFileUpload} onRun={runScheduler} onRunNsga2={runSchedulerNsga2} isRunning={isRunning} progress={progress} error={error} />}
 
       {activeTab === 'results' && (
         <div className="space-y-6">
@@ -738,7 +838,7 @@ function FFSSchedulerApp() {
                 {results.gantt_html ? (
                   <iframe title="Gantt" className="w-full h-[560px]" srcDoc={results.gantt_html}></iframe>
                 ) : results.gantt_url ? (
-                  <iframe title="Gantt" className="w-full h-[560px]" src={(results as any)?.algorithm==='NSGA2'? '/gantt_nsga2' : '/gantt'}></iframe>
+                  <iframe title="Gantt" className="w-full h-[560px]" src={results.gantt_url}></iframe>
                 ) : (
                   <div className="p-6 text-gray-500">暂无甘特图数据</div>
                 )}
@@ -0,0 +1,253 @@
+"""
+常驻求解进程池
+功能: 预先启动若干求解进程,进程内已导入求解栈(pandas/plotly/deap/mealpy)并缓存
+当前输入的预处理数据与仿真器; Web作业通过本地管道(multiprocessing.Pipe)下发求解请求,
+省去每次请求的解释器启动、模块导入、CSV预处理与仿真器构建;
+求解期间的每代进度以 ('progress', 事件) 消息经同一管道回传;
+取消与时间预算经每个进程专属的共享内存(SolverControl状态)下达,求解器每代检查;
+进程内累积的指标(metrics)与追踪事件(tracing,调用进程启用追踪时)随求解摘要回传并汇总到调用进程
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+import metrics
+import tracing
+from solver_control import STATE_SIZE, SolverControl
+
+# 进度消息的最小间隔(秒): 限制管道消息量,最后一代总会上报
+PROGRESS_INTERVAL = 0.25
+
+
+def _load_inputs(state: Dict, algorithm: str, input_dir: str = '.'):
+    """
+    返回(data, simulator): 输入文件内容哈希未变化时复用进程内缓存,否则重新预处理
+    (预处理本身仍走磁盘缓存); 仿真器按算法分别缓存,GA会调整目标函数权重
+    """
+    from data_preprocessor import DataPreprocessor, DEFAULT_CACHE_DIR
+    from ffs_simulator import FFSSimulator
+    
+    preprocessor = DataPreprocessor.from_directory(input_dir)
+    key = preprocessor.input_hash()
+    if state.get('data_hash') != key:
+        metrics.CACHE_REQUESTS.inc(cache='warm_inputs', result='miss')
+        start = time.time()
+        state.clear()
+        state['data_hash'] = key
+        state['data'] = preprocessor.process(cache_dir=DEFAULT_CACHE_DIR)
+        metrics.PHASE_SECONDS.observe(time.time() - start, algorithm=algorithm, phase='preprocess')
+    else:
+        metrics.CACHE_REQUESTS.inc(cache='warm_inputs', result='hit')
+    if algorithm not in state:
+        state[algorithm] = FFSSimulator(state['data'])
+    return state['data'], state[algorithm]
+
+
+def _solve(state: Dict, algorithm: str, params: Dict,
+           progress_callback: Optional[Callable[[Dict], None]] = None,
+           control: Optional[SolverControl] = None) -> Dict:
+    """
+    在常驻进程内执行一次求解,返回可跨进程传递的摘要
+    params中的input_dir/output_dir指定作业工作区(默认为进程工作目录); trace为True时记录追踪事件
+    """
+    import dispatching
+    import run_ga
+    import run_nsga2
+    from run_history import DEFAULT_HISTORY_DB
+    
+    params = dict(params)
+    if params.pop('trace', False):
+        tracing.enable(f'ffs-worker-{os.getpid()}')
+    else:
+        tracing.disable()
+    
+    load_start = time.time()
+    data, simulator = _load_inputs(state, algorithm, params.get('input_dir', '.'))
+    load_time = time.time() - load_start
+    # 运行历史库须显式传入: 导出时相对路径按作业工作区(output_dir)解析,未指定时使用进程工作目录下的共享库
+    params.setdefault('history_db', os.path.abspath(DEFAULT_HISTORY_DB))
+
+    if progress_callback is not None:
+        params = dict(params, progress_callback=progress_callback, progress_interval=PROGRESS_INTERVAL)
+    if control is not None:
+        params = dict(params, control=control)
+    if algorithm == 'GA':
+        outcome = run_ga.main(data=data, simulator=simulator, **params)
+        summary = {'best_fitness': outcome['best_fitness'], 'kpis': outcome['result']['kpis']}
+    elif algorithm == 'NSGA2':
+        results, pareto_objectives, _ = run_nsga2.run_nsga2_optimization(data=data, sim=simulator, **params)
+        summary = {'pareto_size': len(pareto_objectives), 'kpis': results['平衡解']['kpis']}
+    elif algorithm == dispatching.ALGORITHM_NAME:
+        outcome = dispatching.main(data=data, simulator=simulator, **params)
+        summary = {'best_fitness': outcome['best_fitness'], 'rule': outcome['rule'], 'kpis': outcome['result']['kpis']}
+    else:
+        raise ValueError(f"未知算法: {algorithm}")
+    summary['load_time'] = load_time
+    summary['stop_reason'] = control.stop_reason if control is not None else None
+    summary['metrics'] = metrics.REGISTRY.snapshot()
+    tracer = tracing.get_tracer()
+    summary['trace_events'] = tracer.drain() if tracer is not None else []
+    return summary
+
+
+def _worker_main(conn, repo_root: str, control_state):
+    """
+    常驻进程主循环: 预热后逐条处理 (algorithm, params, report_progress) 请求,收到None退出
+    control_state为与父进程共享的SolverControl状态,父进程在下发请求前写入
+    """
+    os.chdir(repo_root)
+    if repo_root not in sys.path:
+        sys.path.insert(0, repo_root)
+
+    # 预热: 导入求解栈并加载当前输入
+    import run_ga  # noqa: F401
+    import run_nsga2  # noqa: F401
+    state: Dict = {}
+    try:
+        _load_inputs(state, 'GA')
+    except Exception:
+        traceback.print_exc()  # 输入暂不可用时延迟到首次请求再加载
+    conn.send(('ready', os.getpid()))
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if request is None:
+            break
+        algorithm, params, report_progress = request
+        callback = (lambda event: conn.send(('progress', event))) if report_progress else None
+        try:
+            conn.send(('ok', _solve(state, algorithm, params, callback, SolverControl(state=control_state))))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}\n{traceback.format_exc()}"))
+
+
+class WarmWorker:
+    """单个常驻求解进程及其管道端点"""
+
+    def __init__(self, ctx, repo_root: str):
+        self.conn, child_conn = ctx.Pipe()
+        # 求解控制状态(取消标志/开始时间/时间预算): 求解进行中父进程直接写入,子进程每代读取
+        self.control_state = ctx.RawArray('d', STATE_SIZE)
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, repo_root, self.control_state),
+                                   daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        if not self.ready and self.conn.poll(timeout):
+            status, _ = self.conn.recv()
+            self.ready = status == 'ready'
+        return self.ready
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+class WarmWorkerPool:
+    """常驻求解进程池: solve()取一个空闲进程执行请求,进程异常退出时自动重启"""
+
+    def __init__(self, size: int, repo_root: str):
+        """
+        参数:
+            size: 常驻进程数(即可同时执行的求解数)
+            repo_root: 求解器工作目录(输入CSV与输出文件所在目录)
+        """
+        self.size = size
+        self.repo_root = repo_root
+        # spawn: 不继承Web服务器线程/锁状态,各平台行为一致
+        self._ctx = mp.get_context('spawn')
+        self._idle: 'queue.Queue[WarmWorker]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = [WarmWorker(self._ctx, repo_root) for _ in range(size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def solve(self, algorithm: str, params: Optional[Dict] = None,
+              on_progress: Optional[Callable[[Dict], None]] = None,
+              control: Optional[SolverControl] = None) -> Dict:
+        """
+        在空闲常驻进程中执行求解(阻塞直到完成)
+
+        参数:
+            algorithm: 'GA' / 'NSGA2' / 'DISPATCH'(调度规则排程)
+            params: 传给求解入口的关键字参数
+            on_progress: 可选,在调用线程中以求解器进度事件调用; 为None时求解器不生成进度
+            control: 可选,求解控制; 求解期间绑定到进程的共享状态,cancel()/调整时间预算即时生效
+        
+        返回:
+            求解摘要(best_fitness/pareto_size, kpis, load_time, stop_reason)
+        """
+        worker = self._idle.get()
+        try:
+            if not worker.alive():
+                worker = self._replace(worker)
+            worker.wait_ready()
+            tracer = tracing.get_tracer()
+            if tracer is not None:
+                params = dict(params or {}, trace=True)
+            solve_start = tracing.now_us()
+            if control is not None:
+                control.attach(worker.control_state)
+            else:
+                worker.control_state[:] = [0.0] * STATE_SIZE
+            worker.conn.send((algorithm, params or {}, on_progress is not None))
+            while True:
+                try:
+                    status, payload = worker.conn.recv()
+                except EOFError:
+                    worker = self._replace(worker)
+                    raise RuntimeError("求解进程异常退出") from None
+                if status != 'progress':
+                    break
+                try:
+                    on_progress(payload)
+                except Exception:
+                    traceback.print_exc()  # 进度处理失败不影响求解,也不能打乱管道消息顺序
+            if status == 'error':
+                raise RuntimeError(payload)
+            if control is not None:
+                control.stop_reason = payload['stop_reason']
+            metrics.REGISTRY.merge(payload.pop('metrics', None))
+            events = payload.pop('trace_events', None)
+            if tracer is not None:
+                tracer.complete('WarmWorkerPool.solve', solve_start, cat='web', algorithm=algorithm,
+                                worker_pid=worker.process.pid)
+                tracer.extend(events or [])
+            return payload
+        finally:
+            if control is not None:
+                control.detach()
+            self._idle.put(worker)
+
+    def _replace(self, worker: WarmWorker) -> WarmWorker:
+        """以新进程替换已退出的进程"""
+        worker.stop()
+        new_worker = WarmWorker(self._ctx, self.repo_root)
+        with self._lock:
+            self._workers[self._workers.index(worker)] = new_worker
+        return new_worker
+
+    def shutdown(self):
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,71 @@
+"""
+作业工作区管理
+功能: 为每个排程作业创建独立目录(输入CSV与全部输出文件),使并发作业互不覆盖;
+按保留数量与保留时长清理已结束作业的工作区
+"""
+
+import os
+import shutil
+import threading
+import time
+from typing import Iterable, List, Optional
+
+
+class WorkspaceManager:
+    """作业工作区: root/<job_id>/,创建与清理线程安全"""
+
+    def __init__(self, root: str, max_workspaces: int = 50, max_age_seconds: float = 24 * 3600):
+        """
+        参数:
+            root: 工作区根目录
+            max_workspaces: 最多保留的已结束作业工作区数(超出时删除最早的)
+            max_age_seconds: 工作区最长保留时间(秒)
+        """
+        self.root = root
+        self.max_workspaces = max_workspaces
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def create(self, job_id: str) -> str:
+        """创建作业工作区并返回其路径"""
+        path = os.path.join(self.root, job_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def path(self, job_id: str) -> Optional[str]:
+        """已存在的作业工作区路径; 不存在(未创建或已清理)时返回None"""
+        path = os.path.join(self.root, job_id)
+        return path if os.path.isdir(path) else None
+
+    def list_files(self, job_id: str) -> List[str]:
+        path = self.path(job_id)
+        if path is None:
+            return []
+        return sorted(name for name in os.listdir(path) if os.path.isfile(os.path.join(path, name)))
+
+    def cleanup(self, keep: Iterable[str] = ()) -> int:
+        """
+        删除过期或超出保留数量的工作区(按修改时间从旧到新)
+
+        参数:
+            keep: 不得删除的作业ID(排队/运行中的作业)
+
+        返回:
+            删除的工作区数
+        """
+        keep = set(keep)
+        with self._lock:
+            entries = sorted(
+                (e for e in os.scandir(self.root) if e.is_dir() and e.name not in keep),
+                key=lambda e: e.stat().st_mtime,
+            )
+            now = time.time()
+            excess = len(entries) - self.max_workspaces
+            removed = 0
+            for entry in entries:
+                if excess - removed <= 0 and now - entry.stat().st_mtime <= self.max_age_seconds:
+                    continue
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+            return removed